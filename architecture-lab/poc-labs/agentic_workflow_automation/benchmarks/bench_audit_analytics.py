@@ -0,0 +1,88 @@
+"""
+Audit analytics benchmark for ColumnarAuditSink.
+
+Writes EVENTS audit records (steps of mixed adapters, with retries,
+failures and policy violations) through the sink, then times a few
+analytical queries over the DuckDB table and over hourly Parquet files.
+
+Run from the project root (optionally pass an event count):
+    PYTHONPATH=src python benchmarks/bench_audit_analytics.py [events]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from automation_app.audit.columnar_audit_sink import ColumnarAuditSink
+
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+ADAPTERS = [("Workday", "create_time_off"), ("Workday", "get_pto_balance"), ("MSGraph", "send_email")]
+
+QUERIES = {
+    "failure rate per adapter": (
+        "SELECT adapter, avg((event_type = 'ACTION_FAILED')::INT) FROM audit_events "
+        "WHERE event_type IN ('ACTION_FAILED', 'PROPOSED') GROUP BY adapter"
+    ),
+    "p95 step latency per method": (
+        "SELECT adapter, method, quantile_cont(latency_ms, 0.95) FROM audit_events "
+        "WHERE event_type = 'PROPOSED' GROUP BY adapter, method"
+    ),
+    "replans per hour": (
+        "SELECT date_trunc('hour', timestamp), count(*) FROM audit_events "
+        "WHERE event_type = 'REPLAN_TRIGGERED' GROUP BY 1"
+    ),
+    "violations per rule": (
+        "SELECT payload->'matched_rules'->>0 AS rule, count(*) FROM audit_events "
+        "WHERE event_type = 'POLICY_VIOLATION' GROUP BY rule"
+    ),
+}
+
+
+def records(count: int):
+    start = datetime(2026, 1, 1)
+    for i in range(count // 4):
+        adapter, method = ADAPTERS[i % len(ADAPTERS)]
+        workflow_id = f"session-{i}"
+        ts = start + timedelta(milliseconds=i * 10)
+        action = {"adapter": adapter, "method": method, "step": 0}
+        yield workflow_id, "ACTION_STARTED", ts, {**action, "params": {"user_id": "u"}}
+        yield workflow_id, "ATTEMPT FAILED", ts + timedelta(milliseconds=40), {
+            "step": 0, "attempt": 1, "decision": "RecoveryDecision.RETRY", "error": "timeout",
+        }
+        if i % 10 == 0:
+            yield workflow_id, "ACTION_FAILED", ts + timedelta(milliseconds=90), {**action, "decision": "FAIL"}
+            yield workflow_id, "REPLAN_TRIGGERED", ts + timedelta(milliseconds=91), {**action, "decision": "RE_PLAN"}
+        elif i % 25 == 1:
+            yield workflow_id, "PROPOSED", ts + timedelta(milliseconds=95), action
+            yield workflow_id, "POLICY_VIOLATION", ts, {
+                "adapter": adapter, "method": method, "matched_rules": [f"rule_{i % 3}"],
+            }
+        else:
+            yield workflow_id, "PROPOSED", ts + timedelta(milliseconds=60 + i % 50), action
+            yield workflow_id, "WORKFLOW_COMPLETED", ts + timedelta(milliseconds=120), {}
+
+
+def bench(label: str, path: Path, format: str) -> None:
+    sink = ColumnarAuditSink(path, format=format, batch_size=10_000, flush_interval=3600)
+    started = time.perf_counter()
+    written = 0
+    for workflow_id, event_type, ts, payload in records(EVENTS):
+        sink.write({"workflow_id": workflow_id, "event_type": event_type, "timestamp": ts.isoformat(), "payload": payload})
+        written += 1
+    sink.query("SELECT 1")  # waits for queued batches
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {written:,} events written in {elapsed:.1f} s ({written / elapsed:,.0f} events/s, "
+          f"{sink.metrics.counter('columnar_audit.dropped'):,} dropped)")
+
+    for name, sql in QUERIES.items():
+        started = time.perf_counter()
+        sink.query(sql)
+        print(f"  {name:<28} {(time.perf_counter() - started) * 1000:8.1f} ms")
+    sink.close()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        bench("duckdb ", Path(directory) / "audit.duckdb", "duckdb")
+        bench("parquet", Path(directory) / "audit", "parquet")
@@ -0,0 +1,87 @@
+"""
+Per-step dispatch overhead benchmark for ExecutionEngine on a 50-step plan.
+
+Compares the previous per-step path (adapter dict lookup, a fresh
+`supported_actions()` / `idempotent_reads()` set, and `getattr` + `iscoroutinefunction` on every
+attempt) with plans compiled once into bound, pre-validated steps.
+
+Run from the project root:
+    PYTHONPATH=src python benchmarks/bench_plan_compile.py
+"""
+import asyncio
+import inspect
+import time
+
+from automation_app.adapters.workday_adapter import WorkdayAdapter
+from automation_app.engines.plan_compiler import PlanCompiler
+from automation_app.models.action import Action
+from automation_app.models.plan import Plan
+
+STEPS = 50
+EXECUTIONS = 2000
+ROUNDS = 5
+
+
+def build_plan(steps: int = STEPS) -> Plan:
+    return Plan(actions=[
+        Action(adapter="Workday", method="create_time_off", params={"user_id": f"user-{i}"})
+        for i in range(steps)
+    ])
+
+
+async def direct_calls(adapter, plan: Plan) -> None:
+    """Baseline: the adapter calls alone, no resolution at all."""
+    for action in plan.actions:
+        await adapter.execute(action.method, action.params)
+
+
+async def per_step_dispatch(adapters: dict, plan: Plan) -> None:
+    """Previous `_run_plan` / `_invoke`: resolve everything on every step."""
+    for action in plan.actions:
+        adapter = adapters.get(action.adapter)
+        if not adapter or action.method not in adapter.supported_actions():
+            raise RuntimeError(action.method)
+        hedge = action.method in adapter.idempotent_reads()
+        execute_async = getattr(adapter, "execute_async", None)
+        if execute_async and asyncio.iscoroutinefunction(execute_async):
+            await execute_async(action.method, action.params)
+        else:
+            result = adapter.execute(action.method, action.params)
+            if inspect.isawaitable(result):
+                await result
+
+
+async def compiled_dispatch(compiler: PlanCompiler, adapters: dict, plan: Plan) -> None:
+    """Current path: validate and bind once, then only call."""
+    for action, binding in zip(plan.actions, compiler.compile(plan, adapters)):
+        await binding.call(action.params)
+
+
+async def bench(label: str, fn, baseline_us: float | None = None) -> float:
+    """Best of ROUNDS; overhead is reported against the direct-call baseline."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for _ in range(EXECUTIONS):
+            await fn()
+        best = min(best, time.perf_counter() - started)
+    per_step_us = best / (EXECUTIONS * STEPS) * 1_000_000
+    overhead = "" if baseline_us is None else f"  {per_step_us - baseline_us:8.3f} us/step overhead"
+    print(f"{label:<22} {per_step_us:8.3f} us/step{overhead}")
+    return per_step_us
+
+
+async def main():
+    plan = build_plan()
+    adapters = {"Workday": WorkdayAdapter()}
+
+    baseline = await bench("direct adapter calls", lambda: direct_calls(adapters["Workday"], plan))
+    await bench("per-step resolution", lambda: per_step_dispatch(adapters, plan), baseline)
+
+    compiler = PlanCompiler()
+    await bench("compiled plan", lambda: compiled_dispatch(compiler, adapters, plan), baseline)
+
+
+if __name__ == "__main__":
+    print(f"{STEPS}-step plan, {EXECUTIONS} executions, best of {ROUNDS}")
+    asyncio.run(main())
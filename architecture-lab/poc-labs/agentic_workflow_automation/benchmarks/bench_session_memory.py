@@ -0,0 +1,73 @@
+"""
+Memory-per-session benchmark for StateStore session data.
+
+Compares the plain dict form (a `Plan.model_dump()` tree per session) with
+SessionCodec's msgpack form (interned adapter/method names, decoded on
+`get_context`), and the read cost that buys.
+
+Run from the project root:
+    PYTHONPATH=src python benchmarks/bench_session_memory.py
+"""
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from automation_app.models.action import Action
+from automation_app.models.plan import Plan
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.session_codec import SessionCodec
+from automation_app.store.state_store import StateStore
+
+SESSIONS = 20_000
+STEPS = 4
+READS = 5_000
+
+
+def build_session(i: int) -> dict:
+    plan = Plan(actions=[
+        Action(
+            adapter="Workday" if step % 2 == 0 else "MSGraph",
+            method="create_time_off" if step % 2 == 0 else "send_email",
+            params={
+                "user_id": f"user-{i}",
+                "dates": ["2026-02-13", "2026-02-14"],
+                "comment": "Quarterly offsite travel",
+            },
+        )
+        for step in range(STEPS)
+    ])
+    return {
+        "last_plan": plan.model_dump(mode="json"),
+        "plan_type": "REQUEST_TIME_OFF",
+        "proposal_id": f"proposal-{i}",
+        "user_context": {"user_id": f"user-{i}", "role": "Employee", "department": "Engineering"},
+    }
+
+
+async def bench(label: str, store: StateStore) -> None:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(SESSIONS):
+        await store.save_context(f"session-{i}", build_session(i), state=WorkflowState.PROPOSED)
+    gc.collect()
+    resident = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for i in range(READS):
+        await store.get_context(f"session-{i}")
+    read_us = (time.perf_counter() - started) / READS * 1_000_000
+
+    print(f"{label:<22} {resident / SESSIONS:8.0f} B/session  {read_us:8.2f} us/get_context")
+
+
+async def main():
+    await bench("dict", StateStore(max_bytes=None))
+    await bench("msgpack + interning", StateStore(max_bytes=None, codec=SessionCodec()))
+
+
+if __name__ == "__main__":
+    print(f"{SESSIONS} sessions, {STEPS}-step plans")
+    asyncio.run(main())
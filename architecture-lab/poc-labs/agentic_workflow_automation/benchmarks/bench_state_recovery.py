@@ -0,0 +1,66 @@
+"""
+Recovery benchmark for StateStore persisted through StateLog.
+
+Builds a snapshot of SESSIONS sessions plus a log tail of step updates,
+then measures how long `restore()` takes to rebuild the store from the
+memory-mapped snapshot and the replayed tail.
+
+Run from the project root (optionally pass a session count):
+    PYTHONPATH=src python benchmarks/bench_state_recovery.py [sessions]
+"""
+import asyncio
+import sys
+import tempfile
+import time
+
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.state_log import StateLog
+from automation_app.store.state_store import StateStore
+
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+TAIL_UPDATES = SESSIONS // 10
+
+
+def session_record(i: int) -> list:
+    data = {
+        "plan_hash": f"{i:064x}",
+        "plan_type": "REQUEST_TIME_OFF",
+        "proposal_id": f"proposal-{i}",
+        "last_action_index": 1,
+        "last_action_status": WorkflowState.PROPOSED,
+    }
+    return ["S", f"session-{i}", WorkflowState.PROPOSED, data, 1_700_000_000.0 + i]
+
+
+def new_store(directory: str) -> StateStore:
+    # Unbounded so every session survives; size tracking off as in a pure replay
+    return StateStore(max_entries=None, max_bytes=None, log=StateLog(directory, snapshot_bytes=None))
+
+
+async def build(directory: str) -> None:
+    log = StateLog(directory, snapshot_bytes=None)
+    await log.snapshot(session_record(i) for i in range(SESSIONS))
+    for i in range(TAIL_UPDATES):
+        log.append(["U", f"session-{i}", {"last_action_index": 2}, WorkflowState.IN_PROGRESS, 1_800_000_000.0])
+    await log.close()
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        await build(directory)
+        print(f"{'build':<22} {time.perf_counter() - started:8.2f} s")
+
+        store = new_store(directory)
+        started = time.perf_counter()
+        replayed = await store.restore()
+        elapsed = time.perf_counter() - started
+        await store.close()
+
+        assert len(store.storage) == SESSIONS
+        print(f"{'restore':<22} {elapsed:8.2f} s  {replayed / elapsed:10.0f} records/s")
+
+
+if __name__ == "__main__":
+    print(f"{SESSIONS} sessions in snapshot, {TAIL_UPDATES} updates in log tail")
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""
+State write benchmark for ExecutionEngine on a 50-step plan.
+
+Compares the previous behaviour (full `plan.model_dump()` written into the
+session on every step transition) with plan-once + (plan_hash, step, status)
+delta writes.
+
+Run from the project root:
+    PYTHONPATH=src python benchmarks/bench_state_writes.py
+"""
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock
+
+from automation_app.engines.execution_engine import ExecutionEngine
+from automation_app.models.action import Action
+from automation_app.models.plan import Plan
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.state_store import StateStore
+
+STEPS = 50
+EXECUTIONS = 200
+
+
+def build_plan(steps: int = STEPS) -> Plan:
+    return Plan(actions=[
+        Action(
+            adapter="Workday",
+            method="create_time_off",
+            params={
+                "user_id": f"user-{i}",
+                "dates": ["2026-02-13", "2026-02-14"],
+                "comment": "Quarterly offsite travel " * 4,
+            },
+        )
+        for i in range(steps)
+    ])
+
+
+async def full_plan_writes(store: StateStore, plan: Plan, session_id: str) -> int:
+    """Previous `_save_state`: the whole plan on every transition (2 per step)."""
+    written = 0
+    for idx in range(len(plan.actions)):
+        for status in (WorkflowState.EXECUTING, WorkflowState.PROPOSED):
+            data = {
+                "last_plan": plan.model_dump(),
+                "last_action_index": idx,
+                "last_action_status": status,
+            }
+            written += len(json.dumps(data, default=str))
+            await store.save_context(session_id, data)
+    return written
+
+
+async def delta_writes(engine: ExecutionEngine, plan: Plan, session_id: str) -> int:
+    """Current path: plan once under its hash, then small deltas."""
+    plan_hash = await engine._store_plan(session_id, plan)
+    written = len(json.dumps(plan.model_dump(mode="json")))
+    for idx in range(len(plan.actions)):
+        for status in (WorkflowState.EXECUTING, WorkflowState.PROPOSED):
+            delta = {"plan_hash": plan_hash, "last_action_index": idx, "last_action_status": status}
+            written += len(json.dumps(delta))
+            await engine._save_state(session_id, plan_hash, idx, status)
+    return written
+
+
+async def bench(label: str, fn) -> None:
+    started = time.perf_counter()
+    written = 0
+    for i in range(EXECUTIONS):
+        written += await fn(f"session-{i}")
+    elapsed = time.perf_counter() - started
+    per_exec_ms = elapsed / EXECUTIONS * 1000
+    print(f"{label:<22} {per_exec_ms:8.3f} ms/execution  {written / EXECUTIONS / 1024:8.1f} KiB/execution")
+
+
+async def main():
+    plan = build_plan()
+
+    legacy_store = StateStore()
+    await bench("full plan per step", lambda sid: full_plan_writes(legacy_store, plan, sid))
+
+    engine = ExecutionEngine(adapters={}, state_store=StateStore(), auditor=MagicMock())
+    await bench("plan once + deltas", lambda sid: delta_writes(engine, plan, sid))
+
+
+if __name__ == "__main__":
+    print(f"{STEPS}-step plan, {EXECUTIONS} executions")
+    asyncio.run(main())
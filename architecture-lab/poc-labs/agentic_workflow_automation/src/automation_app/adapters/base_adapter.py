@@ -31,4 +31,18 @@ class EnterpriseAdapter(ABC):
         Returns a set of all actions this adapter can handle.
         Used for validation before execution.
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def idempotent_reads(self) -> Set[str]:
+        """
+        Actions that only read data and are safe to issue more than once
+        (e.g. availability / balance lookups). Eligible for hedging.
+        """
+        return set()
+
+    def register_errors(self, classifier) -> None:
+        """
+        Optional hook: register adapter-specific exception types / HTTP
+        statuses into the RecoveryEngine's ErrorClassifier.
+        """
+        return None
\ No newline at end of file
@@ -12,6 +12,9 @@ class MSGraphAdapter(EnterpriseAdapter):
         if action == "create_calendar_event":
             return await self.create_calendar_event(params)
 
+        if action == "check_calendar_availability":
+            return await self.check_calendar_availability(params)
+
         raise ValueError(f"Unsupported MSGraph action: {action}")
 
     async def compensate(self, action: str, params: dict, result: dict) -> None:
@@ -29,8 +32,12 @@ class MSGraphAdapter(EnterpriseAdapter):
         return {
             "send_email",
             "create_calendar_event",
+            "check_calendar_availability",
         }
 
+    def idempotent_reads(self) -> set:
+        return {"check_calendar_availability"}
+
     # -------- Concrete MS Graph operations --------
 
     async def send_email(self, params: dict) -> dict:
@@ -43,6 +50,10 @@ class MSGraphAdapter(EnterpriseAdapter):
         event_id = "EVT-456"
         return {"event_id": event_id}
 
+    async def check_calendar_availability(self, params: dict) -> dict:
+        # await ms_graph_client.get_schedule(...)
+        return {"available": True, "date": params.get("date")}
+
     async def delete_calendar_event(self, event_id: str) -> None:
         # await ms_graph_client.delete_event(event_id)
         # Idempotent delete
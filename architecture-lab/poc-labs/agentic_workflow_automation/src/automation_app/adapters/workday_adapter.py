@@ -8,6 +8,8 @@ class WorkdayAdapter(EnterpriseAdapter):
     async def execute(self, action: str, params: dict) -> dict:
         if action == "create_time_off":
             return await self.create_time_off(params)
+        if action == "get_pto_balance":
+            return await self.get_pto_balance(params)
         raise ValueError(f"Unsupported action: {action}")
 
     async def compensate(self, action: str, params: dict, result: dict) -> None:
@@ -18,12 +20,19 @@ class WorkdayAdapter(EnterpriseAdapter):
 
     # ---- Explicit API calls ----
     def supported_actions(self) -> set[str]:
-        return {"create_time_off"}
+        return {"create_time_off", "get_pto_balance"}
+
+    def idempotent_reads(self) -> set[str]:
+        return {"get_pto_balance"}
 
     async def create_time_off(self, params: dict) -> dict:
         # Call Workday API
         return {"request_id": "WD123"}
 
+    async def get_pto_balance(self, params: dict) -> dict:
+        # Read-only Workday balance lookup
+        return {"balance_days": 12.5}
+
     async def cancel_time_off(self, request_id: str) -> None:
         # Idempotent cancel
         pass
\ No newline at end of file
@@ -1,23 +1,60 @@
 import contextlib
 from contextlib import asynccontextmanager
 import asyncio
+import logging
 from fastapi import FastAPI
 
 from automation_app.adapters.msgraph_adapter import MSGraphAdapter
 from automation_app.adapters.workday_adapter import WorkdayAdapter
 from automation_app.api.routes.orchestrator_routes import OrchestratorRoutes
 from automation_app.audit.audit_logger import AuditLogger
-from automation_app.config.constants import MAX_RETRIES, BASE_BACKOFF
+from automation_app.audit.audit_store import AuditStore
+from automation_app.audit.columnar_audit_sink import ColumnarAuditSink
+from automation_app.config.constants import (
+    ADAPTER_LIMITS,
+    ADMIN_TOKEN,
+    ADAPTIVE_RETRY,
+    AUDIT_COLUMNAR_FORMAT,
+    AUDIT_COLUMNAR_PATH,
+    AUDIT_STORE_DIR,
+    BACKOFF_JITTER,
+    BASE_BACKOFF,
+    CIRCUIT_BREAKERS,
+    COMPACT_SESSIONS,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    MAX_BACKOFF,
+    MAX_RETRIES,
+    PREFETCH_ON_PROPOSE,
+    REDIS_URL,
+    RETRY_BUDGETS,
+    SHARED_SESSIONS_PATH,
+    STATE_LOG_DIR,
+)
 from automation_app.config.policies import POLICY_RULES
+from automation_app.engines.adaptive_policy import AdaptiveRetryPolicy
+from automation_app.engines.adapter_limiter import AdapterLimiter
+from automation_app.engines.circuit_breaker import CircuitBreakerRegistry
 from automation_app.engines.execution_engine import ExecutionEngine
+from automation_app.engines.execution_supervisor import ExecutionSupervisor
+from automation_app.engines.hedging import HedgedCaller
 from automation_app.engines.intent_classifier import IntentClassifier
 from automation_app.engines.policy_engine import PolicyEngine
 from automation_app.engines.recovery_engine import RecoveryEngine
+from automation_app.engines.retry_budget import RetryBudgets
 from automation_app.engines.task_planner import TaskPlanner
 from automation_app.orchestrator import AgenticOrchestrator
+from automation_app.store.redis_state_store import RedisStateStore
+from automation_app.store.session_codec import SessionCodec
+from automation_app.store.shared_memory_state_store import SharedMemoryStateStore
+from automation_app.store.state_log import StateLog
 from automation_app.store.state_store import StateStore
+from automation_app.utils.metrics import MetricsRegistry
 from automation_app.utils.pii_scrubber import PIIScrubber
 
+logger = logging.getLogger("automation_app")
+
 
 class AppFactory:
     def __init__(self):
@@ -26,31 +63,97 @@ class AppFactory:
             lifespan=self.lifespan
         )
         self.orchestrator = None
+        self.audit_store = None
+        self.audit_columns = None
+        self.metrics = MetricsRegistry()
 
     @asynccontextmanager
     async def lifespan(self, app: FastAPI):
-        state_store = StateStore()
+        if REDIS_URL:
+            # Shared by every instance: no local cache that could go stale
+            state_store = RedisStateStore(url=REDIS_URL, metrics=self.metrics)
+        elif SHARED_SESSIONS_PATH:
+            # Shared by the worker processes of this host
+            state_store = SharedMemoryStateStore(SHARED_SESSIONS_PATH, metrics=self.metrics)
+        else:
+            # No write-behind tier: the log already batches fsyncs, and a
+            # cache in front of an in-memory store would hold every session twice
+            state_store = StateStore(
+                metrics=self.metrics,
+                codec=SessionCodec() if COMPACT_SESSIONS else None,
+                log=StateLog(STATE_LOG_DIR, metrics=self.metrics) if STATE_LOG_DIR else None,
+            )
+        await state_store.restore()
+        if AUDIT_STORE_DIR:
+            self.audit_store = AuditStore(AUDIT_STORE_DIR, metrics=self.metrics)
+            AuditLogger.add_sink(self.audit_store)
+        if AUDIT_COLUMNAR_PATH:
+            self.audit_columns = ColumnarAuditSink(
+                AUDIT_COLUMNAR_PATH,
+                format=AUDIT_COLUMNAR_FORMAT,
+                metrics=self.metrics,
+            )
+            AuditLogger.add_sink(self.audit_columns)
 
         adapters = {
             "Workday": WorkdayAdapter(),
             "MSGraph": MSGraphAdapter()
         }
-        self.recovery_engine=RecoveryEngine( max_retries=MAX_RETRIES, base_backoff = BASE_BACKOFF, auditor=AuditLogger),
+        self.breakers = CircuitBreakerRegistry(CIRCUIT_BREAKERS, metrics=self.metrics, auditor=AuditLogger)
+        self.recovery_engine = RecoveryEngine(
+            max_retries=MAX_RETRIES,
+            base_backoff=BASE_BACKOFF,
+            auditor=AuditLogger,
+            breakers=self.breakers,
+            budgets=RetryBudgets(RETRY_BUDGETS, metrics=self.metrics),
+            jitter=BACKOFF_JITTER,
+            max_backoff=MAX_BACKOFF,
+            policy=AdaptiveRetryPolicy(
+                default_retries=MAX_RETRIES,
+                default_backoff=BASE_BACKOFF,
+                **ADAPTIVE_RETRY,
+            ),
+        )
+        self.limiter = AdapterLimiter(ADAPTER_LIMITS, metrics=self.metrics)
+        self.hedger = HedgedCaller(
+            percentile=HEDGE_PERCENTILE,
+            min_samples=HEDGE_MIN_SAMPLES,
+            default_delay=HEDGE_DEFAULT_DELAY,
+            metrics=self.metrics,
+        )
         self.planner = TaskPlanner()
+        executor = ExecutionEngine(
+            adapters=adapters,
+            recovery_engine=self.recovery_engine,
+            planner=self.planner,
+            limiter=self.limiter,
+            hedger=self.hedger,
+            metrics=self.metrics,
+        )
+        # Backing-off retries wait in the supervisor, not in a sleeping task
+        self.supervisor = ExecutionSupervisor(executor, auditor=AuditLogger, metrics=self.metrics)
         self.orchestrator = AgenticOrchestrator(
             classifier=IntentClassifier(),
             planner= self.planner,
             policy_engine=PolicyEngine(rules=POLICY_RULES),
-            executor=ExecutionEngine(adapters=adapters, recovery_engine=self.recovery_engine,planner= self.planner),
+            executor=executor,
             state_store=state_store,
-            scrubber=PIIScrubber()
+            scrubber=PIIScrubber(),
+            prefetch_reads=PREFETCH_ON_PROPOSE,
+            supervisor=self.supervisor,
         )
 
         self._register_routes()
 
         async def run_cleanup():
             while True:
-                await self.orchestrator.cleanup_stale_proposals()
+                try:
+                    await self.orchestrator.cleanup_stale_proposals()
+                    await state_store.purge_expired()
+                except Exception:
+                    # A failed sweep is retried next round; never stop sweeping
+                    self.metrics.increment("cleanup.failures")
+                    logger.exception("Session cleanup failed")
                 await asyncio.sleep(60)
 
         cleanup_task = asyncio.create_task(run_cleanup())
@@ -62,11 +165,17 @@ class AppFactory:
             cleanup_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 await cleanup_task
-            # await state_store.close_connection()
-            pass
+            await self.supervisor.close()
+            await state_store.close()
+            if self.audit_store is not None:
+                AuditLogger.remove_sink(self.audit_store)
+                self.audit_store.close()
+            if self.audit_columns is not None:
+                AuditLogger.remove_sink(self.audit_columns)
+                self.audit_columns.close()
 
     def _register_routes(self):
-        routes = OrchestratorRoutes(self.orchestrator)
+        routes = OrchestratorRoutes(self.orchestrator, audit_store=self.audit_store, admin_token=ADMIN_TOKEN)
         self.app.include_router(routes.router)
 
     def get_app(self) -> FastAPI:
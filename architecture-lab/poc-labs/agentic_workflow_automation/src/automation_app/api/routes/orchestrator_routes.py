@@ -1,26 +1,45 @@
-from fastapi import APIRouter
+import asyncio
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from automation_app.config.constants import SESSION_PAGE_SIZE
 from automation_app.models.orchestrator_request import OrchestratorRequest
 from automation_app.models.orchestrator_response import OrchestratorResponse
+from automation_app.models.workflow_state import WorkflowState
 
 class OrchestratorRoutes:
-    def __init__(self, orchestrator):
+    def __init__(self, orchestrator, audit_store=None, admin_token: Optional[str] = None):
         self.orchestrator = orchestrator
+        self.audit_store = audit_store
+        self.admin_token = admin_token
         self.router = APIRouter()
         self._register_routes()
+        if admin_token:
+            self._register_admin_routes()
+
+    def _require_admin(self, x_admin_token: Optional[str] = Header(default=None)):
+        if x_admin_token is None or not hmac.compare_digest(x_admin_token, self.admin_token):
+            raise HTTPException(status_code=401, detail="Admin token required")
 
     def _register_routes(self):
         @self.router.post(
             "/process",
             response_model=OrchestratorResponse
         )
-        async def process_request(req: OrchestratorRequest):
+        async def process_request(
+            req: OrchestratorRequest,
+            idempotency_key: Optional[str] = Header(default=None),
+        ):
             # Added 'await' because orchestrator is now async
             result = await self.orchestrator.process_request(
                 user_input=req.text,
                 session_id=req.session_id,
                 user_id=req.user_id if hasattr(req, 'user_id') else "anonymous",
                 role=req.role,
-                department=req.department
+                department=req.department,
+                idempotency_key=idempotency_key,
             )
             return {"message": result}
 
@@ -41,8 +60,11 @@ class OrchestratorRoutes:
             }
 
         @self.router.post("/confirm", response_model=OrchestratorResponse)
-        async def confirm(req: OrchestratorRequest):
-            result = await self.orchestrator.confirm(req.session_id)
+        async def confirm(
+            req: OrchestratorRequest,
+            idempotency_key: Optional[str] = Header(default=None),
+        ):
+            result = await self.orchestrator.confirm(req.session_id, idempotency_key=idempotency_key)
             return {
                 "message": result["message"],
                 "state": result.get("state")
@@ -54,4 +76,33 @@ class OrchestratorRoutes:
             return {
                 "message": result["message"],
                 "state": result.get("state")
-            }
\ No newline at end of file
+            }
+
+    def _register_admin_routes(self):
+        # They expose session ids, which are enough to confirm or reject a plan
+        admin = [Depends(self._require_admin)]
+
+        @self.router.get("/admin/sessions", dependencies=admin)
+        async def list_sessions(
+            state: WorkflowState,
+            cursor: Optional[str] = None,
+            limit: int = Query(default=100, ge=1, le=SESSION_PAGE_SIZE),
+        ):
+            try:
+                return await self.orchestrator.list_sessions(state=state, cursor=cursor, limit=limit)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        @self.router.get("/audit/{session_id}", dependencies=admin)
+        async def audit_events(session_id: str):
+            """
+            Streams a session's audit events as newline-delimited JSON.
+            """
+            if self.audit_store is None:
+                raise HTTPException(status_code=404, detail="Audit store is not enabled")
+            if not await asyncio.to_thread(self.audit_store.contains, session_id):
+                raise HTTPException(status_code=404, detail="No audit events for this session")
+            return StreamingResponse(
+                self.audit_store.read_lines(session_id),
+                media_type="application/x-ndjson",
+            )
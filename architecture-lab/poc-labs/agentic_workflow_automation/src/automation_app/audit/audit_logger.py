@@ -1,7 +1,7 @@
 import json
 import logging
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping
 
 from automation_app.models.plan import Plan
 from automation_app.utils.pii_scrubber import PIIScrubber
@@ -9,7 +9,21 @@ from automation_app.utils.pii_scrubber import PIIScrubber
 logger = logging.getLogger("automation_audit")
 logger.setLevel(logging.INFO)
 
+
+def json_default(value):
+    """
+    `json.dumps` fallback for audit records: read-only mappings (cached
+    scrubbed params) as objects, anything else as its string.
+    """
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
 class AuditLogger:
+    scrubber = PIIScrubber()
+    # Extra destinations for every record (e.g. AuditStore), via sink.write(record)
+    sinks: List[Any] = []
 
     @staticmethod
     def log(
@@ -23,7 +37,21 @@ class AuditLogger:
             "timestamp": datetime.utcnow().isoformat(),
             "payload": payload,
         }
-        logger.info(json.dumps(record))
+        logger.info(json.dumps(record, default=json_default))
+        for sink in AuditLogger.sinks:
+            try:
+                sink.write(record)
+            except Exception:
+                logger.exception("Audit sink %r failed", sink)
+
+    @staticmethod
+    def add_sink(sink):
+        AuditLogger.sinks.append(sink)
+
+    @staticmethod
+    def remove_sink(sink):
+        if sink in AuditLogger.sinks:
+            AuditLogger.sinks.remove(sink)
 
     @staticmethod
     def log_plan(session_id: str, plan: Plan):
@@ -33,7 +61,7 @@ class AuditLogger:
             plan_data.append({
                 "adapter": action.adapter,
                 "method": action.method,
-                "params": PIIScrubber().scrub_data(action.params),  # scrub PII
+                "params": action.scrubbed_params(AuditLogger.scrubber),  # scrub PII (cached)
             })
 
         AuditLogger.log(
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import fcntl
+import heapq
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from automation_app.audit.audit_logger import json_default
+from automation_app.config.constants import (
+    AUDIT_INDEX_BLOCK_BYTES,
+    AUDIT_MAX_SEGMENTS,
+    AUDIT_SEGMENT_BYTES,
+)
+from automation_app.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("automation_audit")
+
+SEGMENT_PATTERN = re.compile(r"^segment\.(\d+)\.log$")
+WRITER_PATTERN = re.compile(r"^writer\.\d+$")
+
+# workflow -> offset of its first event in each index block that holds any
+Postings = Dict[str, List[int]]
+# A segment to read, the offset to stop at (None = its end) and where to seek
+Extent = Tuple[Path, Optional[int], List[int]]
+
+
+class AuditStore:
+    """
+    Append-only audit event store, queryable by workflow.
+
+    Every process appends to its own writer directory (`writer.<k>`, claimed
+    with a lock held while the store is open, so a restarted worker picks its
+    slot up again). Records are JSON lines in `segment.<n>.log` files, rolled
+    once a segment reaches `segment_bytes`; each writer keeps its newest
+    `max_segments`.
+
+    The index is sparse: a segment is cut into `index_block_bytes` blocks
+    and, per workflow, only the offset of its first event in each block it
+    appears in is kept. Reading a workflow seeks to those offsets and reads
+    on to the end of each block, so a query costs O(blocks holding the
+    workflow x block size) plus a lookup per segment, not the segment's
+    size; a workflow with events in every block still reads its segments
+    whole. When a segment is sealed its index is written next to it
+    (`segment.<n>.idx`); segments of other writers are indexed from those
+    files, or by scanning their unsealed tail once. Sealing (fsync, index
+    write, retention) runs on a background thread, so `write(record)`,
+    called from `AuditLogger.log`, only appends to the OS page cache.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        segment_bytes: int = AUDIT_SEGMENT_BYTES,
+        max_segments: int | None = AUDIT_MAX_SEGMENTS,
+        metrics: MetricsRegistry | None = None,
+        index_block_bytes: int = AUDIT_INDEX_BLOCK_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.index_block_bytes = index_block_bytes
+        self.metrics = metrics or MetricsRegistry()
+        # segment -> its index, for this writer
+        self._postings: Dict[int, Postings] = {}
+        # segment path -> (bytes indexed, or -1 once sealed; index), other writers
+        self._foreign: Dict[Path, Tuple[int, Postings]] = {}
+        # Guards the indexes above: reads run on threads, writes on the caller's
+        self._lock = threading.Lock()
+        self._segments: List[int] = []
+        self._segment = 0
+        self._size = 0
+        self._file = None
+        self._sealer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audit-seal")
+        self._claim()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def write(self, record: dict):
+        # workflow_id first, so a scan can match lines by prefix
+        line = (json.dumps({"workflow_id": record["workflow_id"], **record}, default=json_default) + "\n").encode()
+        if self._size and self._size + len(line) > self.segment_bytes:
+            self._roll()
+        self._file.write(line)
+        with self._lock:
+            self._note(self._postings[self._segment], record["workflow_id"], self._size)
+            self._size += len(line)
+        self.metrics.increment("audit_store.events")
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._sealer.shutdown(wait=True)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            os.close(self._lock_fd)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def contains(self, workflow_id: str) -> bool:
+        """
+        Whether any writer holds events of the workflow; may scan the
+        unsealed segments of other writers, so call it off the event loop.
+        """
+        with self._lock:
+            if any(workflow_id in postings for postings in self._postings.values()):
+                return True
+        return any(self._foreign_extents(workflow_id))
+
+    def read_lines(self, workflow_id: str) -> Iterator[bytes]:
+        """
+        The raw JSON lines of a workflow's events, oldest first. Events this
+        process writes while iterating are not included; segments dropped by
+        retention meanwhile are skipped.
+        """
+        self._file.flush()
+        with self._lock:
+            own = [
+                (
+                    self._path(segment, "log"),
+                    self._size if segment == self._segment else None,
+                    list(self._postings[segment][workflow_id]),
+                )
+                for segment in self._segments
+                if workflow_id in self._postings[segment]
+            ]
+        return self._read(workflow_id, own)
+
+    def events(self, workflow_id: str) -> Iterator[dict]:
+        for line in self.read_lines(workflow_id):
+            yield json.loads(line)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _read(self, workflow_id: str, own: List[Extent]) -> Iterator[bytes]:
+        prefix = json.dumps({"workflow_id": workflow_id})[:-1].encode() + b","
+        streams = [self._scan_lines(prefix, own)]
+        for writer in self._writers():
+            streams.append(self._scan_lines(prefix, self._foreign_extents(workflow_id, writer)))
+        if len(streams) == 1:
+            yield from streams[0]
+        else:
+            # Each writer's events are in order; interleave them by time
+            yield from heapq.merge(*streams, key=lambda line: json.loads(line)["timestamp"])
+
+    def _scan_lines(self, prefix: bytes, extents: Iterable[Extent]) -> Iterator[bytes]:
+        """
+        Reads each indexed block from the workflow's first event in it to
+        the block's end; lines starting past the block belong to the next.
+        """
+        for path, end, starts in extents:
+            try:
+                file = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with file:
+                for start in starts:
+                    file.seek(start)
+                    offset = start
+                    block_end = (start // self.index_block_bytes + 1) * self.index_block_bytes
+                    while offset < block_end:
+                        line = file.readline()
+                        offset += len(line)
+                        if (end is not None and offset > end) or not line.endswith(b"\n"):
+                            break
+                        if line.startswith(prefix):
+                            yield line
+
+    def _writers(self) -> List[Path]:
+        return sorted(
+            path
+            for path in self.directory.iterdir()
+            if WRITER_PATTERN.match(path.name) and path != self._writer_dir
+        )
+
+    def _foreign_extents(self, workflow_id: str, writer: Path | None = None) -> Iterator[Extent]:
+        for directory in [writer] if writer else self._writers():
+            paths = sorted(
+                (int(match.group(1)), path)
+                for path in directory.iterdir()
+                if (match := SEGMENT_PATTERN.match(path.name))
+            )
+            with self._lock:
+                live = {path for _, path in paths}
+                for path in [path for path in self._foreign if path.parent == directory and path not in live]:
+                    del self._foreign[path]
+            for _, path in paths:
+                starts = self._foreign_starts(path, workflow_id)
+                if starts:
+                    yield path, None, starts
+
+    def _foreign_starts(self, path: Path, workflow_id: str) -> List[int]:
+        """
+        The workflow's block offsets in another writer's segment, indexing
+        only the bytes appended since the last call (none once it is sealed).
+        """
+        with self._lock:
+            offset, postings = self._foreign.get(path, (0, {}))
+        if offset >= 0:
+            try:
+                idx = path.with_suffix(".idx").read_bytes()
+            except FileNotFoundError:
+                tail: Postings = {}
+                end = self._scan(path, tail, offset)
+                with self._lock:
+                    # Another reader may have indexed the same tail meanwhile
+                    if self._foreign.get(path, (0, None))[0] == offset:
+                        for other, starts in tail.items():
+                            for start in starts:
+                                self._note(postings, other, start)
+                        self._foreign[path] = (end, postings)
+            else:
+                with self._lock:
+                    self._foreign[path] = (-1, json.loads(idx))
+        with self._lock:
+            return list(self._foreign.get(path, (0, {}))[1].get(workflow_id, ()))
+
+    def _note(self, postings: Postings, workflow_id: str, offset: int):
+        """
+        Records an event at `offset` unless the workflow already has one
+        in that block.
+        """
+        starts = postings.setdefault(workflow_id, [])
+        if not starts or starts[-1] // self.index_block_bytes != offset // self.index_block_bytes:
+            starts.append(offset)
+
+    def _path(self, segment: int, kind: str) -> Path:
+        return self._writer_dir / f"segment.{segment}.{kind}"
+
+    def _claim(self):
+        """
+        Takes the first writer directory no other open store holds.
+        """
+        for slot in itertools.count():
+            directory = self.directory / f"writer.{slot}"
+            directory.mkdir(exist_ok=True)
+            fd = os.open(directory / "lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            self._writer_dir, self._lock_fd = directory, fd
+            return
+
+    def _load(self):
+        for path in self._writer_dir.iterdir():
+            match = SEGMENT_PATTERN.match(path.name)
+            if match:
+                self._segments.append(int(match.group(1)))
+        self._segments.sort()
+
+        for segment in self._segments[:-1]:
+            idx_path = self._path(segment, "idx")
+            if idx_path.exists():
+                self._postings[segment] = json.loads(idx_path.read_bytes())
+            else:
+                # Crashed between sealing a segment and writing its index
+                self._postings[segment] = {}
+                self._scan(self._path(segment, "log"), self._postings[segment], cut=True)
+                self._write_index(segment, self._postings[segment])
+
+        if self._segments:
+            self._segment = self._segments[-1]
+            self._postings[self._segment] = {}
+            self._scan(self._path(self._segment, "log"), self._postings[self._segment], cut=True)
+        else:
+            self._segment = 1
+            self._segments.append(1)
+            self._postings[1] = {}
+        self._open()
+        for segment in self._enforce_retention():
+            self._drop(segment)
+
+    def _scan(self, path: Path, postings: Postings, offset: int = 0, cut: bool = False) -> int:
+        """
+        Indexes a segment's complete lines from `offset` on and returns the
+        offset after the last one; with `cut`, a torn last line (crash
+        mid-write) is cut off.
+        """
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            return offset
+        with file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                self._note(postings, json.loads(line)["workflow_id"], offset)
+                offset += len(line)
+        if cut and offset != path.stat().st_size:
+            os.truncate(path, offset)
+        return offset
+
+    def _open(self):
+        self._file = open(self._path(self._segment, "log"), "ab")
+        self._size = self._file.tell()
+        self.metrics.set_gauge("audit_store.segments", len(self._segments))
+
+    def _roll(self):
+        # Readers may open the old segment before it is sealed
+        self._file.flush()
+        sealed, segment = self._file, self._segment
+        with self._lock:
+            self._segment += 1
+            self._segments.append(self._segment)
+            self._postings[self._segment] = {}
+            self._size = 0
+            postings = self._postings.get(segment, {})
+            dropped = self._enforce_retention()
+        self._open()
+        # No longer written to, so the sealer may serialize it unlocked
+        future = self._sealer.submit(self._seal, sealed, segment, postings, dropped)
+        future.add_done_callback(self._sealed)
+        self.metrics.increment("audit_store.rolls")
+
+    def _seal(self, file, segment: int, postings: Postings, dropped: List[int]):
+        """
+        Sealer thread: makes a full segment durable, writes its index and
+        deletes the segments retention let go.
+        """
+        os.fsync(file.fileno())
+        file.close()
+        self._write_index(segment, postings)
+        for old in dropped:
+            self._drop(old)
+
+    def _sealed(self, future: Future):
+        if future.exception() is not None:
+            self.metrics.increment("audit_store.seal_failures")
+            logger.error("Sealing an audit segment failed", exc_info=future.exception())
+
+    def _write_index(self, segment: int, postings: Postings):
+        tmp = self._path(segment, "idx.tmp")
+        tmp.write_text(json.dumps(postings, sort_keys=True))
+        os.replace(tmp, self._path(segment, "idx"))
+
+    def _enforce_retention(self) -> List[int]:
+        """
+        Forgets the segments past `max_segments` and returns them for
+        deletion; costs one step per dropped segment.
+        """
+        if self.max_segments is None or len(self._segments) <= self.max_segments:
+            return []
+        dropped = self._segments[:-self.max_segments]
+        self._segments = self._segments[-self.max_segments:]
+        for segment in dropped:
+            del self._postings[segment]
+        self.metrics.set_gauge("audit_store.segments", len(self._segments))
+        return dropped
+
+    def _drop(self, segment: int):
+        self._path(segment, "log").unlink(missing_ok=True)
+        self._path(segment, "idx").unlink(missing_ok=True)
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import duckdb
+
+from automation_app.audit.audit_logger import json_default
+from automation_app.config.constants import (
+    AUDIT_COLUMNAR_BATCH,
+    AUDIT_COLUMNAR_FLUSH_INTERVAL,
+    AUDIT_COLUMNAR_MAX_PENDING,
+    AUDIT_COLUMNAR_OPEN_STEPS,
+)
+from automation_app.utils.metrics import MetricsRegistry
+
+logger = logging.getLogger("automation_audit")
+
+FORMATS = ("duckdb", "parquet")
+
+COLUMNS = {
+    "timestamp": "TIMESTAMP",
+    "workflow_id": "VARCHAR",
+    "event_type": "VARCHAR",
+    "adapter": "VARCHAR",
+    "method": "VARCHAR",
+    "step": "INTEGER",
+    "decision": "VARCHAR",
+    "latency_ms": "DOUBLE",
+    "payload": "JSON",
+}
+
+TABLE = "audit_events"
+
+# A staged batch, read back with the column types above
+BATCH_SQL = "SELECT * FROM read_json(?, format = 'newline_delimited', columns = {%s})" % ", ".join(
+    f"{name}: '{kind}'" for name, kind in COLUMNS.items()
+)
+
+
+class ColumnarAuditSink:
+    """
+    AuditLogger sink that stores events as typed columns for analytics.
+
+    Each record becomes one row of `audit_events`: timestamp, workflow_id,
+    event_type, adapter, method, step, decision and latency_ms, plus the
+    whole payload as JSON. Rows are buffered and appended `batch_size` at a
+    time (or after `flush_interval` seconds), either to a DuckDB database
+    file (`format="duckdb"`) or as Parquet files partitioned by hour under a
+    directory (`format="parquet"`, `<path>/hour=YYYY-MM-DDTHH/*.parquet`).
+
+    Events of a step that lack adapter/method (e.g. retry attempts) inherit
+    them from the step's ACTION_STARTED, and latency_ms is the time since
+    that ACTION_STARTED unless the payload carries its own `latency_ms`.
+
+    Batches are loaded by one writer thread owned by the sink, so
+    `AuditLogger.log` never waits on DuckDB; at most `max_pending` batches
+    may be queued, further ones are dropped and counted. A DuckDB file
+    takes a single writing process (a second one fails to open it); with
+    several workers use `format="parquet"`, where every process appends
+    its own files.
+
+    `query(sql)` flushes, then runs SQL against `audit_events` on the writer
+    thread and waits for the rows (call it off the event loop), e.g.
+        SELECT adapter, avg((event_type = 'ACTION_FAILED')::INT)
+        FROM audit_events WHERE event_type IN ('ACTION_FAILED', 'PROPOSED')
+        GROUP BY adapter
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        format: str = "duckdb",
+        batch_size: int = AUDIT_COLUMNAR_BATCH,
+        flush_interval: float = AUDIT_COLUMNAR_FLUSH_INTERVAL,
+        max_open_steps: int = AUDIT_COLUMNAR_OPEN_STEPS,
+        max_pending: int = AUDIT_COLUMNAR_MAX_PENDING,
+        metrics: MetricsRegistry | None = None,
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown audit format {format!r}, expected one of {FORMATS}")
+        self.path = Path(path)
+        self.format = format
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_open_steps = max_open_steps
+        self.max_pending = max_pending
+        self.metrics = metrics or MetricsRegistry()
+        # Rows as JSON lines, staged to a file and bulk-loaded on flush
+        self._rows: List[str] = []
+        self._last_flush = time.monotonic()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        # workflow_id -> (step, started_at, adapter, method) of its running step
+        self._open_steps: OrderedDict[str, Tuple[Any, datetime, Any, Any]] = OrderedDict()
+
+        schema = ", ".join(f"{name} {kind}" for name, kind in COLUMNS.items())
+        if format == "duckdb":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                self._db = duckdb.connect(str(self.path))
+            except duckdb.IOException as exc:
+                raise RuntimeError(
+                    f"{self.path} is open in another process; a DuckDB audit file takes a "
+                    "single writer, use format='parquet' with several workers"
+                ) from exc
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} ({schema})")
+            self._staging = self.path.with_name(f"{self.path.name}.{os.getpid()}.batch")
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._db = duckdb.connect()
+            self._staging = self.path / f".batch.{os.getpid()}.jsonl"
+            self._target = self.path.as_posix().replace("'", "''")
+            self._create_view()
+        # One thread owns the connection: batches load in order, off the caller
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="columnar-audit")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def write(self, record: dict):
+        self._rows.append(json.dumps(self._row(record), default=json_default))
+        self.metrics.increment("columnar_audit.events")
+        if len(self._rows) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> Future | None:
+        """
+        Hands the buffered rows to the writer thread; returns the load's
+        future (None when nothing was buffered or the batch was dropped).
+        """
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return None
+        rows, self._rows = self._rows, []
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.metrics.increment("columnar_audit.dropped", len(rows))
+                return None
+            self._pending += 1
+        future = self._writer.submit(self._load, rows)
+        future.add_done_callback(self._loaded)
+        return future
+
+    def close(self):
+        if self._db is not None:
+            self.flush()
+            self._writer.shutdown(wait=True)
+            self._db.close()
+            self._db = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def query(self, sql: str, params: Optional[list] = None) -> List[tuple]:
+        self.flush()
+        return self._writer.submit(self._query, sql, params or []).result()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _row(self, record: dict) -> dict:
+        workflow_id = record["workflow_id"]
+        event_type = self._text(record["event_type"])
+        payload = record.get("payload") or {}
+        timestamp = datetime.fromisoformat(record["timestamp"])
+        adapter = payload.get("adapter")
+        method = payload.get("method")
+        step = payload.get("step")
+        latency = payload.get("latency_ms")
+
+        if event_type == "ACTION_STARTED":
+            self._open_steps[workflow_id] = (step, timestamp, adapter, method)
+            self._open_steps.move_to_end(workflow_id)
+            if len(self._open_steps) > self.max_open_steps:
+                self._open_steps.popitem(last=False)
+        elif step is not None and workflow_id in self._open_steps:
+            open_step, started_at, open_adapter, open_method = self._open_steps[workflow_id]
+            if open_step == step:
+                adapter = adapter or open_adapter
+                method = method or open_method
+                if latency is None:
+                    latency = (timestamp - started_at).total_seconds() * 1000
+
+        return {
+            "timestamp": record["timestamp"],
+            "workflow_id": workflow_id,
+            "event_type": event_type,
+            "adapter": adapter,
+            "method": method,
+            "step": step if isinstance(step, int) else None,
+            "decision": self._decision(payload.get("decision")),
+            "latency_ms": latency if isinstance(latency, (int, float)) else None,
+            "payload": payload,
+        }
+
+    @staticmethod
+    def _text(value) -> str:
+        return value.value if isinstance(value, Enum) else str(value)
+
+    @staticmethod
+    def _decision(value) -> str | None:
+        if value is None:
+            return None
+        # Logged both as "RETRY" and as str(RecoveryDecision.RETRY)
+        return ColumnarAuditSink._text(value).rpartition(".")[2]
+
+    def _load(self, rows: List[str]):
+        """
+        Writer thread: bulk-loads one batch through a staged NDJSON file.
+        """
+        started = time.perf_counter()
+        self._staging.write_text("\n".join(rows) + "\n")
+        try:
+            if self.format == "duckdb":
+                self._db.execute(f"INSERT INTO {TABLE} {BATCH_SQL}", [str(self._staging)])
+            else:
+                self._db.execute(
+                    f"COPY (SELECT *, strftime(timestamp, '%Y-%m-%dT%H') AS hour FROM ({BATCH_SQL})) "
+                    f"TO '{self._target}' "
+                    "(FORMAT PARQUET, PARTITION_BY (hour), APPEND)",
+                    [str(self._staging)],
+                )
+        finally:
+            self._staging.unlink(missing_ok=True)
+        self.metrics.increment("columnar_audit.flushes")
+        self.metrics.increment("columnar_audit.rows", len(rows))
+        self.metrics.observe("columnar_audit.flush_seconds", time.perf_counter() - started)
+
+    def _loaded(self, future: Future):
+        with self._pending_lock:
+            self._pending -= 1
+        if future.exception() is not None:
+            self.metrics.increment("columnar_audit.flush_failures")
+            logger.error("Columnar audit batch failed to load", exc_info=future.exception())
+
+    def _query(self, sql: str, params: list) -> List[tuple]:
+        if self.format == "parquet" and not self._has_files:
+            # Other processes may have written files since
+            self._create_view()
+        return self._db.execute(sql, params).fetchall()
+
+    def _create_view(self):
+        self._has_files = any(self.path.glob("hour=*/*.parquet"))
+        if self._has_files:
+            source = (
+                f"SELECT * EXCLUDE (hour) FROM read_parquet('{self._target}/*/*.parquet', "
+                "hive_partitioning = true, hive_types = {'hour': VARCHAR})"
+            )
+        else:
+            # Nothing written yet: an empty relation with the same columns
+            source = "SELECT " + ", ".join(f"NULL::{kind} AS {name}" for name, kind in COLUMNS.items()) + " WHERE false"
+        self._db.execute(f"CREATE OR REPLACE VIEW {TABLE} AS {source}")
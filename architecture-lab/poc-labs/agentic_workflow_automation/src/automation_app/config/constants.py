@@ -1,8 +1,176 @@
 from enum import Enum
 
 HITL_TIMEOUT_SECONDS = 3600
+# How long idempotency keys dedupe repeated submissions. Client-supplied keys
+# are kept for a day; keys derived from the request itself only absorb
+# short-lived client retries.
+IDEMPOTENCY_TTL_SECONDS = 86400
+DERIVED_IDEMPOTENCY_TTL_SECONDS = 60
+# In-memory session retention. A session expires once it has not been
+# written for the TTL of its state ("*" for the rest); terminal sessions go
+# sooner, while PROPOSED outlives HITL_TIMEOUT_SECONDS so stale proposals are
+# still auto-rejected (and audited) first. Past SESSION_MAX_ENTRIES sessions
+# or roughly SESSION_MAX_BYTES of serialized data (None = unbounded), the
+# least recently used sessions are evicted. Expired sessions are dropped on
+# access and swept by the periodic HITL cleanup.
+SESSION_TTLS = {
+    "*": 86400.0,
+    "PROPOSED": 2 * HITL_TIMEOUT_SECONDS,
+    "COMPLETED": 900.0,
+    "REJECTED": 900.0,
+}
+SESSION_MAX_ENTRIES = 100_000
+SESSION_MAX_BYTES = 256 * 1024 * 1024
+# Sessions in these states are mid-execution and never evicted by the caps
+# above (their TTL still applies); stored plans count against the byte cap.
+SESSION_PINNED_STATES = ("CONFIRMED", "EXECUTING", "IN PROGRESS")
+# Stored plans live as long as a session references them (by plan_hash);
+# once unreferenced they are dropped by the sweep after PLAN_ORPHAN_TTL
+# seconds, which covers the gap between save_plan and the session update.
+PLAN_ORPHAN_TTL = 300.0
+# Hold session data msgpack-encoded (plan actions with interned adapter and
+# method names), decoded on read. Trades CPU per read for memory per session.
+COMPACT_SESSIONS = False
+# Restart survivability for the in-memory store: every mutation is appended
+# to a log under STATE_LOG_DIR (None = disabled), fsynced in groups collected
+# over STATE_LOG_COMMIT_INTERVAL seconds, and compacted into a snapshot once
+# STATE_LOG_SNAPSHOT_BYTES of log have accumulated. Snapshots are packed and
+# written STATE_LOG_SNAPSHOT_CHUNK bytes at a time.
+STATE_LOG_DIR = None
+STATE_LOG_COMMIT_INTERVAL = 0.002
+STATE_LOG_SNAPSHOT_BYTES = 64 * 1024 * 1024
+STATE_LOG_SNAPSHOT_CHUNK = 1024 * 1024
+# Write-behind tier in front of a durable store: dirty sessions are written
+# back every WRITE_BEHIND_FLUSH_INTERVAL seconds (updates within the window
+# coalesce); a writer reaching WRITE_BEHIND_MAX_DIRTY pending sessions
+# flushes inline. Reads are cached for the WRITE_BEHIND_CACHE_ENTRIES most
+# recently used sessions (the backend holds the rest).
+WRITE_BEHIND_FLUSH_INTERVAL = 0.05
+WRITE_BEHIND_MAX_DIRTY = 10_000
+WRITE_BEHIND_CACHE_ENTRIES = 10_000
+# Shared session state for horizontally scaled deployments: with REDIS_URL
+# set (e.g. "redis://localhost:6379/0"; None = in-process store), sessions,
+# plans and idempotency keys live in Redis under REDIS_KEY_PREFIX, reached
+# through a pool of at most REDIS_MAX_CONNECTIONS connections per process.
+REDIS_URL = None
+REDIS_KEY_PREFIX = "automation:"
+REDIS_MAX_CONNECTIONS = 50
+# Sessions shared by the worker processes of one host: with
+# SHARED_SESSIONS_PATH set (a file, ideally on tmpfs such as /dev/shm;
+# None = per-process store), every worker maps the same table of
+# SHARED_SESSIONS_SLOTS slots of SHARED_SESSIONS_SLOT_BYTES each. A session
+# must encode to fit one slot. The file is sparse, only written slots use memory.
+SHARED_SESSIONS_PATH = None
+SHARED_SESSIONS_SLOTS = 16_384
+SHARED_SESSIONS_SLOT_BYTES = 8192
+# Queryable audit trail: with AUDIT_STORE_DIR set (None = logger only),
+# audit records are also appended to segment files of AUDIT_SEGMENT_BYTES,
+# indexed by workflow. Each worker process writes its own directory below
+# it and keeps its newest AUDIT_MAX_SEGMENTS segments. The index keeps one
+# offset per workflow and AUDIT_INDEX_BLOCK_BYTES block it has events in.
+AUDIT_STORE_DIR = None
+AUDIT_SEGMENT_BYTES = 64 * 1024 * 1024
+AUDIT_MAX_SEGMENTS = 32
+AUDIT_INDEX_BLOCK_BYTES = 64 * 1024
+# Columnar audit analytics: with AUDIT_COLUMNAR_PATH set (None = off), audit
+# events are appended as typed rows to a DuckDB file, or to hourly Parquet
+# files under that directory when AUDIT_COLUMNAR_FORMAT is "parquet". A DuckDB
+# file takes one writing process: run several workers with "parquet". Rows are
+# loaded by a background thread AUDIT_COLUMNAR_BATCH at a time or every
+# AUDIT_COLUMNAR_FLUSH_INTERVAL seconds, with at most AUDIT_COLUMNAR_MAX_PENDING
+# batches queued (later ones are dropped); step latency is tracked for the
+# last AUDIT_COLUMNAR_OPEN_STEPS workflows with a running step.
+AUDIT_COLUMNAR_PATH = None
+AUDIT_COLUMNAR_FORMAT = "duckdb"
+AUDIT_COLUMNAR_BATCH = 1000
+AUDIT_COLUMNAR_FLUSH_INTERVAL = 5.0
+AUDIT_COLUMNAR_MAX_PENDING = 8
+AUDIT_COLUMNAR_OPEN_STEPS = 10_000
+# Page size for walking sessions by state (HITL cleanup, admin listing cap)
+SESSION_PAGE_SIZE = 500
+# Session ids are the only credential /confirm and /reject check, so the
+# routes that list them (/admin/sessions, /audit/{session_id}) are only
+# served with ADMIN_TOKEN set (None = not served), to callers sending it in
+# the X-Admin-Token header.
+ADMIN_TOKEN = None
 MAX_RETRIES = 3
 BASE_BACKOFF = 0.5
+MAX_BACKOFF = 10.0
+# Backoff jitter strategy: "full", "decorrelated" or "none"
+BACKOFF_JITTER = "full"
+# Wall-clock budget (seconds) for executing a whole plan, keyed by plan type
+# (the classified intent name). "*" applies to plan types without an entry.
+PLAN_TIME_BUDGETS = {
+    "*": 120.0,
+    "REQUEST_TIME_OFF": 60.0,
+    "SEND_EMAIL": 30.0,
+    "CREATE_CALENDAR_EVENT": 30.0,
+}
+# Self-correction limits: repaired plans re-run at most MAX_REPLAN_DEPTH times
+# and only within REPLAN_TIME_BUDGET seconds of the first failure. Repairs are
+# memoized per (plan, failed action, decision), keeping the last REPLAN_MEMO_SIZE;
+# failures the planner could not repair are asked again next time.
+MAX_REPLAN_DEPTH = 3
+REPLAN_TIME_BUDGET = 30.0
+REPLAN_MEMO_SIZE = 512
+# Saga compensation: attempts per step (exponential backoff from
+# COMPENSATION_BACKOFF seconds) before the step is reported as failed.
+COMPENSATION_MAX_ATTEMPTS = 3
+COMPENSATION_BACKOFF = 0.05
+# Bounds for the adaptive, per-adapter retry policy learned by RecoveryEngine
+ADAPTIVE_RETRY = {
+    "min_retries": 2,
+    "max_retries": 5,
+    "min_backoff": 0.1,
+    "max_backoff": MAX_BACKOFF,
+    "alpha": 0.2,
+    "min_samples": 20,
+}
+
+# Tenant-wide throttles per adapter. "*" is the adapter-wide default shared
+# by every method without its own entry.
+ADAPTER_LIMITS = {
+    "Workday": {
+        "*": {"max_concurrent": 4, "rate_per_second": 5.0, "burst": 5},
+    },
+    "MSGraph": {
+        "*": {"max_concurrent": 8, "rate_per_second": 10.0, "burst": 10},
+        "send_email": {"max_concurrent": 2, "rate_per_second": 2.0, "burst": 2},
+    },
+}
+
+# Circuit breaker settings per adapter; "*" applies to adapters without an entry.
+CIRCUIT_BREAKERS = {
+    "*": {"failure_threshold": 5, "reset_timeout": 30.0, "half_open_max_calls": 1},
+    "Workday": {"failure_threshold": 3, "reset_timeout": 60.0, "half_open_max_calls": 1},
+}
+
+# Retries allowed as a fraction of successful calls, plus a small per-second
+# reserve so low-traffic adapters can still retry. "global" caps the whole
+# fleet, "*" is the per-adapter default.
+RETRY_BUDGETS = {
+    "global": {"retry_ratio": 0.2, "min_retries_per_second": 5.0},
+    "*": {"retry_ratio": 0.2, "min_retries_per_second": 1.0},
+}
+
+# Hedged requests for idempotent reads: a second attempt is issued once the
+# first is slower than this latency percentile (or the default delay while
+# fewer than HEDGE_MIN_SAMPLES latencies have been observed).
+HEDGE_PERCENTILE = 95.0
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 0.25
+
+# Speculative prefetch of idempotent reads while a proposal awaits
+# confirmation. Results are reused on confirm if fresher than the TTL of
+# their "adapter.method" ("*" for the rest). Only the most recent
+# PREFETCH_MAX_PROPOSALS proposals keep results.
+PREFETCH_ON_PROPOSE = True
+PREFETCH_TTLS = {
+    "*": 30.0,
+    "Workday.get_pto_balance": 300.0,
+    "MSGraph.check_calendar_availability": 60.0,
+}
+PREFETCH_MAX_PROPOSALS = 1024
 
 class RecoveryDecision(Enum):
     RETRY = "RETRY"
@@ -10,4 +178,12 @@ class RecoveryDecision(Enum):
     FAIL = "FAIL"
     PERMISSION = "PERMISSION"
     UNKNOWN = "UNKNOWN"
-    NOT_SUPPORTED = "NOT_SUPPORTED"
\ No newline at end of file
+    NOT_SUPPORTED = "NOT_SUPPORTED"
+    CIRCUIT_OPEN = "CIRCUIT_OPEN"
+    RETRY_BUDGET_EXHAUSTED = "RETRY_BUDGET_EXHAUSTED"
+    DEADLINE_EXCEEDED = "DEADLINE_EXCEEDED"
+
+class CircuitState(str, Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
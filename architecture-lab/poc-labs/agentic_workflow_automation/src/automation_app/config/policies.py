@@ -18,6 +18,19 @@ POLICY_RULES = [
         },
     },
 
+    {
+        "id": "WD-ALLOW-PTO-BALANCE",
+        "description": "Allow HR, Manager, and Employees to read their PTO balance",
+        "effect": "allow",
+        "target": {
+            "adapter": "Workday",
+            "method": "get_pto_balance",
+        },
+        "conditions": {
+            "roles": ["HR", "Manager", "Employee"],
+        },
+    },
+
     # -------------------------------------------------
     # MS Graph
     # -------------------------------------------------
@@ -48,6 +61,19 @@ POLICY_RULES = [
         },
     },
 
+    {
+        "id": "MSG-ALLOW-CALENDAR-AVAILABILITY",
+        "description": "Allow employees and managers to check calendar availability",
+        "effect": "allow",
+        "target": {
+            "adapter": "MSGraph",
+            "method": "check_calendar_availability",
+        },
+        "conditions": {
+            "roles": ["Employee", "Manager", "HR"],
+        },
+    },
+
     {
         "id": "MSG-DENY-INTERN-EMAIL",
         "description": "Prevent interns from sending emails",
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict
+
+from automation_app.utils.metrics import MetricsRegistry
+
+ADAPTER_WIDE = "*"
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second, bursting up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._last = clock()
+
+    def delay(self) -> float:
+        """
+        Seconds until one token is available (0 if one is available now).
+        """
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    def put_back(self):
+        """
+        Returns a token taken by `take()` whose use was called off.
+        """
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+
+class FairLimiter:
+    """
+    Concurrency + rate limiter for a single (adapter, method) key.
+
+    Waiters are queued per session and served round-robin, so one session
+    with a large plan cannot starve the others behind a tenant-wide throttle.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int | None = None,
+        rate_per_second: float | None = None,
+        burst: float | None = None,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.bucket = TokenBucket(rate_per_second, burst) if rate_per_second else None
+        self.metrics = metrics or MetricsRegistry()
+        self.in_flight = 0
+        self._waiters: "OrderedDict[Any, Deque[asyncio.Future]]" = OrderedDict()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def acquire(self, session_id: str | None):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        if not self._waiters and self._try_admit():
+            self._record_wait(0.0)
+            return
+
+        waiter = loop.create_future()
+        self._waiters.setdefault(session_id, deque()).append(waiter)
+        self._publish_queue_depth()
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just as we were cancelled: hand it back.
+                self.release()
+            raise
+
+        self._record_wait(loop.time() - started)
+
+    def release(self):
+        self.in_flight -= 1
+        self.metrics.set_gauge("adapter_limiter.in_flight", self.in_flight, key=self.name)
+        self._dispatch()
+
+    def queue_depth(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _has_capacity(self) -> bool:
+        return self.max_concurrent is None or self.in_flight < self.max_concurrent
+
+    def _try_admit(self) -> bool:
+        if not self._has_capacity():
+            return False
+        if self.bucket and self.bucket.delay() > 0:
+            return False
+        self._admit()
+        return True
+
+    def _admit(self):
+        if self.bucket:
+            self.bucket.take()
+        self.in_flight += 1
+        self.metrics.set_gauge("adapter_limiter.in_flight", self.in_flight, key=self.name)
+
+    def _dispatch(self):
+        while self._waiters and self._has_capacity():
+            delay = self.bucket.delay() if self.bucket else 0.0
+            if delay > 0:
+                self._schedule(delay)
+                break
+
+            session_id, queue = next(iter(self._waiters.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(session_id)
+            else:
+                del self._waiters[session_id]
+
+            if waiter.cancelled():
+                continue
+
+            self._admit()
+            waiter.set_result(None)
+
+        self._publish_queue_depth()
+
+    def _schedule(self, delay: float):
+        if self._timer is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def _record_wait(self, seconds: float):
+        self.metrics.observe("adapter_limiter.wait_seconds", seconds, key=self.name)
+
+    def _publish_queue_depth(self):
+        self.metrics.set_gauge("adapter_limiter.queue_depth", self.queue_depth(), key=self.name)
+
+
+class AdapterLimiter:
+    """
+    Registry of per-adapter / per-method limiters shared by every execution.
+
+    `limits` maps adapter -> method -> {"max_concurrent", "rate_per_second", "burst"}.
+    The "*" method entry is the adapter-wide limit, shared by all methods
+    without their own entry. Adapters without configuration are unlimited.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, dict]] | None = None, metrics=None):
+        self.limits = limits or {}
+        self.metrics = metrics or MetricsRegistry()
+        self._limiters: Dict[str, FairLimiter] = {}
+
+    @asynccontextmanager
+    async def limit(self, adapter: str, method: str, session_id: str | None = None):
+        limiter = self._limiter_for(adapter, method)
+        if limiter is None:
+            yield
+            return
+
+        await limiter.acquire(session_id)
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def snapshot(self) -> dict:
+        return {
+            key: {
+                "in_flight": limiter.in_flight,
+                "queued": limiter.queue_depth(),
+                "max_concurrent": limiter.max_concurrent,
+            }
+            for key, limiter in self._limiters.items()
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _limiter_for(self, adapter: str, method: str) -> FairLimiter | None:
+        adapter_limits = self.limits.get(adapter)
+        if not adapter_limits:
+            return None
+
+        scope = method if method in adapter_limits else ADAPTER_WIDE
+        config = adapter_limits.get(scope)
+        if not config:
+            return None
+
+        key = f"{adapter}.{scope}"
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = FairLimiter(key, metrics=self.metrics, **config)
+            self._limiters[key] = limiter
+        return limiter
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int
+    base_backoff: float
+
+
+class AdapterStats:
+    """
+    Rolling (EWMA) health statistics for one adapter method.
+    """
+
+    __slots__ = ("alpha", "samples", "latency", "error_rate", "time_to_recover", "_failing_since")
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.samples = 0
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.time_to_recover: float | None = None
+        self._failing_since: float | None = None
+
+    def record(self, latency: float, failed: bool, transient: bool, now: float):
+        self.samples += 1
+        self.latency = self._ewma(self.latency, latency)
+        self.error_rate = self._ewma(self.error_rate, 1.0 if failed else 0.0)
+
+        if failed and transient and self._failing_since is None:
+            self._failing_since = now
+        elif not failed and self._failing_since is not None:
+            self.time_to_recover = self._ewma(self.time_to_recover, now - self._failing_since)
+            self._failing_since = None
+
+    def snapshot(self) -> dict:
+        return {
+            "samples": self.samples,
+            "latency_ewma": self.latency,
+            "error_rate_ewma": round(self.error_rate, 4),
+            "time_to_recover_ewma": self.time_to_recover,
+        }
+
+    def _ewma(self, current: float | None, value: float) -> float:
+        if current is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * current
+
+
+class AdaptiveRetryPolicy:
+    """
+    Derives per-adapter/method retry counts and backoff from observed stats.
+
+    - Attempts: smallest n with error_rate ** n <= target_failure, so flaky
+      methods get more attempts; a method that is effectively down
+      (error_rate >= outage_error_rate) gets the minimum.
+    - Backoff: spread the observed time-to-recover over the retries; falls
+      back to a multiple of the EWMA latency.
+    Everything is clamped to the configured bounds and the static defaults
+    are used until `min_samples` observations exist.
+    """
+
+    def __init__(
+        self,
+        default_retries: int = 3,
+        default_backoff: float = 0.5,
+        min_retries: int = 2,
+        max_retries: int = 5,
+        min_backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        alpha: float = 0.2,
+        min_samples: int = 20,
+        target_failure: float = 0.01,
+        outage_error_rate: float = 0.9,
+        clock=time.monotonic,
+    ):
+        self.default = RetryPolicy(default_retries, default_backoff)
+        self.min_retries = min_retries
+        self.max_retries = max_retries
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.target_failure = target_failure
+        self.outage_error_rate = outage_error_rate
+        self._clock = clock
+        self._stats: Dict[Tuple[str, str], AdapterStats] = {}
+
+    def record(self, adapter: str, method: str, latency: float, failed: bool, transient: bool = False):
+        key = (adapter, method)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = AdapterStats(self.alpha)
+        stats.record(latency, failed, transient, self._clock())
+
+    def policy_for(self, adapter: str | None, method: str | None) -> RetryPolicy:
+        stats = self._stats.get((adapter, method))
+        if stats is None or stats.samples < self.min_samples:
+            return self.default
+
+        return RetryPolicy(
+            max_retries=self._derive_retries(stats.error_rate),
+            base_backoff=self._derive_backoff(stats),
+        )
+
+    def snapshot(self) -> dict:
+        """
+        Current stats and the policy applied for every observed adapter method.
+        """
+        snapshot = {}
+        for (adapter, method), stats in self._stats.items():
+            policy = self.policy_for(adapter, method)
+            snapshot[f"{adapter}.{method}"] = {
+                **stats.snapshot(),
+                "max_retries": policy.max_retries,
+                "base_backoff": policy.base_backoff,
+            }
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _derive_retries(self, error_rate: float) -> int:
+        if error_rate >= self.outage_error_rate:
+            return self.min_retries
+        if error_rate <= 0:
+            return self.min_retries
+
+        attempts = math.ceil(math.log(self.target_failure) / math.log(error_rate))
+        return max(self.min_retries, min(self.max_retries, attempts))
+
+    def _derive_backoff(self, stats: AdapterStats) -> float:
+        if stats.time_to_recover is not None:
+            backoff = stats.time_to_recover / 2
+        elif stats.latency is not None:
+            backoff = stats.latency * 2
+        else:
+            backoff = self.default.base_backoff
+        return max(self.min_backoff, min(self.max_backoff, backoff))
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import time
+from typing import Dict
+
+from automation_app.audit.audit_logger import AuditLogger
+from automation_app.config.constants import CircuitState
+from automation_app.utils.metrics import MetricsRegistry
+
+DEFAULT_SCOPE = "*"
+
+_STATE_GAUGE = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for a single adapter.
+
+    - CLOSED: calls flow, consecutive transient failures are counted
+    - OPEN: calls fail fast until `reset_timeout` has elapsed
+    - HALF_OPEN: at most `half_open_max_calls` probes are let through;
+      a successful probe closes the circuit, a failed one re-opens it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        on_transition=None,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.on_transition = on_transition
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def allow_request(self, session_id: str | None = None) -> bool:
+        if self._state == CircuitState.OPEN:
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._transition(CircuitState.HALF_OPEN, session_id)
+
+        if self._state == CircuitState.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                return False
+            self._probes_in_flight += 1
+
+        return True
+
+    def record_success(self, session_id: str | None = None):
+        self._failures = 0
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = 0
+            self._transition(CircuitState.CLOSED, session_id)
+
+    def record_failure(self, session_id: str | None = None):
+        if self._state == CircuitState.HALF_OPEN:
+            self._open(session_id)
+            return
+
+        self._failures += 1
+        if self._state == CircuitState.CLOSED and self._failures >= self.failure_threshold:
+            self._open(session_id)
+
+    def release(self):
+        """
+        Frees a half-open probe slot without an outcome (e.g. cancelled call,
+        or an error that says nothing about adapter health).
+        """
+        if self._state == CircuitState.HALF_OPEN and self._probes_in_flight:
+            self._probes_in_flight -= 1
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _open(self, session_id: str | None):
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+        self._transition(CircuitState.OPEN, session_id)
+
+    def _transition(self, new_state: CircuitState, session_id: str | None):
+        old_state = self._state
+        if old_state == new_state:
+            return
+        self._state = new_state
+        if new_state == CircuitState.CLOSED:
+            self._failures = 0
+        if self.on_transition:
+            self.on_transition(self, old_state, new_state, session_id)
+
+
+class CircuitBreakerRegistry:
+    """
+    Lazily creates one CircuitBreaker per adapter and reports transitions
+    to metrics and the audit log.
+
+    `config` maps adapter -> breaker kwargs; "*" is the fallback entry.
+    """
+
+    def __init__(self, config: Dict[str, dict] | None = None, metrics=None, auditor=AuditLogger):
+        self.config = config or {}
+        self.metrics = metrics or MetricsRegistry()
+        self.auditor = auditor
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, adapter: str) -> CircuitBreaker:
+        breaker = self._breakers.get(adapter)
+        if breaker is None:
+            settings = self.config.get(adapter) or self.config.get(DEFAULT_SCOPE, {})
+            breaker = CircuitBreaker(adapter, on_transition=self._on_transition, **settings)
+            self._breakers[adapter] = breaker
+            self.metrics.set_gauge("circuit_breaker.state", _STATE_GAUGE[breaker.state], adapter=adapter)
+        return breaker
+
+    def snapshot(self) -> Dict[str, str]:
+        return {name: breaker.state.value for name, breaker in self._breakers.items()}
+
+    def _on_transition(self, breaker: CircuitBreaker, old: CircuitState, new: CircuitState, session_id):
+        self.metrics.set_gauge("circuit_breaker.state", _STATE_GAUGE[new], adapter=breaker.name)
+        self.metrics.increment("circuit_breaker.transitions", adapter=breaker.name, to=new.value)
+        self.auditor.log(
+            session_id,
+            "CIRCUIT_STATE_CHANGED",
+            {"adapter": breaker.name, "from": old.value, "to": new.value},
+        )
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Dict, Iterable, Type
+
+from automation_app.config.constants import RecoveryDecision
+
+DEFAULT_EXCEPTION_TYPES = {
+    asyncio.TimeoutError: RecoveryDecision.RETRY,
+    TimeoutError: RecoveryDecision.RETRY,
+    ConnectionError: RecoveryDecision.RETRY,
+    PermissionError: RecoveryDecision.PERMISSION,
+    NotImplementedError: RecoveryDecision.NOT_SUPPORTED,
+}
+
+DEFAULT_STATUS_CODES = {
+    408: RecoveryDecision.RETRY,
+    429: RecoveryDecision.RETRY,
+    502: RecoveryDecision.RETRY,
+    503: RecoveryDecision.RETRY,
+    504: RecoveryDecision.RETRY,
+    401: RecoveryDecision.PERMISSION,
+    403: RecoveryDecision.PERMISSION,
+    405: RecoveryDecision.NOT_SUPPORTED,
+    501: RecoveryDecision.NOT_SUPPORTED,
+}
+
+# Message keywords, checked in priority order when nothing structured matched
+DEFAULT_KEYWORDS = {
+    RecoveryDecision.RETRY: [
+        "timeout",
+        "temporarily unavailable",
+        "rate limit",
+        "connection reset",
+        "503",
+    ],
+    RecoveryDecision.PERMISSION: [
+        "permission",
+        "not authorized",
+        "forbidden",
+        "403",
+    ],
+    RecoveryDecision.NOT_SUPPORTED: [
+        "not supported",
+        "unsupported action",
+        "unknown method",
+    ],
+}
+
+
+class ErrorClassifier:
+    """
+    Maps adapter failures to a RecoveryDecision.
+
+    Lookup order:
+    1. Exception type (MRO-aware, memoized per concrete type)
+    2. HTTP status (`status_code` / `status` / `response.status_code`)
+    3. Pre-compiled keyword scan of the message (fallback)
+
+    Adapters can register their own exception types and status codes.
+    """
+
+    def __init__(
+        self,
+        exception_types: Dict[Type[BaseException], RecoveryDecision] | None = None,
+        status_codes: Dict[int, RecoveryDecision] | None = None,
+        keywords: Dict[RecoveryDecision, Iterable[str]] | None = None,
+    ):
+        self._exception_types = dict(DEFAULT_EXCEPTION_TYPES if exception_types is None else exception_types)
+        self._status_codes = dict(DEFAULT_STATUS_CODES if status_codes is None else status_codes)
+        self._keyword_patterns = [
+            (decision, re.compile("|".join(re.escape(k) for k in words), re.IGNORECASE))
+            for decision, words in (DEFAULT_KEYWORDS if keywords is None else keywords).items()
+            if words
+        ]
+        self._type_cache: Dict[type, RecoveryDecision | None] = {}
+
+    def register_exception(self, exc_type: Type[BaseException], decision: RecoveryDecision):
+        self._exception_types[exc_type] = decision
+        self._type_cache.clear()
+
+    def register_status(self, status: int, decision: RecoveryDecision):
+        self._status_codes[status] = decision
+
+    def classify(self, exc: BaseException) -> RecoveryDecision:
+        decision = self._by_type(type(exc))
+        if decision is not None:
+            return decision
+
+        status = self._status_of(exc)
+        if status is not None and status in self._status_codes:
+            return self._status_codes[status]
+
+        message = str(exc)
+        for decision, pattern in self._keyword_patterns:
+            if pattern.search(message):
+                return decision
+
+        return RecoveryDecision.UNKNOWN
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _by_type(self, exc_type: type) -> RecoveryDecision | None:
+        if exc_type in self._type_cache:
+            return self._type_cache[exc_type]
+
+        decision = None
+        for klass in exc_type.__mro__:
+            if klass in self._exception_types:
+                decision = self._exception_types[klass]
+                break
+
+        self._type_cache[exc_type] = decision
+        return decision
+
+    @staticmethod
+    def _status_of(exc: BaseException) -> int | None:
+        for attr in ("status_code", "status"):
+            status = getattr(exc, attr, None)
+            if isinstance(status, int):
+                return status
+
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+        return status if isinstance(status, int) else None
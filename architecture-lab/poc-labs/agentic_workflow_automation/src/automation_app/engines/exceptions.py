@@ -14,3 +14,48 @@ class ActionFailure(Exception):
         self.decision = decision
         self.original = original
         super().__init__(str(original))
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an adapter whose circuit breaker is open.
+    """
+
+    def __init__(self, adapter: str):
+        self.adapter = adapter
+        super().__init__(f"Circuit open for adapter '{adapter}'")
+
+
+class DeadlineExceededError(Exception):
+    """
+    Raised when a plan's time budget runs out before an action completes.
+    """
+
+    def __init__(self, adapter: str | None, step_idx: int):
+        self.adapter = adapter
+        self.step_idx = step_idx
+        super().__init__(f"Plan deadline exceeded at step {step_idx} (adapter '{adapter}')")
+
+
+class PlanValidationError(Exception):
+    """
+    Raised when a plan cannot be compiled (unknown adapter or unsupported
+    action), before any of its steps has run.
+    """
+
+    def __init__(self, step_idx: int, action, reason: str):
+        self.step_idx = step_idx
+        self.action = action
+        super().__init__(reason)
+
+
+class RetryDeferred(Exception):
+    """
+    Raised instead of sleeping through a retry backoff when the caller parks
+    retries itself; pass it back as `resume` once `delay` has elapsed.
+    """
+
+    def __init__(self, delay: float, attempt: int):
+        self.delay = delay
+        self.attempt = attempt
+        super().__init__(f"Attempt {attempt} deferred by {delay:.3f}s")
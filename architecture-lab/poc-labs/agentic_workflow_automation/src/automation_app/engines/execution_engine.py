@@ -1,16 +1,32 @@
 from __future__ import annotations
 
-import asyncio
+import random
+import time
 import traceback
+from collections import OrderedDict
+from functools import partial
 from typing import Any
 
 from automation_app.audit.audit_logger import AuditLogger
-from automation_app.config.constants import RecoveryDecision
-from automation_app.engines.exceptions import ActionFailure
+from automation_app.config.constants import (
+    MAX_REPLAN_DEPTH,
+    RecoveryDecision,
+    REPLAN_MEMO_SIZE,
+    REPLAN_TIME_BUDGET,
+)
+from automation_app.engines.adapter_limiter import AdapterLimiter
+from automation_app.engines.exceptions import ActionFailure, PlanValidationError, RetryDeferred
+from automation_app.engines.hedging import HedgedCaller
+from automation_app.engines.plan_compiler import MethodBinding, PlanCompiler
+from automation_app.engines.plan_run import PlanRun
+from automation_app.engines.prefetch_cache import PrefetchCache
 from automation_app.engines.recovery_engine import RecoveryEngine
+from automation_app.engines.saga_coordinator import AdapterSagaStep, SagaCoordinator
 from automation_app.models.action import Action
+from automation_app.models.executed_step import ExecutedStep
 from automation_app.models.plan import Plan
 from automation_app.models.workflow_state import WorkflowState
+from automation_app.utils.metrics import MetricsRegistry
 from automation_app.utils.pii_scrubber import PIIScrubber
 
 
@@ -22,7 +38,16 @@ class ExecutionEngine:
         auditor=AuditLogger,
         scrubber=None,
         recovery_engine=None,
-        planner=None
+        planner=None,
+        limiter=None,
+        hedger=None,
+        metrics=None,
+        prefetch_cache=None,
+        saga=None,
+        compiler=None,
+        max_replan_depth: int = MAX_REPLAN_DEPTH,
+        replan_time_budget: float = REPLAN_TIME_BUDGET,
+        trace_sample_rate: float = 0.0,
     ):
         self.adapters = adapters
         self.state_store = state_store
@@ -30,54 +55,201 @@ class ExecutionEngine:
         self.scrubber = scrubber or PIIScrubber()
         self.recovery = recovery_engine or RecoveryEngine()
         self.planner = planner
+        self.limiter = limiter or AdapterLimiter()
+        self.hedger = hedger or HedgedCaller()
+        self.metrics = metrics or MetricsRegistry()
+        self.prefetch_cache = prefetch_cache or PrefetchCache(metrics=self.metrics)
+        self.saga = saga or SagaCoordinator(metrics=self.metrics)
+        self.compiler = compiler or PlanCompiler()
+        self.max_replan_depth = max_replan_depth
+        self.replan_time_budget = replan_time_budget
+        self.trace_sample_rate = trace_sample_rate
+        # (plan hash, failed action, decision) -> repaired plan; "unrecoverable"
+        # is never cached, a planner may manage it on a later run
+        self._repair_memo: "OrderedDict[tuple, Plan]" = OrderedDict()
+        self._register_adapter_errors()
 
     # --------------------------------------------------
     # Public API
     # --------------------------------------------------
-    async def run(self, plan: Plan, session_id: str | None = None) -> bool:
+    async def run(
+        self,
+        plan: Plan,
+        session_id: str | None = None,
+        deadline: float | None = None,
+        proposal_id: str | None = None,
+    ) -> bool:
+        """
+        Executes the plan step by step. `deadline` is an absolute
+        `time.monotonic()` instant shared by every step (retries included);
+        when it passes, the in-flight call is cancelled and the plan is
+        rolled back without replanning.
+
+        Failed plans are repaired and re-run iteratively, bounded by
+        `max_replan_depth` repairs and `replan_time_budget` seconds.
+
+        With a `proposal_id`, fresh reads prefetched for that proposal are
+        reused instead of being called again.
+
+        The session ends COMPLETED or REJECTED (also when the run raises), so
+        it no longer counts as mid-execution for the store's caps.
+        """
+        return await self.advance(
+            PlanRun(plan, session_id=session_id, deadline=deadline, proposal_id=proposal_id)
+        )
+
+    async def advance(self, run: PlanRun) -> bool | PlanRun:
+        """
+        Runs `run` until it finishes (True / False, as `run`) or, with
+        `run.defer_retries`, until a step must back off: the run is then
+        returned, to be advanced again once `run.due` has passed.
+        """
+        outcome = False
+        try:
+            outcome = await self._run_with_replanning(run)
+            return outcome
+        finally:
+            if outcome is not run:
+                self.prefetch_cache.discard(run.proposal_id)
+                await self._save_outcome(run.session_id, outcome is True)
+
+    def start_prefetch(self, plan: Plan, session_id: str | None, proposal_id: str) -> int:
+        """
+        Launches the plan's idempotent reads in the background so that a later
+        `run(..., proposal_id=...)` can reuse them. Returns how many started.
+        """
+        started = 0
         for idx, action in enumerate(plan.actions):
-            scrubbed_params = self.scrubber.scrub_data(action.params)
+            adapter = self.adapters.get(action.adapter)
+            if not adapter or not self._is_action_supported(adapter, action.method):
+                continue
+            if not self._is_idempotent_read(adapter, action.method):
+                continue
 
-            self._audit(
-                session_id,
-                "ACTION_STARTED",
-                {
-                    "adapter": action.adapter,
-                    "method": action.method,
-                    "params": scrubbed_params,
-                    "step": idx,
-                },
+            fetch = partial(self._prefetch_action, action, adapter, session_id, idx)
+            started += self.prefetch_cache.start(proposal_id, action, fetch)
+        return started
+
+    def discard_prefetch(self, proposal_id: str | None):
+        self.prefetch_cache.discard(proposal_id)
+
+    async def _run_with_replanning(self, run: PlanRun) -> bool | PlanRun:
+        session_id, deadline = run.session_id, run.deadline
+
+        while True:
+            outcome = await self._run_plan(run)
+            if outcome is run:
+                return run
+            if not isinstance(outcome, tuple):
+                self._record_replan_outcome(run.depth, outcome)
+                return outcome
+
+            failed_action, decision = outcome
+            if run.replan_until is None:
+                run.replan_until = time.monotonic() + self.replan_time_budget
+                if deadline is not None:
+                    run.replan_until = min(run.replan_until, deadline)
+
+            repair_key = self._repair_key(run.plan, failed_action, decision)
+            limit = self._replan_limit(run.depth, run.replan_until, repair_key in run.tried)
+            if limit:
+                self.metrics.increment("replan.limit_reached", reason=limit)
+                self._audit(
+                    session_id,
+                    "REPLAN_LIMIT_REACHED",
+                    {"reason": limit, "depth": run.depth, "failed_action": failed_action.method},
+                )
+                self._record_replan_outcome(run.depth, False)
+                return False
+            run.tried.add(repair_key)
+
+            new_plan = await self._replan_on_failure(
+                plan=run.plan,
+                failed_action=failed_action,
+                decision=decision,
+                session_id=session_id,
             )
-            self._save_state(session_id, plan, idx, WorkflowState.EXECUTING)
+            if not new_plan:
+                self._record_replan_outcome(run.depth, False)
+                return False
 
-            adapter = self.adapters.get(action.adapter)
-            if not adapter:
+            run.restart(new_plan)
+            run.depth += 1
+
+    async def _run_plan(self, run: PlanRun):
+        """
+        One pass over `run.plan`, from the step it stopped at. Returns True on
+        success, False on a failure that must not be replanned, the (failed
+        action, decision) to repair, or `run` when a retry was deferred.
+        """
+        plan, session_id, deadline = run.plan, run.session_id, run.deadline
+        executed = run.executed
+
+        if run.bindings is None:
+            run.plan_hash = await self._store_plan(session_id, plan)
+            # Resolve and validate every step before any of them runs
+            try:
+                run.bindings = self.compiler.compile(
+                    plan,
+                    self.adapters,
+                    supports=self._is_action_supported,
+                    is_idempotent_read=self._is_idempotent_read,
+                )
+            except PlanValidationError as invalid:
+                await self._save_state(session_id, run.plan_hash, invalid.step_idx, WorkflowState.REJECTED)
                 await self._fail_fast(
                     session_id,
                     plan,
-                    idx,
-                    action,
-                    f"No adapter found for {action.adapter}",
+                    invalid.step_idx,
+                    invalid.action,
+                    str(invalid),
+                    executed,
                 )
                 return False
+        plan_hash = run.plan_hash
 
-            if not self._is_action_supported(adapter, action.method):
-                await self._fail_fast(
+        for idx in range(run.step, len(plan.actions)):
+            action, binding = plan.actions[idx], run.bindings[idx]
+            # A continued step has been announced (and its prefetch taken) already
+            resume, run.retry = run.retry, None
+            if resume is None:
+                self._audit(
                     session_id,
-                    plan,
-                    idx,
-                    action,
-                    f"Action '{action.method}' not supported by adapter '{action.adapter}'",
+                    "ACTION_STARTED",
+                    {
+                        "adapter": action.adapter,
+                        "method": action.method,
+                        "params": action.scrubbed_params(self.scrubber),
+                        "step": idx,
+                    },
                 )
-                return False
+                await self._save_state(session_id, plan_hash, idx, WorkflowState.EXECUTING)
 
             try:
-                await self._execute_action_with_recovery(
-                    action=action,
-                    adapter=adapter,
-                    session_id=session_id,
-                    step_idx=idx,
-                )
+                prefetched, result = False, None
+                if resume is None:
+                    prefetched, result = await self.prefetch_cache.take(
+                        run.proposal_id,
+                        action,
+                        timeout=None if deadline is None else max(0.0, deadline - time.monotonic()),
+                    )
+                if prefetched:
+                    self._audit(
+                        session_id,
+                        "PREFETCH_REUSED",
+                        {"adapter": action.adapter, "method": action.method, "step": idx},
+                    )
+                else:
+                    result = await self._execute_action_with_recovery(
+                        action=action,
+                        adapter=binding.adapter,
+                        session_id=session_id,
+                        step_idx=idx,
+                        deadline=deadline,
+                        binding=binding,
+                        defer=run.defer_retries,
+                        resume=resume,
+                    )
 
                 self._audit(
                     session_id,
@@ -88,7 +260,24 @@ class ExecutionEngine:
                         "step": idx,
                     },
                 )
-                self._save_state(session_id, plan, idx, WorkflowState.PROPOSED)
+                executed[idx] = ExecutedStep(action.adapter, action.method, action.params, result)
+                await self._save_state(session_id, plan_hash, idx, WorkflowState.PROPOSED)
+
+            except RetryDeferred as deferred:
+                run.step, run.retry = idx, deferred
+                run.due = time.monotonic() + deferred.delay
+                self._audit(
+                    session_id,
+                    "RETRY_DEFERRED",
+                    {
+                        "adapter": action.adapter,
+                        "method": action.method,
+                        "step": idx,
+                        "attempt": deferred.attempt,
+                        "delay": deferred.delay,
+                    },
+                )
+                return run
 
             except ActionFailure as failure:
                 self._audit(
@@ -100,19 +289,23 @@ class ExecutionEngine:
                         "step": idx,
                         "decision": failure.decision,
                         "error": str(failure.original),
-                        "trace": traceback.format_exc(),
+                        "trace": self._trace(failure),
                     },
                 )
-                self._save_state(session_id, plan, idx, WorkflowState.REJECTED)
+                await self._save_state(session_id, plan_hash, idx, WorkflowState.REJECTED)
 
-                await self.rollback(plan, up_to_step=idx, session_id=session_id)
+                await self.rollback(plan, up_to_step=idx, session_id=session_id, executed=executed)
 
-                return await self._replan_on_failure(
-                    plan=plan,
-                    failed_action=action,
-                    decision=failure.decision,
-                    session_id=session_id,
-                )
+                if failure.decision == RecoveryDecision.DEADLINE_EXCEEDED:
+                    # No budget left to run a repaired plan
+                    self._audit(
+                        session_id,
+                        "PLAN_DEADLINE_EXCEEDED",
+                        {"adapter": action.adapter, "method": action.method, "step": idx},
+                    )
+                    return False
+
+                return action, failure.decision
 
         return True
 
@@ -126,14 +319,27 @@ class ExecutionEngine:
         adapter: Any,
         session_id: str | None,
         step_idx: int,
+        deadline: float | None = None,
+        binding: MethodBinding | None = None,
+        defer: bool = False,
+        resume: RetryDeferred | None = None,
     ) -> Any:
-        async def _attempt():
-            execute_async = getattr(adapter, "execute_async", None)
+        if binding is not None:
+            call, hedge, key = binding.call, binding.idempotent_read, binding.key
+        else:
+            call = self.compiler.bind(adapter, action.method)
+            hedge = self._is_idempotent_read(adapter, action.method)
+            key = f"{action.adapter}.{action.method}"
+
+        async def _invoke():
+            # Throttle every call (retries and hedges included) against tenant-wide limits
+            async with self.limiter.limit(action.adapter, action.method, session_id):
+                return await call(action.params)
 
-            if execute_async and asyncio.iscoroutinefunction(execute_async):
-                return await execute_async(action.method, action.params)
-
-            return adapter.execute(action.method, action.params)
+        async def _attempt():
+            if hedge:
+                return await self.hedger.call(key, _invoke)
+            return await _invoke()
 
         try:
             return await self.recovery.attempt_with_recovery(
@@ -141,9 +347,12 @@ class ExecutionEngine:
                 action=action,
                 session_id=session_id,
                 step_idx=step_idx,
+                deadline=deadline,
+                defer=defer,
+                resume=resume,
             )
 
-        except ActionFailure:
+        except (ActionFailure, RetryDeferred):
             # IMPORTANT: do not swallow recovery signal
             raise
 
@@ -160,6 +369,23 @@ class ExecutionEngine:
             )
             raise
 
+    async def _prefetch_action(self, action: Action, adapter: Any, session_id, step_idx: int):
+        try:
+            return await self._execute_action_with_recovery(
+                action=action,
+                adapter=adapter,
+                session_id=session_id,
+                step_idx=step_idx,
+            )
+        except Exception as exc:
+            # Not fatal: the read simply runs again on confirm
+            self._audit(
+                session_id,
+                "PREFETCH_FAILED",
+                {"adapter": action.adapter, "method": action.method, "step": step_idx, "error": str(exc)},
+            )
+            raise
+
     # --------------------------------------------------
     # Rollback
     # --------------------------------------------------
@@ -168,51 +394,82 @@ class ExecutionEngine:
         plan: Plan,
         up_to_step: int | None = None,
         session_id: str | None = None,
-    ):
+        executed: dict[int, ExecutedStep] | None = None,
+    ) -> bool:
+        """
+        Compensates the steps before `up_to_step` as a saga, each before the
+        earlier steps its action `depends_on`; steps that declare nothing
+        are compensated in reverse order. Independent steps are compensated
+        concurrently. With `executed`, only steps that actually ran are
+        compensated, and each gets its `execute` result.
+        """
         limit = up_to_step if up_to_step is not None else len(plan.actions)
-        actions_to_undo = list(enumerate(plan.actions))[:limit]
-
-        for idx, action in reversed(actions_to_undo):
-            adapter = self.adapters.get(action.adapter)
-            compensate = (
-                getattr(adapter, "compensate_async", None)
-                or getattr(adapter, "compensate", None)
+        state = dict(executed) if executed is not None else {}
+
+        steps = []
+        # index -> saga steps it stands for: itself, or, when it has nothing
+        # to compensate, the steps it depends on (ordering stays transitive)
+        stands_for: dict[int, frozenset[int]] = {}
+        for idx, action in list(enumerate(plan.actions))[:limit]:
+            declared = action.depends_on if action.depends_on is not None else (idx - 1,)
+            depends_on = frozenset().union(
+                *(stands_for[dependency] for dependency in declared if 0 <= dependency < idx)
             )
-            if not compensate:
+            adapter = self.adapters.get(action.adapter)
+            if (executed is not None and idx not in executed) or not (
+                getattr(adapter, "compensate_async", None) or getattr(adapter, "compensate", None)
+            ):
+                stands_for[idx] = depends_on
                 continue
 
-            scrubbed_params = self.scrubber.scrub_data(action.params)
+            steps.append(AdapterSagaStep(idx, action, adapter, depends_on=sorted(depends_on)))
+            stands_for[idx] = frozenset((idx,))
 
-            try:
-                if asyncio.iscoroutinefunction(compensate):
-                    await compensate(action.method, action.params)
-                else:
-                    compensate(action.method, action.params)
+        return await self.saga.compensate(
+            steps,
+            state,
+            on_result=lambda step, exc, attempts: self._audit_compensation(session_id, step, exc, attempts),
+        )
 
-                self._audit(
-                    session_id,
-                    "ACTION_COMPENSATED",
-                    {
-                        "adapter": action.adapter,
-                        "method": action.method,
-                        "step": idx,
-                        "params": scrubbed_params,
-                    },
-                )
+    def _audit_compensation(self, session_id, step: AdapterSagaStep, exc: Exception | None, attempts: int):
+        action = step.action
+        scrubbed_params = action.scrubbed_params(self.scrubber)
 
-            except Exception as exc:
-                self._audit(
-                    session_id,
-                    "ACTION_COMPENSATION_FAILED",
-                    {
-                        "adapter": action.adapter,
-                        "method": action.method,
-                        "step": idx,
-                        "error": str(exc),
-                        "trace": traceback.format_exc(),
-                        "params": scrubbed_params,
-                    },
-                )
+        if exc is None:
+            self._audit(
+                session_id,
+                "ACTION_COMPENSATED",
+                {
+                    "adapter": action.adapter,
+                    "method": action.method,
+                    "step": step.index,
+                    "params": scrubbed_params,
+                },
+            )
+            return
+
+        self._audit(
+            session_id,
+            "ACTION_COMPENSATION_FAILED",
+            {
+                "adapter": action.adapter,
+                "method": action.method,
+                "step": step.index,
+                "attempts": attempts,
+                "error": str(exc),
+                "trace": "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+                "params": scrubbed_params,
+            },
+        )
+
+    def _trace(self, exc: Exception) -> str | None:
+        """
+        The failing attempt's traceback is already audited by the recovery
+        engine; a rejection repeats it only for a sampled fraction.
+        """
+        if random.random() >= self.trace_sample_rate:
+            return None
+        return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
 
     # --------------------------------------------------
     # Self-correction hook
@@ -224,7 +481,12 @@ class ExecutionEngine:
         failed_action: Action,
         decision: RecoveryDecision,
         session_id: str,
-    ) -> bool:
+    ) -> Plan | None:
+        """
+        Asks the planner for a repaired plan (None when unrecoverable).
+        Successful repairs are memoized, so a failure repaired before is not
+        re-planned.
+        """
         self._audit(
             session_id,
             "REPLAN_TRIGGERED",
@@ -234,42 +496,100 @@ class ExecutionEngine:
                 "decision": decision.value,
             },
         )
-        # Attempt self-correction
-        new_plan = await self.planner.repair_plan(
-            failed_plan=plan,
-            failed_action=failed_action,
-            decision=decision,
-        )
+        self.metrics.increment("replan.attempts")
+
+        repair_key = self._repair_key(plan, failed_action, decision)
+        if repair_key in self._repair_memo:
+            self.metrics.increment("replan.memo_hits")
+            self._repair_memo.move_to_end(repair_key)
+            new_plan = self._repair_memo[repair_key]
+        else:
+            # Attempt self-correction
+            new_plan = await self.planner.repair_plan(
+                failed_plan=plan,
+                failed_action=failed_action,
+                decision=decision,
+            )
+            if new_plan:
+                self._repair_memo[repair_key] = new_plan
+                if len(self._repair_memo) > REPLAN_MEMO_SIZE:
+                    self._repair_memo.popitem(last=False)
 
         if new_plan:
             self.auditor.log(session_id, "PLAN_REPAIRED", {
                 "original_action": failed_action.method,
                 "new_plan": [a.method for a in new_plan.actions]
             })
-            # Optionally: re-run the repaired plan
-            return await self.run(new_plan, session_id=session_id)
+            return new_plan
 
         # unrecoverable
         self.auditor.log(session_id, "PLAN_UNRECOVERABLE", {
             "failed_action": failed_action.method,
             "decision": str(decision)
         })
-        return False
+        return None
+
+    @staticmethod
+    def _repair_key(plan: Plan, failed_action: Action, decision: RecoveryDecision) -> tuple:
+        return plan.content_hash(), failed_action.key(), decision.value
+
+    def _replan_limit(self, depth: int, replan_until: float, already_tried: bool) -> str | None:
+        if already_tried:
+            return "cycle"
+        if depth >= self.max_replan_depth:
+            return "max_depth"
+        if time.monotonic() >= replan_until:
+            return "time_budget"
+        return None
+
+    def _record_replan_outcome(self, depth: int, succeeded: bool):
+        if depth == 0:
+            return
+        self.metrics.observe("replan.depth", depth)
+        self.metrics.increment("replan.outcome", result="success" if succeeded else "failure")
 
     # --------------------------------------------------
     # Helpers
     # --------------------------------------------------
+    def _register_adapter_errors(self):
+        classifier = getattr(self.recovery, "classifier", None)
+        if classifier is None:
+            return
+        for adapter in self.adapters.values():
+            register = getattr(adapter, "register_errors", None)
+            if callable(register):
+                register(classifier)
+
+    def _is_idempotent_read(self, adapter, method: str) -> bool:
+        return self.compiler.is_idempotent_read(adapter, method)
+
     def _is_action_supported(self, adapter, method: str) -> bool:
-        return method in getattr(adapter, "supported_actions", lambda: [])()
+        return self.compiler.supports(adapter, method)
 
-    def _save_state(self, session_id, plan, step_idx: int, status: str):
+    async def _store_plan(self, session_id, plan: Plan) -> str | None:
+        """
+        Writes the full plan once per execution, keyed by its content hash.
+        Step transitions then only reference the hash.
+        """
+        if not (self.state_store and session_id):
+            return None
+        try:
+            plan_hash = plan.content_hash()
+            await self.state_store.save_plan(plan_hash, plan.model_dump(mode="json"))
+            await self.state_store.update_context(session_id, {"plan_hash": plan_hash})
+            return plan_hash
+        except Exception as exc:
+            self._audit(session_id, "STATE_STORE_FAILURE", {"error": str(exc)})
+            return None
+
+    async def _save_state(self, session_id, plan_hash: str | None, step_idx: int, status: str):
         if not (self.state_store and session_id):
             return
         try:
-            self.state_store.save_context(
+            await self.state_store.update_context(
                 session_id,
                 {
-                    "last_plan": plan.model_dump(),
+                    "plan_hash": plan_hash,
                     "last_action_index": step_idx,
                     "last_action_status": status,
                 },
@@ -277,6 +597,15 @@ class ExecutionEngine:
         except Exception as exc:
             self._audit(session_id, "STATE_STORE_FAILURE", {"error": str(exc)})
 
+    async def _save_outcome(self, session_id, succeeded: bool):
+        if not (self.state_store and session_id):
+            return
+        state = WorkflowState.COMPLETED if succeeded else WorkflowState.REJECTED
+        try:
+            await self.state_store.update_context(session_id, {}, state=state)
+        except Exception as exc:
+            self._audit(session_id, "STATE_STORE_FAILURE", {"error": str(exc)})
+
     def _audit(self, session_id, event_type: str, payload: dict):
         self.auditor.log(session_id, event_type, payload)
 
@@ -287,6 +616,7 @@ class ExecutionEngine:
         step_idx,
         action,
         error: str,
+        executed: dict[int, ExecutedStep] | None = None,
     ):
         self._audit(
             session_id,
@@ -298,4 +628,4 @@ class ExecutionEngine:
                 "error": error,
             },
         )
-        await self.rollback(plan, up_to_step=step_idx, session_id=session_id)
+        await self.rollback(plan, up_to_step=step_idx, session_id=session_id, executed=executed)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import List, Set, Tuple
+
+from automation_app.audit.audit_logger import AuditLogger
+from automation_app.engines.plan_run import PlanRun
+from automation_app.models.plan import Plan
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.utils.metrics import MetricsRegistry
+
+
+class ExecutionSupervisor:
+    """
+    Runs plan executions in the background and parks their retry backoffs.
+
+    Executions are advanced with deferred retries: a step that has to back
+    off ends its task instead of sleeping, and the PlanRun is kept in one
+    heap ordered by due time, with a single loop timer armed for the
+    earliest. When a run is due it is re-enqueued as a new task that
+    continues from the deferred attempt. A parked run costs its heap entry
+    and saga state: no task, coroutine frame, timer or limiter slot.
+    """
+
+    def __init__(self, executor, auditor=AuditLogger, metrics: MetricsRegistry | None = None):
+        self.executor = executor
+        self.auditor = auditor
+        self.metrics = metrics or MetricsRegistry()
+        # (due, tie-breaker, run), earliest first
+        self._parked: List[Tuple[float, int, PlanRun]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_due: float | None = None
+        # Strong references, the loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        plan: Plan,
+        session_id: str | None = None,
+        deadline: float | None = None,
+        proposal_id: str | None = None,
+    ) -> PlanRun:
+        run = PlanRun(
+            plan,
+            session_id=session_id,
+            deadline=deadline,
+            proposal_id=proposal_id,
+            defer_retries=True,
+        )
+        self._start(run)
+        return run
+
+    def parked(self) -> int:
+        return len(self._parked)
+
+    async def close(self):
+        """
+        Cancels running executions; parked ones are dropped.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_due = None
+        self._parked.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _start(self, run: PlanRun):
+        task = asyncio.get_running_loop().create_task(self._advance(run))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _advance(self, run: PlanRun):
+        try:
+            outcome = await self.executor.advance(run)
+        except Exception as e:
+            self.auditor.log(run.session_id, WorkflowState.REJECTED, {"error": str(e)})
+            return
+        if outcome is run:
+            self._park(run)
+
+    def _park(self, run: PlanRun):
+        heapq.heappush(self._parked, (run.due, next(self._seq), run))
+        self.metrics.increment("execution_supervisor.parked")
+        self._publish()
+        self._arm()
+
+    def _arm(self):
+        due = self._parked[0][0]
+        if self._timer is not None and self._timer_due <= due:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(max(0.0, due - time.monotonic()), self._fire)
+        self._timer_due = due
+
+    def _fire(self):
+        self._timer = self._timer_due = None
+        now = time.monotonic()
+        while self._parked and self._parked[0][0] <= now:
+            _, _, run = heapq.heappop(self._parked)
+            self.metrics.increment("execution_supervisor.resumed")
+            self._start(run)
+        self._publish()
+        if self._parked:
+            self._arm()
+
+    def _publish(self):
+        self.metrics.set_gauge("execution_supervisor.parked_runs", len(self._parked))
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict
+
+from automation_app.utils.metrics import MetricsRegistry
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies per key ("Adapter.method").
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float):
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, key: str, pct: float, min_samples: int = 1) -> float | None:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+class HedgedCaller:
+    """
+    Issues a second, hedged attempt for idempotent reads that are slower
+    than the configured latency percentile. The first successful result
+    wins and the other call is cancelled.
+
+    Every call records one latency sample, measured from the primary's
+    start to when the call ends: a hedge win stands in for the slow
+    primary (a lower bound on it), and failed or cancelled calls count
+    too, so the percentile is not biased towards fast successes.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        default_delay: float = 0.25,
+        tracker: LatencyTracker | None = None,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.tracker = tracker or LatencyTracker()
+        self.metrics = metrics or MetricsRegistry()
+
+    def hedge_delay(self, key: str) -> float:
+        delay = self.tracker.percentile(key, self.percentile, self.min_samples)
+        return self.default_delay if delay is None else delay
+
+    async def call(self, key: str, call_fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        self.metrics.increment("hedge.calls", key=key)
+
+        started = {}
+        primary = self._start(call_fn, started, loop)
+        tasks = {primary}
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(key))
+
+            if not done:
+                self.metrics.increment("hedge.issued", key=key)
+                tasks.add(self._start(call_fn, started, loop))
+
+            pending = set(tasks)
+            first_error = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.metrics.increment("hedge.wins", key=key)
+                        return task.result()
+                    first_error = first_error or task.exception()
+
+            raise first_error
+
+        finally:
+            self.tracker.record(key, loop.time() - started[primary])
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    @staticmethod
+    def _start(call_fn, started: dict, loop) -> asyncio.Task:
+        task = asyncio.ensure_future(call_fn())
+        started[task] = loop.time()
+        return task
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Tuple
+
+from automation_app.engines.exceptions import PlanValidationError
+from automation_app.models.action import Action
+from automation_app.models.plan import Plan
+
+AdapterCall = Callable[[dict], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class MethodBinding:
+    """
+    Everything resolved once for an (adapter, method) pair; shared by every
+    step of every plan that calls it.
+    """
+    adapter: Any
+    call: AdapterCall       # bound adapter dispatch: await call(params)
+    idempotent_read: bool
+    key: str                # "adapter.method", used for hedging / metrics
+
+
+class PlanCompiler:
+    """
+    Compiles plans into pre-validated, bound calls: one MethodBinding per
+    action, aligned with `plan.actions`.
+
+    Adapter capabilities (`supported_actions()` / `idempotent_reads()`) and
+    the sync/async dispatch for each (adapter, method) are resolved on first
+    use and cached per adapter instance, so compiling a step is a lookup and
+    executing it does no introspection. Adapters are expected to keep their
+    capabilities fixed once registered.
+    """
+
+    def __init__(self):
+        # id(adapter) -> (adapter, supported, idempotent reads)
+        self._capabilities: Dict[int, Tuple[Any, FrozenSet[str], FrozenSet[str]]] = {}
+        # adapter name -> method -> binding
+        self._bindings: Dict[str, Dict[str, MethodBinding]] = {}
+
+    def compile(
+        self,
+        plan: Plan,
+        adapters: Dict[str, Any],
+        supports: Callable[[Any, str], bool] | None = None,
+        is_idempotent_read: Callable[[Any, str], bool] | None = None,
+    ) -> List[MethodBinding]:
+        """
+        Validates every step up front; raises PlanValidationError for the
+        first step that cannot run. `supports` / `is_idempotent_read`
+        override the adapter's own declarations when a binding is built.
+        """
+        bindings = []
+        for idx, action in enumerate(plan.actions):
+            adapter = adapters.get(action.adapter)
+            binding = self._bindings.get(action.adapter, {}).get(action.method)
+            if binding is None or binding.adapter is not adapter:
+                binding = self._bind_step(idx, action, adapter, supports, is_idempotent_read)
+            bindings.append(binding)
+        return bindings
+
+    def supports(self, adapter, method: str) -> bool:
+        return method in self._capabilities_for(adapter)[1]
+
+    def is_idempotent_read(self, adapter, method: str) -> bool:
+        return method in self._capabilities_for(adapter)[2]
+
+    def bind(self, adapter, method: str) -> AdapterCall:
+        """
+        Resolves how `method` is dispatched on `adapter` (execute_async,
+        async execute or sync execute), returning `await call(params)`.
+        """
+        execute_async = getattr(adapter, "execute_async", None)
+        if execute_async and asyncio.iscoroutinefunction(execute_async):
+            return partial(execute_async, method)
+        if asyncio.iscoroutinefunction(adapter.execute):
+            return partial(adapter.execute, method)
+
+        execute = adapter.execute
+
+        async def call(params):
+            result = execute(method, params)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        return call
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _bind_step(self, idx, action: Action, adapter, supports, is_idempotent_read) -> MethodBinding:
+        if not adapter:
+            raise PlanValidationError(idx, action, f"No adapter found for {action.adapter}")
+        if not (supports or self.supports)(adapter, action.method):
+            raise PlanValidationError(
+                idx,
+                action,
+                f"Action '{action.method}' not supported by adapter '{action.adapter}'",
+            )
+
+        binding = MethodBinding(
+            adapter=adapter,
+            call=self.bind(adapter, action.method),
+            idempotent_read=(is_idempotent_read or self.is_idempotent_read)(adapter, action.method),
+            key=f"{action.adapter}.{action.method}",
+        )
+        self._bindings.setdefault(action.adapter, {})[action.method] = binding
+        return binding
+
+    def _capabilities_for(self, adapter) -> Tuple[Any, FrozenSet[str], FrozenSet[str]]:
+        cached = self._capabilities.get(id(adapter))
+        if cached is not None and cached[0] is adapter:
+            return cached
+
+        supported = frozenset(getattr(adapter, "supported_actions", lambda: ())())
+        reads = frozenset(getattr(adapter, "idempotent_reads", lambda: ())())
+        cached = (adapter, supported, reads)
+        self._capabilities[id(adapter)] = cached
+        return cached
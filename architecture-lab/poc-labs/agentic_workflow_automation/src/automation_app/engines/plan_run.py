@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import Dict, List, Set
+
+from automation_app.engines.exceptions import RetryDeferred
+from automation_app.engines.plan_compiler import MethodBinding
+from automation_app.models.executed_step import ExecutedStep
+from automation_app.models.plan import Plan
+
+
+class PlanRun:
+    """
+    Where one execution of a plan stands (repairs included), so that it can
+    stop at a retry backoff and be continued later by another task.
+
+    With `defer_retries`, `ExecutionEngine.advance` returns the run when a
+    step has to back off, with `due` set to the `time.monotonic()` instant
+    to continue at; without it, backoffs are slept through in place.
+    """
+
+    def __init__(
+        self,
+        plan: Plan,
+        session_id: str | None = None,
+        deadline: float | None = None,
+        proposal_id: str | None = None,
+        defer_retries: bool = False,
+    ):
+        self.session_id = session_id
+        self.deadline = deadline
+        self.proposal_id = proposal_id
+        self.defer_retries = defer_retries
+        # Replanning: repairs so far, repairs tried, when repairing must stop
+        self.depth = 0
+        self.tried: Set[tuple] = set()
+        self.replan_until: float | None = None
+        # The deferred retry of the current step, continued at `due`
+        self.retry: RetryDeferred | None = None
+        self.due: float | None = None
+        self.restart(plan)
+
+    def restart(self, plan: Plan):
+        """
+        Starts a new pass over `plan` (the first one, or a repaired plan).
+        """
+        self.plan = plan
+        self.plan_hash: str | None = None
+        # None until the pass has compiled the plan
+        self.bindings: List[MethodBinding] | None = None
+        # Saga state: step index -> what execute actually returned
+        self.executed: Dict[int, ExecutedStep] = {}
+        self.step = 0
+        self.retry = None
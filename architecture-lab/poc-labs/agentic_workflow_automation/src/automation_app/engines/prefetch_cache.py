@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from automation_app.config.constants import PREFETCH_MAX_PROPOSALS, PREFETCH_TTLS
+from automation_app.models.action import Action
+from automation_app.utils.metrics import MetricsRegistry
+
+DEFAULT_TTL = "*"
+
+
+class PrefetchCache:
+    """
+    Results of read-only actions fetched speculatively while a proposal
+    awaits confirmation, keyed by proposal and action.
+
+    A result is reused only if it completed successfully within the TTL
+    of its `adapter.method` (`ttls`, "*" as default). Reads still in flight
+    are awaited rather than issued twice.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, float] | None = None,
+        max_proposals: int = PREFETCH_MAX_PROPOSALS,
+        clock=time.monotonic,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.ttls = ttls or PREFETCH_TTLS
+        self.max_proposals = max_proposals
+        self._clock = clock
+        self.metrics = metrics or MetricsRegistry()
+        # proposal_id -> action key -> {"task", "completed_at"}
+        self._entries: "OrderedDict[str, Dict[tuple, dict]]" = OrderedDict()
+
+    def start(self, proposal_id: str, action: Action, fetch: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Launches `fetch` in the background unless this action is already
+        being prefetched for the proposal. Returns True if a fetch started.
+        """
+        entries = self._entries.get(proposal_id)
+        if entries is None:
+            entries = self._entries[proposal_id] = {}
+            self._evict()
+        if action.key() in entries:
+            return False
+
+        entry = {"task": asyncio.ensure_future(fetch()), "completed_at": None}
+        entry["task"].add_done_callback(lambda task: self._on_done(entry, task))
+        entries[action.key()] = entry
+        self.metrics.increment("prefetch.started", key=self._ttl_key(action))
+        return True
+
+    async def take(self, proposal_id: str | None, action: Action, timeout: float | None = None) -> Tuple[bool, Any]:
+        """
+        Returns (True, result) for a fresh prefetched result, (False, None) otherwise.
+        """
+        entry = self._entries.get(proposal_id, {}).get(action.key()) if proposal_id else None
+        if entry is None:
+            return self._miss(action, "absent")
+
+        task = entry["task"]
+        if not task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                return self._miss(action, "pending")
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise
+            except Exception:
+                pass
+
+        if task.cancelled() or task.exception() is not None:
+            return self._miss(action, "failed")
+        # Done callbacks may not have run yet for a task that just finished
+        completed_at = entry["completed_at"]
+        if completed_at is None:
+            completed_at = self._clock()
+        if self._clock() - completed_at > self.ttl_for(action):
+            return self._miss(action, "stale")
+
+        self.metrics.increment("prefetch.hits", key=self._ttl_key(action))
+        return True, task.result()
+
+    def discard(self, proposal_id: str | None):
+        """
+        Drops a proposal's results, cancelling reads still in flight.
+        """
+        for entry in self._entries.pop(proposal_id, {}).values():
+            entry["task"].cancel()
+
+    def ttl_for(self, action: Action) -> float:
+        return self.ttls.get(self._ttl_key(action), self.ttls.get(DEFAULT_TTL, 0.0))
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _ttl_key(action: Action) -> str:
+        return f"{action.adapter}.{action.method}"
+
+    def _on_done(self, entry: dict, task: asyncio.Task):
+        entry["completed_at"] = self._clock()
+        if not task.cancelled():
+            task.exception()  # mark retrieved; failures surface as cache misses
+
+    def _miss(self, action: Action, reason: str) -> Tuple[bool, Any]:
+        self.metrics.increment("prefetch.misses", key=self._ttl_key(action), reason=reason)
+        return False, None
+
+    def _evict(self):
+        while len(self._entries) > self.max_proposals:
+            proposal_id = next(iter(self._entries))
+            self.discard(proposal_id)
@@ -2,11 +2,21 @@
 
 from typing import Any
 import asyncio
+import random
+import time
 import traceback
 
 from automation_app.audit.audit_logger import AuditLogger
 from automation_app.config.constants import RecoveryDecision
-from automation_app.engines.exceptions import ActionFailure
+from automation_app.engines.circuit_breaker import CircuitBreakerRegistry
+from automation_app.engines.error_classifier import ErrorClassifier
+from automation_app.engines.exceptions import (
+    ActionFailure,
+    CircuitOpenError,
+    DeadlineExceededError,
+    RetryDeferred,
+)
+from automation_app.engines.retry_budget import RetryBudgets
 
 
 class RecoveryEngine:
@@ -15,10 +25,24 @@ class RecoveryEngine:
         max_retries: int = 3,
         base_backoff: float = 0.5,
         auditor=AuditLogger,
+        breakers=None,
+        budgets=None,
+        jitter: str = "full",
+        max_backoff: float = 10.0,
+        classifier=None,
+        trace_sample_rate: float = 0.0,
+        policy=None,
     ):
         self.max_retries = max_retries
         self.base_backoff = base_backoff
         self.auditor = auditor
+        self.breakers = breakers or CircuitBreakerRegistry(auditor=auditor)
+        self.budgets = budgets or RetryBudgets()
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.classifier = classifier or ErrorClassifier()
+        self.trace_sample_rate = trace_sample_rate
+        self.policy = policy
 
     async def attempt_with_recovery(
         self,
@@ -27,18 +51,75 @@ class RecoveryEngine:
         action,
         session_id: str,
         step_idx: int,
+        deadline: float | None = None,
+        defer: bool = False,
+        resume: RetryDeferred | None = None,
     ):
         """
-        Executes an action with retry + backoff.
+        Executes an action with retry + backoff, guarded by the adapter's circuit breaker.
+
+        `deadline` is an absolute `time.monotonic()` instant: each attempt only
+        gets the remaining budget, in-flight calls are cancelled when it runs
+        out, and backoffs that would overshoot it are not started.
+
+        With `defer`, a backoff raises RetryDeferred instead of sleeping, so
+        the caller can let go of its task; calling again with it as `resume`
+        continues with the next attempt.
         """
-        for attempt in range(1, self.max_retries + 1):
+        adapter = getattr(action, "adapter", None)
+        method = getattr(action, "method", None)
+        breaker = self.breakers.get(adapter) if adapter else None
+        max_retries, base_backoff = self._retry_settings(adapter, method)
+        delay, first_attempt = base_backoff, 1
+        if resume is not None:
+            delay, first_attempt = resume.delay, resume.attempt
+            # The adaptive policy may have lowered the limit meanwhile
+            max_retries = max(max_retries, first_attempt)
+
+        for attempt in range(first_attempt, max_retries + 1):
+            remaining = self._remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise self._deadline_exceeded(adapter, session_id, step_idx, attempt)
+
+            if breaker and not breaker.allow_request(session_id):
+                self.breakers.metrics.increment("circuit_breaker.rejected", adapter=adapter)
+                self.auditor.log(
+                    session_id,
+                    "CIRCUIT_OPEN",
+                    {"adapter": adapter, "step": step_idx, "attempt": attempt},
+                )
+                raise ActionFailure(RecoveryDecision.CIRCUIT_OPEN, CircuitOpenError(adapter))
+
+            started = time.monotonic()
             try:
-                return await execute_fn()
+                result = await self._call(execute_fn, deadline, adapter, step_idx)
 
-            except Exception as exc:
-                last_exc = exc
+            except asyncio.CancelledError:
+                if breaker:
+                    breaker.release()
+                raise
+
+            except DeadlineExceededError:
+                # Running out of plan budget says nothing about adapter health
+                if breaker:
+                    breaker.release()
+                raise self._deadline_exceeded(adapter, session_id, step_idx, attempt)
 
+            except Exception as exc:
                 decision = self._classify_error(exc)
+                self._observe(adapter, method, started, failed=True, decision=decision)
+
+                if breaker:
+                    # Only transient/unknown failures say anything about adapter health
+                    if decision in (RecoveryDecision.RETRY, RecoveryDecision.UNKNOWN):
+                        breaker.record_failure(session_id)
+                    else:
+                        # The adapter answered; keep the failure count, free the probe
+                        breaker.release()
+
+                will_retry = decision == RecoveryDecision.RETRY and attempt < max_retries
+                budget_exhausted = will_retry and not self.budgets.try_spend(adapter)
+                will_retry = will_retry and not budget_exhausted
 
                 self.auditor.log(
                     session_id,
@@ -48,48 +129,115 @@ class RecoveryEngine:
                         "attempt": attempt,
                         "decision": str(decision),
                         "error": str(exc),
-                        "trace": traceback.format_exc(),
+                        "trace": self._trace(exc, terminal=not will_retry),
                     },
                 )
 
-                if decision == RecoveryDecision.RETRY and attempt < self.max_retries:
-                    await asyncio.sleep(self._backoff(attempt))
+                if budget_exhausted:
+                    self.auditor.log(
+                        session_id,
+                        "RETRY_BUDGET_EXHAUSTED",
+                        {"adapter": adapter, "step": step_idx, "attempt": attempt},
+                    )
+                    raise ActionFailure(RecoveryDecision.RETRY_BUDGET_EXHAUSTED, exc)
+
+                if will_retry:
+                    delay = self._retry_delay(attempt, delay, base_backoff)
+                    remaining = self._remaining(deadline)
+                    if remaining is not None and delay >= remaining:
+                        raise self._deadline_exceeded(adapter, session_id, step_idx, attempt)
+                    if defer:
+                        raise RetryDeferred(delay, attempt + 1)
+                    # Limiter slots are held per attempt, so a backing-off retry holds none
+                    await asyncio.sleep(delay)
                     continue
 
                 raise  ActionFailure(decision, exc)
 
-    def _classify_error(self, exc: Exception) -> str:
+            if breaker:
+                breaker.record_success(session_id)
+            self.budgets.record_success(adapter)
+            self._observe(adapter, method, started, failed=False)
+            return result
+
+    def current_policies(self) -> dict:
+        """
+        Retry policy currently applied per adapter method (for inspection).
+        """
+        if self.policy is None:
+            return {}
+        return self.policy.snapshot()
+
+    def _retry_settings(self, adapter: str | None, method: str | None) -> tuple[int, float]:
+        if self.policy is None or adapter is None:
+            return self.max_retries, self.base_backoff
+        policy = self.policy.policy_for(adapter, method)
+        return policy.max_retries, policy.base_backoff
+
+    def _observe(self, adapter, method, started: float, failed: bool, decision=None):
+        if self.policy is None or adapter is None:
+            return
+        self.policy.record(
+            adapter,
+            method,
+            time.monotonic() - started,
+            failed=failed,
+            transient=decision == RecoveryDecision.RETRY,
+        )
+
+    @staticmethod
+    def _remaining(deadline: float | None) -> float | None:
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    @staticmethod
+    async def _call(execute_fn, deadline: float | None, adapter: str | None, step_idx: int):
+        if deadline is None:
+            return await execute_fn()
+        try:
+            # wait_for cancels the in-flight call (and any hedge) on expiry
+            return await asyncio.wait_for(execute_fn(), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            if time.monotonic() < deadline:
+                raise  # the adapter's own timeout, classified like any other error
+            raise DeadlineExceededError(adapter, step_idx) from None
+
+    def _deadline_exceeded(self, adapter, session_id, step_idx: int, attempt: int) -> ActionFailure:
+        self.auditor.log(
+            session_id,
+            "DEADLINE_EXCEEDED",
+            {"adapter": adapter, "step": step_idx, "attempt": attempt},
+        )
+        return ActionFailure(RecoveryDecision.DEADLINE_EXCEEDED, DeadlineExceededError(adapter, step_idx))
+
+    def _classify_error(self, exc: Exception) -> RecoveryDecision:
+        return self.classifier.classify(exc)
+
+    def _trace(self, exc: Exception, terminal: bool) -> str | None:
+        """
+        Tracebacks are only rendered for the failure that is surfaced, plus a
+        sampled fraction of retried attempts, to keep failure storms cheap.
+        """
+        if not terminal and random.random() >= self.trace_sample_rate:
+            return None
+        return "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+
+    def _backoff(self, attempt: int, base: float | None = None) -> float:
+        return (self.base_backoff if base is None else base) * (2 ** (attempt - 1))
+
+    def _retry_delay(self, attempt: int, previous: float, base: float | None = None) -> float:
         """
-        Naive classification for now.
-        Later: adapter-specific errors, HTTP codes, etc.
+        Jittered backoff so failing callers do not retry in lockstep.
+        - full: uniform(0, exponential ceiling)
+        - decorrelated: uniform(base, 3 * previous delay)
         """
-        msg = str(exc).lower()
-
-        if any(keyword in msg for keyword in [
-            "timeout",
-            "temporarily unavailable",
-            "rate limit",
-            "connection reset",
-            "503",
-        ]):
-            return RecoveryDecision.RETRY
-
-        if any(keyword in msg for keyword in [
-            "permission",
-            "not authorized",
-            "forbidden",
-            "403",
-        ]):
-            return RecoveryDecision.PERMISSION
-
-        if any(keyword in msg for keyword in [
-            "not supported",
-            "unsupported action",
-            "unknown method",
-        ]):
-            return RecoveryDecision.NOT_SUPPORTED
-
-        return RecoveryDecision.UNKNOWN
-
-    def _backoff(self, attempt: int) -> float:
-        return self.base_backoff * (2 ** (attempt - 1))
+        base = self.base_backoff if base is None else base
+
+        if self.jitter == "full":
+            return random.uniform(0, min(self.max_backoff, self._backoff(attempt, base)))
+
+        if self.jitter == "decorrelated":
+            return min(self.max_backoff, random.uniform(base, previous * 3))
+
+        return min(self.max_backoff, self._backoff(attempt, base))
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import time
+from typing import Dict
+
+from automation_app.engines.adapter_limiter import TokenBucket
+from automation_app.utils.metrics import MetricsRegistry
+
+GLOBAL_SCOPE = "global"
+DEFAULT_SCOPE = "*"
+
+
+class RetryBudget:
+    """
+    Retry budget expressed as a token balance.
+
+    Every successful call deposits `retry_ratio` tokens and every retry
+    withdraws one, so retries stay a bounded fraction of healthy traffic.
+    A `min_retries_per_second` reserve keeps low-traffic adapters retryable.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        retry_ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        max_balance: float = 100.0,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.retry_ratio = retry_ratio
+        self.max_balance = max_balance
+        self.balance = 0.0
+        self.reserve = (
+            TokenBucket(min_retries_per_second, clock=clock) if min_retries_per_second else None
+        )
+        self.spent = 0
+        self.rejected = 0
+        # Where the last withdrawn token came from, for `refund()`
+        self._last_source: str | None = None
+
+    def deposit(self):
+        self.balance = min(self.max_balance, self.balance + self.retry_ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.balance >= 1:
+            self.balance -= 1
+            self._last_source = "balance"
+        elif self.reserve and self.reserve.delay() == 0:
+            self.reserve.take()
+            self._last_source = "reserve"
+        else:
+            self.rejected += 1
+            return False
+
+        self.spent += 1
+        return True
+
+    def refund(self):
+        """
+        Gives the last withdrawn token back to where it came from, so a
+        reserve token never turns into balance.
+        """
+        if self._last_source is None:
+            return
+        if self._last_source == "reserve":
+            self.reserve.put_back()
+        else:
+            self.balance = min(self.max_balance, self.balance + 1)
+        self._last_source = None
+        self.spent -= 1
+
+    def snapshot(self) -> dict:
+        return {"balance": round(self.balance, 3), "spent": self.spent, "rejected": self.rejected}
+
+
+class RetryBudgets:
+    """
+    Global + per-adapter retry budgets. A retry must be affordable in both.
+
+    `config` holds a "global" entry, a "*" per-adapter default and optional
+    adapter-specific overrides.
+    """
+
+    def __init__(self, config: Dict[str, dict] | None = None, metrics=None):
+        self.config = config or {}
+        self.metrics = metrics or MetricsRegistry()
+        self.global_budget = RetryBudget(GLOBAL_SCOPE, **self.config.get(GLOBAL_SCOPE, {}))
+        self._budgets: Dict[str, RetryBudget] = {}
+
+    def record_success(self, adapter: str | None):
+        self.global_budget.deposit()
+        if adapter:
+            self._budget_for(adapter).deposit()
+
+    def try_spend(self, adapter: str | None) -> bool:
+        budget = self._budget_for(adapter) if adapter else None
+
+        if budget and not budget.try_withdraw():
+            self._publish(adapter, exhausted=True)
+            return False
+
+        if not self.global_budget.try_withdraw():
+            if budget:
+                budget.refund()
+            self._publish(GLOBAL_SCOPE, exhausted=True)
+            return False
+
+        self._publish(adapter or GLOBAL_SCOPE, exhausted=False)
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            GLOBAL_SCOPE: self.global_budget.snapshot(),
+            **{name: budget.snapshot() for name, budget in self._budgets.items()},
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _budget_for(self, adapter: str) -> RetryBudget:
+        budget = self._budgets.get(adapter)
+        if budget is None:
+            settings = self.config.get(adapter) or self.config.get(DEFAULT_SCOPE, {})
+            budget = RetryBudget(adapter, **settings)
+            self._budgets[adapter] = budget
+        return budget
+
+    def _publish(self, scope: str, exhausted: bool):
+        name = "retry_budget.exhausted" if exhausted else "retry_budget.spent"
+        self.metrics.increment(name, scope=scope)
+        self.metrics.set_gauge("retry_budget.balance", self.global_budget.balance, scope=GLOBAL_SCOPE)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List
+
+from automation_app.config.constants import COMPENSATION_BACKOFF, COMPENSATION_MAX_ATTEMPTS
+from automation_app.models.action import Action
+from automation_app.models.executed_step import ExecutedStep
+from automation_app.utils.metrics import MetricsRegistry
+from automation_app.utils.saga_step import SagaStep
+
+
+class AdapterSagaStep(SagaStep):
+    """
+    Saga step for one plan action on an enterprise adapter.
+
+    The action itself runs through the execution engine (with recovery and
+    limits), which records it in the saga state (step index -> ExecutedStep);
+    `execute` returns that record, and compensation gets the result the
+    adapter actually returned. `depends_on` lists earlier steps that may
+    only be compensated after this one.
+    """
+
+    def __init__(self, index: int, action: Action, adapter: Any, depends_on: Iterable[int] = ()):
+        self.index = index
+        self.action = action
+        self.adapter = adapter
+        self.depends_on = tuple(depends_on)
+
+    def execute(self, state: Dict[int, ExecutedStep]) -> ExecutedStep | None:
+        return state.get(self.index)
+
+    def compensate(self, state: Dict[int, ExecutedStep]):
+        executed = self.execute(state)
+        result = executed.result if executed else None
+        compensate = (
+            getattr(self.adapter, "compensate_async", None)
+            or getattr(self.adapter, "compensate")
+        )
+        return compensate(self.action.method, self.action.params, result)
+
+
+class SagaCoordinator:
+    """
+    Runs saga compensations, concurrently where steps are independent.
+
+    Steps are SagaSteps carrying their `index` (their key in the saga
+    state) and optionally the `depends_on` indexes of earlier steps. A step is compensated once every step depending on it has been (whether
+    or not that succeeded), mirroring forward order in reverse. Each
+    compensation is retried up to `max_attempts` times with exponential
+    backoff. `on_result(step, error, attempts)` reports every outcome.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = COMPENSATION_MAX_ATTEMPTS,
+        backoff: float = COMPENSATION_BACKOFF,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.metrics = metrics or MetricsRegistry()
+
+    async def compensate(
+        self,
+        steps: List[SagaStep],
+        state: Dict[int, ExecutedStep],
+        on_result: Callable[[SagaStep, Exception | None, int], None] | None = None,
+    ) -> bool:
+        """
+        Compensates `steps`; returns True if every compensation succeeded.
+        """
+        done = {step.index: asyncio.Event() for step in steps}
+        dependents: Dict[int, List[int]] = defaultdict(list)
+        for step in steps:
+            for dependency in getattr(step, "depends_on", ()):
+                if dependency in done:
+                    dependents[dependency].append(step.index)
+
+        outcomes = await asyncio.gather(*(
+            self._compensate_when_ready(
+                step,
+                state,
+                [done[index] for index in dependents[step.index]],
+                done[step.index],
+                on_result,
+            )
+            for step in steps
+        ))
+        return all(outcomes)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _compensate_when_ready(self, step, state, wait_for, done: asyncio.Event, on_result) -> bool:
+        try:
+            for event in wait_for:
+                await event.wait()
+            return await self._compensate_with_retries(step, state, on_result)
+        finally:
+            done.set()
+
+    async def _compensate_with_retries(self, step, state, on_result) -> bool:
+        key = self._key(step)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                outcome = step.compensate(state)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as exc:
+                if attempt < self.max_attempts:
+                    self.metrics.increment("saga.compensation_retries", key=key)
+                    await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+                    continue
+                self.metrics.increment("saga.compensations", key=key, result="failed")
+                if on_result:
+                    on_result(step, exc, attempt)
+                return False
+
+            self.metrics.increment("saga.compensations", key=key, result="compensated")
+            if on_result:
+                on_result(step, None, attempt)
+            return True
+        return False
+
+    @staticmethod
+    def _key(step: SagaStep) -> str:
+        action = getattr(step, "action", None)
+        if action is None:
+            return type(step).__name__
+        return f"{action.adapter}.{action.method}"
@@ -85,7 +85,8 @@ class TaskPlanner:
                     Action(
                         adapter="notification",
                         method="send",
-                        params={**action.params, "reason": "Unsupported action replaced with notification"}
+                        params={**action.params, "reason": "Unsupported action replaced with notification"},
+                        depends_on=action.depends_on,
                     )
                 )
             else:
@@ -107,6 +108,12 @@ class TaskPlanner:
             }
         )
 
-        # Insert before the failing step
-        new_actions = plan.actions[:step_idx] + [approval_action] + plan.actions[step_idx:]
+        # Insert before the failing step; later declared dependencies shift with it
+        shifted = [
+            action if action.depends_on is None else action.model_copy(
+                update={"depends_on": tuple(dep + 1 if dep >= step_idx else dep for dep in action.depends_on)}
+            )
+            for action in plan.actions[step_idx:]
+        ]
+        new_actions = plan.actions[:step_idx] + [approval_action] + shifted
         return Plan(actions=new_actions)
\ No newline at end of file
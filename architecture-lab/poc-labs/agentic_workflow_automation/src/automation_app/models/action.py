@@ -1,8 +1,70 @@
-from pydantic import BaseModel, ConfigDict
+import json
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple
+
+from pydantic import BaseModel, ConfigDict, PrivateAttr, model_serializer
 
 
 class Action(BaseModel):
+    """
+    A single adapter call. Actions are frozen once built, so derived views
+    (the canonical key and scrubbed params) are computed once and cached.
+    """
     adapter: str        # Name of the adapter to call (e.g., 'Workday', 'MSGraph')
     method: str         # Method name to execute
-    params: dict        # Parameters for the action
-    model_config = ConfigDict(extra="forbid")
\ No newline at end of file
+    params: dict        # Parameters for the action (treat as read-only)
+    # Earlier actions (by index) this one builds on: it is compensated before
+    # them, and concurrently with anything it does not depend on. None (not
+    # declared): compensated right before the previous action.
+    depends_on: Tuple[int, ...] | None = None
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    _key: tuple | None = PrivateAttr(default=None)
+    _scrubbed: dict = PrivateAttr(default_factory=dict)
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler):
+        # Undeclared dependencies are left out, so such actions dump (and
+        # plans hash) as they always have
+        data = handler(self)
+        if self.depends_on is None:
+            data.pop("depends_on", None)
+        return data
+
+    def key(self) -> tuple:
+        """Canonical (adapter, method, params) key used for hashing and equality."""
+        if self._key is None:
+            params = json.dumps(self.params, sort_keys=True, separators=(",", ":"), default=str)
+            self._key = (self.adapter, self.method, params)
+        return self._key
+
+    def scrubbed_params(self, scrubber) -> Mapping[str, Any]:
+        """
+        PII-scrubbed view of `params`, computed once per scrubber configuration
+        (per scrubber object when it has no `cache_key`) and shared by every
+        audit emitter that reports this action, hence read-only.
+        """
+        cache_key = getattr(scrubber, "cache_key", None)
+        if cache_key is None:
+            cache_key = id(scrubber)
+        scrubbed = self._scrubbed.get(cache_key)
+        if scrubbed is None:
+            scrubbed = _freeze(scrubber.scrub_data(self.params))
+            self._scrubbed[cache_key] = scrubbed
+        return scrubbed
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __eq__(self, other):
+        if not isinstance(other, Action):
+            return NotImplemented
+        return self.key() == other.key()
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
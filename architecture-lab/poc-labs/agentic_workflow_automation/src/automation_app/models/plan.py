@@ -1,7 +1,15 @@
+import hashlib
+import json
+
 from pydantic import BaseModel, ConfigDict
 from typing import List
 from .action import Action
 
 class Plan(BaseModel):
     actions: List[Action] = []
-    model_config = ConfigDict(extra="forbid")
\ No newline at end of file
+    model_config = ConfigDict(extra="forbid")
+
+    def content_hash(self) -> str:
+        """Stable hash of the plan contents, used as its storage key."""
+        payload = json.dumps(self.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
\ No newline at end of file
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import time
 import uuid
 
 from automation_app.audit.audit_logger import AuditLogger
-from automation_app.config.constants import HITL_TIMEOUT_SECONDS
+from automation_app.config.constants import (
+    DERIVED_IDEMPOTENCY_TTL_SECONDS,
+    HITL_TIMEOUT_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+    PLAN_TIME_BUDGETS,
+    SESSION_PAGE_SIZE,
+)
 from automation_app.models.intent import Intent
 from automation_app.models.plan import Plan
 from automation_app.models.workflow_state import WorkflowState
@@ -22,6 +29,8 @@ class AgenticOrchestrator:
         state_store=None,
         auditor=AuditLogger,
         scrubber=None,
+        prefetch_reads: bool = False,
+        supervisor=None,
     ):
         self.classifier = classifier
         self.planner = planner
@@ -30,6 +39,10 @@ class AgenticOrchestrator:
         self.state_store = state_store
         self.auditor = auditor
         self.scrubber = scrubber or PIIScrubber()
+        # Warm the plan's idempotent reads while a proposal awaits confirmation
+        self.prefetch_reads = prefetch_reads
+        # Runs executions with parked retry backoffs (ExecutionSupervisor)
+        self.supervisor = supervisor
 
     def _get_serialized_plan(self, plan: Plan) -> dict:
         if hasattr(plan, "model_dump"):
@@ -52,9 +65,48 @@ class AgenticOrchestrator:
                 merged[k] = v
         return merged
 
-    async def _run_with_audit(self, plan: Plan, session_id: str):
+    def _plan_deadline(self, plan_type: str | None) -> float:
+        budget = PLAN_TIME_BUDGETS.get(plan_type, PLAN_TIME_BUDGETS["*"])
+        return time.monotonic() + budget
+
+    def _start_execution(
+        self,
+        plan: Plan,
+        session_id: str,
+        plan_type: str | None = None,
+        proposal_id: str | None = None,
+    ):
+        if self.supervisor is not None:
+            self.supervisor.submit(
+                plan,
+                session_id=session_id,
+                deadline=self._plan_deadline(plan_type),
+                proposal_id=proposal_id,
+            )
+            return
+        asyncio.create_task(
+            self._run_with_audit(
+                plan,
+                session_id=session_id,
+                plan_type=plan_type,
+                proposal_id=proposal_id,
+            )
+        )
+
+    async def _run_with_audit(
+        self,
+        plan: Plan,
+        session_id: str,
+        plan_type: str | None = None,
+        proposal_id: str | None = None,
+    ):
         try:
-            await self.executor.run(plan, session_id=session_id)
+            await self.executor.run(
+                plan,
+                session_id=session_id,
+                deadline=self._plan_deadline(plan_type),
+                proposal_id=proposal_id,
+            )
         except Exception as e:
             self.auditor.log(
                 session_id,
@@ -62,10 +114,53 @@ class AgenticOrchestrator:
                 {"error": str(e)},
             )
 
+    def _discard_prefetch(self, context: dict):
+        if self.prefetch_reads:
+            self.executor.discard_prefetch((context.get("data") or {}).get("proposal_id"))
+
     async def _get_context(self, session_id: str) -> dict:
         context = await self.state_store.get_context(session_id)
         return context or {}
 
+    @staticmethod
+    def _idempotency_key(scope: str, session_id: str, client_key: str | None, *derived) -> str | None:
+        """
+        Client-supplied keys win; otherwise the key is derived from `derived`
+        (None when nothing identifies the submission).
+        """
+        if client_key:
+            return f"{scope}:{session_id}:{client_key}"
+        if not derived or any(part is None for part in derived):
+            return None
+        digest = hashlib.sha256("\x1f".join(map(str, derived)).encode()).hexdigest()
+        return f"{scope}:{session_id}:{digest}"
+
+    async def _deduplicated(self, key: str | None, ttl: float, session_id: str, entrypoint: str, handler, pending):
+        """
+        Runs `handler` once per idempotency key. Duplicates get the stored
+        response (or `pending` while the first submission is still running)
+        without re-running planning or adapters.
+        """
+        if key is None:
+            return await handler()
+
+        record = await self.state_store.claim_idempotency_key(key, ttl)
+        if record is not None:
+            self.auditor.log(
+                session_id,
+                "DUPLICATE_REQUEST",
+                {"entrypoint": entrypoint, "status": record["status"]},
+            )
+            return record["response"] if record["status"] == "DONE" else pending
+
+        try:
+            response = await handler()
+        except BaseException:
+            await self.state_store.release_idempotency_key(key)
+            raise
+        await self.state_store.complete_idempotency_key(key, response)
+        return response
+
     # -------------------------------------------------
     # EXECUTE IMMEDIATELY (ASYNC BACKGROUND)
     # -------------------------------------------------
@@ -77,6 +172,33 @@ class AgenticOrchestrator:
         user_id: str = "anonymous",
         role: str | None = None,
         department: str | None = None,
+        idempotency_key: str | None = None,
+    ):
+        if idempotency_key:
+            key, ttl = self._idempotency_key("process", session_id, idempotency_key), IDEMPOTENCY_TTL_SECONDS
+        else:
+            key = self._idempotency_key("process", session_id, None, user_id, user_input)
+            ttl = DERIVED_IDEMPOTENCY_TTL_SECONDS
+
+        return await self._deduplicated(
+            key,
+            ttl,
+            session_id,
+            "process_request",
+            lambda: self._process_request(user_input, session_id, user_id, role, department),
+            pending="Request already in progress",
+        )
+
+    # Routes call the orchestrator under its public name
+    process_request = process_requestasync
+
+    async def _process_request(
+        self,
+        user_input: str,
+        session_id: str,
+        user_id: str,
+        role: str | None,
+        department: str | None,
     ):
         request_id = str(uuid.uuid4())
         sanitized_input = self.scrubber.scrub(user_input)
@@ -121,7 +243,7 @@ class AgenticOrchestrator:
             return "Plan violates policy. Cannot execute."
 
         # Phase 4: Fire-and-forget execution
-        asyncio.create_task(self._run_with_audit(plan, session_id=session_id))
+        self._start_execution(plan, session_id=session_id, plan_type=intent.name)
 
         return "Execution started in background"
 
@@ -187,18 +309,21 @@ class AgenticOrchestrator:
 
         await self.state_store.save_context(
             session_id,
-            {"last_plan": plan_data},
+            {"last_plan": plan_data, "plan_type": intent.name, "proposal_id": request_id},
             state=WorkflowState.PROPOSED,
             timestamp=timestamp,
         )
 
+        if self.prefetch_reads:
+            self.executor.start_prefetch(plan, session_id=session_id, proposal_id=request_id)
+
         return {
             "state": WorkflowState.PROPOSED,
             "message": "Plan proposed, awaiting confirmation",
             "plan": plan_data,
         }
 
-    async def confirm(self, session_id: str):
+    async def confirm(self, session_id: str, idempotency_key: str | None = None):
         request_id = str(uuid.uuid4())
         self.auditor.log(
             session_id,
@@ -207,21 +332,44 @@ class AgenticOrchestrator:
         )
 
         context = await self._get_context(session_id)
+        proposal_id = (context.get("data") or {}).get("proposal_id")
+        key = self._idempotency_key("confirm", session_id, idempotency_key, proposal_id)
+
+        return await self._deduplicated(
+            key,
+            IDEMPOTENCY_TTL_SECONDS,
+            session_id,
+            "confirm",
+            lambda: self._confirm(session_id, context),
+            pending={"state": WorkflowState.IN_PROGRESS, "message": "Execution started in background"},
+        )
 
+    async def _confirm(self, session_id: str, context: dict):
         if context.get("state") != WorkflowState.PROPOSED:
             return {"state": context.get("state"), "message": "Nothing to confirm"}
 
-        plan_data = context["data"]["last_plan"]
-        plan = Plan(**plan_data)
+        data = context["data"]
+        plan = Plan(**data["last_plan"])
+        plan_type = data.get("plan_type")
 
-        # Update state to reflect that execution has started
-        await self.state_store.save_context(
-            session_id,
-            {"last_plan": plan_data},
-            state=WorkflowState.IN_PROGRESS,
+        # Compare-and-set, so racing confirms start at most one execution
+        started = await self.state_store.update_if_state_matches(
+            session_id=session_id,
+            expected_state=WorkflowState.PROPOSED,
+            new_state=WorkflowState.IN_PROGRESS,
+            data=dict(data),
+        )
+        if not started:
+            latest = await self._get_context(session_id)
+            return {"state": latest.get("state"), "message": "Nothing to confirm"}
+
+        # The time budget starts when execution does, not when the plan was proposed
+        self._start_execution(
+            plan,
+            session_id=session_id,
+            plan_type=plan_type,
+            proposal_id=data.get("proposal_id"),
         )
-
-        asyncio.create_task(self._run_with_audit(plan, session_id=session_id))
 
         return {
             "state": WorkflowState.IN_PROGRESS,
@@ -241,65 +389,88 @@ class AgenticOrchestrator:
         if context.get("state") != WorkflowState.PROPOSED:
             return {"state": context.get("state"), "message": "Nothing to reject"}
 
-        plan_data = context["data"]["last_plan"]
+        # A session can lack its plan (e.g. evicted and re-created mid-run)
+        plan_data = (context.get("data") or {}).get("last_plan")
 
         await self.state_store.save_context(
             session_id,
             {"last_plan": plan_data},
             state=WorkflowState.REJECTED,
         )
+        self._discard_prefetch(context)
 
         return {
             "state": WorkflowState.REJECTED,
             "message": "Plan rejected by user",
         }
 
+    async def list_sessions(self, state: WorkflowState, cursor: str | None = None, limit: int = 100) -> dict:
+        """
+        One page of sessions in `state` (ids, state and timestamp only).
+        """
+        session_ids, next_cursor = await self.state_store.list_sessions(
+            state=state, cursor=cursor, limit=limit
+        )
+        sessions = []
+        for session_id in session_ids:
+            context = await self._get_context(session_id)
+            sessions.append({
+                "session_id": session_id,
+                "state": context.get("state"),
+                "timestamp": context.get("timestamp"),
+            })
+        return {"sessions": sessions, "next_cursor": next_cursor}
+
     async def cleanup_stale_proposals(self, timeout_seconds: int = HITL_TIMEOUT_SECONDS):
         """
         Auto-reject proposals that have been in PROPOSED state longer than timeout.
+        Walks only PROPOSED sessions, a batch at a time, via the state index.
         """
-        sessions = await self.state_store.get_all_sessions()
         now = time.time()
+        batches = self.state_store.iter_sessions(state=WorkflowState.PROPOSED, batch_size=SESSION_PAGE_SIZE)
+        async for batch in batches:
+            for session_id, context in batch:
+                await self._reject_if_stale(session_id, context, now, timeout_seconds)
 
-        for session_id in sessions:
-            context = await self._get_context(session_id)
+    async def _reject_if_stale(self, session_id: str, context: dict, now: float, timeout_seconds: int):
+        if context.get("state") != WorkflowState.PROPOSED:
+            return
 
-            if context.get("state") != WorkflowState.PROPOSED:
-                continue
+        proposal_time = context.get("timestamp", now)
+        if now - proposal_time <= timeout_seconds:
+            return
 
-            proposal_time = context.get("timestamp", now)
-            if now - proposal_time <= timeout_seconds:
-                continue
+        # A session can lack its plan (e.g. evicted and re-created mid-run)
+        plan_data = (context.get("data") or {}).get("last_plan")
 
-            plan_data = context["data"]["last_plan"]
+        update_done = False
+        update_if_state_matches = getattr(
+            self.state_store, "update_if_state_matches", None
+        )
 
-            update_done = False
-            update_if_state_matches = getattr(
-                self.state_store, "update_if_state_matches", None
+        if callable(update_if_state_matches):
+            update_done = await update_if_state_matches(
+                session_id=session_id,
+                expected_state=WorkflowState.PROPOSED,
+                new_state=WorkflowState.REJECTED,
+                data={"last_plan": plan_data},
             )
 
-            if callable(update_if_state_matches):
-                update_done = await update_if_state_matches(
-                    session_id=session_id,
-                    expected_state=WorkflowState.PROPOSED,
-                    new_state=WorkflowState.REJECTED,
-                    data={"last_plan": plan_data},
-                )
-
-            if not update_done:
-                # Fallback: non-atomic, but preserves existing interface
-                latest_context = await self._get_context(session_id)
-                if latest_context.get("state") != WorkflowState.PROPOSED:
-                    continue
-
-                await self.state_store.save_context(
-                    session_id,
-                    {"last_plan": plan_data},
-                    state=WorkflowState.REJECTED,
-                )
+        if not update_done:
+            # Fallback: non-atomic, but preserves existing interface
+            latest_context = await self._get_context(session_id)
+            if latest_context.get("state") != WorkflowState.PROPOSED:
+                return
 
-            self.auditor.log(
+            await self.state_store.save_context(
                 session_id,
-                "HITL_TIMEOUT_REJECTED",
-                {"message": "Proposal auto-rejected due to timeout"},
+                {"last_plan": plan_data},
+                state=WorkflowState.REJECTED,
             )
+
+        self._discard_prefetch(context)
+        self.auditor.log(
+            session_id,
+            "HITL_TIMEOUT_REJECTED",
+            {"message": "Proposal auto-rejected due to timeout"},
+        )
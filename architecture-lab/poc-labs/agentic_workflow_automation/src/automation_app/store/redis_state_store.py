@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import json
+import math
+from time import time
+from typing import AsyncIterator, Dict, List, Tuple
+
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from automation_app.config.constants import (
+    REDIS_KEY_PREFIX,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_URL,
+    SESSION_PAGE_SIZE,
+    SESSION_TTLS,
+)
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.session_batches import SessionBatch, iter_session_batches
+from automation_app.utils.metrics import MetricsRegistry
+
+DEFAULT_TTL = "*"
+# Session hash fields; data keys are stored as "d:<key>" -> JSON value
+STATE_FIELD = "~state"
+TIMESTAMP_FIELD = "~ts"
+DATA_PREFIX = "d:"
+
+# Writes a session atomically: replace ("set"), compare-and-set on the
+# current state ("cas") or merge fields into an existing session ("merge"). Refreshes the key
+# TTL for the resulting state and moves the session between state indexes
+# (sorted sets scored by a global entry sequence, like StateIndex). Every key
+# it touches is passed in KEYS, one state index per state.
+#   KEYS: session hash, sequence counter, state indexes...
+#   ARGV: states JSON (naming the state indexes in order), session id, mode,
+#         expected state, new state ("" = keep), timestamp, TTLs JSON (ms),
+#         field/value pairs...
+WRITE_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], '~state')
+local mode = ARGV[3]
+if (mode == 'cas' and current ~= ARGV[4]) or (mode == 'merge' and not current) then
+    return 0
+end
+
+local merge = mode == 'merge' and current
+local state = ARGV[5]
+if state == '' then
+    state = current or 'PROPOSED'
+end
+local indexes = {}
+for i, name in ipairs(cjson.decode(ARGV[1])) do
+    indexes[name] = KEYS[i + 2]
+end
+if not indexes[state] then
+    return redis.error_reply('unknown session state ' .. state)
+end
+if not merge then
+    redis.call('DEL', KEYS[1])
+    redis.call('HSET', KEYS[1], '~ts', ARGV[6])
+elseif state ~= current then
+    redis.call('HSET', KEYS[1], '~ts', ARGV[6])
+end
+redis.call('HSET', KEYS[1], '~state', state)
+if #ARGV >= 8 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 8))
+end
+
+local ttls = cjson.decode(ARGV[7])
+local ttl = ttls[state] or ttls['*']
+if ttl then
+    redis.call('PEXPIRE', KEYS[1], ttl)
+else
+    redis.call('PERSIST', KEYS[1])
+end
+
+if state ~= current then
+    if current and indexes[current] then
+        redis.call('ZREM', indexes[current], ARGV[2])
+    end
+    redis.call('ZADD', indexes[state], redis.call('INCR', KEYS[2]), ARGV[2])
+end
+return 1
+"""
+
+# Returns the members of a state index whose session still exists in that
+# state, dropping the rest (expired by Redis, deleted or moved on).
+#   KEYS: state index, session hashes...
+#   ARGV: state, session ids (in the order of their hashes)...
+PRUNE_SCRIPT = """
+local live = {}
+for i = 2, #KEYS do
+    if redis.call('HGET', KEYS[i], '~state') == ARGV[1] then
+        live[#live + 1] = ARGV[i]
+    else
+        redis.call('ZREM', KEYS[1], ARGV[i])
+    end
+end
+return live
+"""
+
+
+class RedisStateStore:
+    """
+    State store over the Redis protocol, shared by every orchestrator
+    instance pointing at the same server.
+
+    Each session is a hash with a native key TTL for its state (`ttls`, "*"
+    as default), refreshed on every write; session writes, including the
+    `update_if_state_matches` CAS, run as server-side scripts so they are
+    atomic across instances. Per-state sorted sets back `list_sessions`
+    paging; entries of sessions Redis has expired are dropped as pages
+    come across them and by `purge_expired()`. `get_all_sessions` walks the
+    keyspace with SCAN and pipelines the reads.
+
+    `client` must decode responses; by default one is built from `url` over
+    a blocking pool of `max_connections`.
+    """
+
+    def __init__(
+        self,
+        client: Redis | None = None,
+        url: str | None = REDIS_URL,
+        prefix: str = REDIS_KEY_PREFIX,
+        ttls: Dict[str, float] | None = None,
+        max_connections: int = REDIS_MAX_CONNECTIONS,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.client = client or Redis(
+            connection_pool=BlockingConnectionPool.from_url(
+                url,
+                max_connections=max_connections,
+                decode_responses=True,
+            )
+        )
+        self.prefix = prefix
+        self.ttls = ttls or SESSION_TTLS
+        self.metrics = metrics or MetricsRegistry()
+        self._ttls_ms = json.dumps({
+            state: int(ttl * 1000) for state, ttl in self.ttls.items() if math.isfinite(ttl)
+        })
+        default_ttl = self.ttls.get(DEFAULT_TTL, math.inf)
+        self._plan_ttl_ms = int(default_ttl * 1000) if math.isfinite(default_ttl) else None
+        self._states = json.dumps([state.value for state in WorkflowState])
+        self._index_keys = [self._index_key(state) for state in WorkflowState]
+        self._write = self.client.register_script(WRITE_SCRIPT)
+        self._prune = self.client.register_script(PRUNE_SCRIPT)
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    async def save_context(
+        self,
+        session_id: str,
+        data: dict,
+        state: WorkflowState = WorkflowState.PROPOSED,
+        timestamp: float | None = None,
+    ):
+        await self._write_session(session_id, "set", data, state, timestamp=timestamp)
+
+    async def update_context(
+        self,
+        session_id: str,
+        fields: dict,
+        state: WorkflowState | None = None,
+    ) -> bool:
+        """
+        Partial update: merges `fields` into the session data instead of
+        replacing it. State and timestamp are kept unless `state` is given.
+        Returns False, changing nothing, when the session does not exist.
+        """
+        return bool(await self._write_session(session_id, "merge", fields, state))
+
+    async def update_if_state_matches(
+        self,
+        session_id: str,
+        expected_state: WorkflowState,
+        new_state: WorkflowState,
+        data: dict,
+    ) -> bool:
+        """
+        Compare-and-set on the session state: only transitions (and replaces
+        the data) when the session is currently in `expected_state`.
+        """
+        applied = await self._write_session(session_id, "cas", data, new_state, expected_state=expected_state)
+        self.metrics.increment("redis_store.cas", result="applied" if applied else "conflict")
+        return bool(applied)
+
+    async def get_context(self, session_id: str) -> dict:
+        context = await self.find_context(session_id)
+        if context is None:
+            return {
+                "state": WorkflowState.PROPOSED,
+                "data": {},
+                "timestamp": time(),
+            }
+        return context
+
+    async def find_context(self, session_id: str) -> dict | None:
+        """
+        The session's context, or None if it does not exist (or has expired).
+        """
+        return _decode(await self.client.hgetall(self._session_key(session_id)))
+
+    async def get_all_sessions(self) -> Dict[str, dict]:
+        """
+        Returns a snapshot of all live sessions for cleanup / inspection.
+        """
+        sessions: Dict[str, dict] = {}
+        session_prefix = self._session_key("")
+        cursor = 0
+        while True:
+            cursor, keys = await self.client.scan(cursor, match=f"{session_prefix}*", count=SESSION_PAGE_SIZE)
+            if keys:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.hgetall(key)
+                    for key, fields in zip(keys, await pipe.execute()):
+                        context = _decode(fields)
+                        if context is not None:
+                            sessions[key[len(session_prefix):]] = context
+            if cursor == 0:
+                return sessions
+
+    async def list_sessions(
+        self,
+        state: WorkflowState,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Tuple[List[str], str | None]:
+        """
+        One page of ids of live sessions in `state`, oldest entry first, and
+        the opaque cursor for the next page (None when exhausted). Raises
+        ValueError for a malformed cursor.
+        """
+        after = int(cursor) if cursor else 0
+        session_ids: List[str] = []
+        more = True
+
+        while more and len(session_ids) < limit:
+            page, more = await self._index_page(state, after, limit - len(session_ids))
+            if not page:
+                break
+            after = page[-1][1]
+            session_ids.extend(await self._live(state, [session_id for session_id, _ in page]))
+
+        return session_ids, str(after) if more else None
+
+    def iter_sessions(
+        self,
+        state: WorkflowState | None = None,
+        batch_size: int = SESSION_PAGE_SIZE,
+    ) -> AsyncIterator[SessionBatch]:
+        """
+        Live sessions (only those in `state`, if given) as batches of
+        (session_id, context), walked by cursor so memory stays bounded;
+        each batch is read in one pipeline.
+        """
+        return iter_session_batches(self, state=state, batch_size=batch_size, fetch=self._fetch)
+
+    async def delete_session(self, session_id: str):
+        """
+        Remove a session (used by HITL cleanup).
+        """
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(self._session_key(session_id))
+            for state in WorkflowState:
+                pipe.zrem(self._index_key(state), session_id)
+            await pipe.execute()
+
+    async def purge_expired(self) -> int:
+        """
+        Redis expires sessions itself; this drops their leftover index
+        entries and returns how many were removed.
+        """
+        removed = 0
+        for state in WorkflowState:
+            after, more = 0, True
+            while more:
+                page, more = await self._index_page(state, after, SESSION_PAGE_SIZE)
+                if not page:
+                    break
+                after = page[-1][1]
+                live = await self._live(state, [session_id for session_id, _ in page])
+                removed += len(page) - len(live)
+        return removed
+
+    # ------------------------------------------------------------------
+    # Plans and idempotency
+    # ------------------------------------------------------------------
+
+    async def claim_idempotency_key(self, key: str, ttl: float) -> dict | None:
+        """
+        Atomically claims `key` for `ttl` seconds. Returns None when the caller
+        now owns the key, or the existing record when it is a duplicate.
+        """
+        record = json.dumps({"status": "PENDING", "response": None})
+        existing = await self.client.set(
+            self._key("idempotency", key),
+            record,
+            nx=True,
+            get=True,
+            px=max(1, int(ttl * 1000)),
+        )
+        return json.loads(existing) if existing is not None else None
+
+    async def complete_idempotency_key(self, key: str, response):
+        """
+        Stores the response handed back to duplicates of a claimed key.
+        """
+        await self.client.set(
+            self._key("idempotency", key),
+            json.dumps({"status": "DONE", "response": response}, default=str),
+            xx=True,
+            keepttl=True,
+        )
+
+    async def release_idempotency_key(self, key: str):
+        await self.client.delete(self._key("idempotency", key))
+
+    async def save_plan(self, plan_hash: str, plan_data: dict):
+        """
+        Stores a serialized plan under its content hash (no-op if already stored).
+        """
+        await self.client.set(
+            self._key("plan", plan_hash),
+            json.dumps(plan_data, default=str),
+            nx=True,
+            px=self._plan_ttl_ms,
+        )
+
+    async def get_plan(self, plan_hash: str) -> dict | None:
+        plan = await self.client.get(self._key("plan", plan_hash))
+        return json.loads(plan) if plan is not None else None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def restore(self) -> int:
+        """
+        Nothing to rebuild: the state lives on the server.
+        """
+        return 0
+
+    async def close(self):
+        await self.client.aclose()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}{kind}:{name}"
+
+    def _session_key(self, session_id: str) -> str:
+        return self._key("session", session_id)
+
+    def _index_key(self, state) -> str:
+        return self._key("state", _state_value(state))
+
+    async def _write_session(
+        self,
+        session_id: str,
+        mode: str,
+        fields: dict,
+        state,
+        timestamp: float | None = None,
+        expected_state=None,
+    ) -> int:
+        args = [
+            self._states,
+            session_id,
+            mode,
+            _state_value(expected_state) if expected_state is not None else "",
+            _state_value(state) if state is not None else "",
+            timestamp or time(),
+            self._ttls_ms,
+        ]
+        for key, value in fields.items():
+            args.append(DATA_PREFIX + key)
+            args.append(json.dumps(value, default=str))
+        return await self._write(
+            keys=[self._session_key(session_id), self._key("seq", "sessions"), *self._index_keys],
+            args=args,
+        )
+
+    async def _index_page(self, state, after: int, limit: int) -> Tuple[List[Tuple[str, int]], bool]:
+        page = await self.client.zrangebyscore(
+            self._index_key(state),
+            f"({after}",
+            "+inf",
+            start=0,
+            num=limit + 1,
+            withscores=True,
+        )
+        return [(session_id, int(seq)) for session_id, seq in page[:limit]], len(page) > limit
+
+    async def _fetch(self, session_ids: List[str]) -> List[dict | None]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.hgetall(self._session_key(session_id))
+            return [_decode(fields) for fields in await pipe.execute()]
+
+    async def _live(self, state, session_ids: List[str]) -> List[str]:
+        live = await self._prune(
+            keys=[self._index_key(state), *(self._session_key(session_id) for session_id in session_ids)],
+            args=[_state_value(state), *session_ids],
+        )
+        if len(live) < len(session_ids):
+            self.metrics.increment("redis_store.stale_index_entries", len(session_ids) - len(live))
+        return live
+
+
+_STATES = {state.value: state for state in WorkflowState}
+
+
+def _state_value(state) -> str:
+    return getattr(state, "value", state)
+
+
+def _decode(fields: dict) -> dict | None:
+    if not fields:
+        return None
+    return {
+        "state": _STATES.get(fields[STATE_FIELD], fields[STATE_FIELD]),
+        "data": {
+            key[len(DATA_PREFIX):]: json.loads(value)
+            for key, value in fields.items()
+            if key.startswith(DATA_PREFIX)
+        },
+        "timestamp": float(fields[TIMESTAMP_FIELD]),
+    }
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, List, Tuple
+
+from automation_app.config.constants import SESSION_PAGE_SIZE
+from automation_app.models.workflow_state import WorkflowState
+
+SessionBatch = List[Tuple[str, dict]]
+
+
+async def iter_session_batches(
+    store,
+    state: WorkflowState | None = None,
+    batch_size: int = SESSION_PAGE_SIZE,
+    fetch: Callable[[List[str]], Awaitable[List[dict | None]]] | None = None,
+) -> AsyncIterator[SessionBatch]:
+    """
+    Walks `store.list_sessions` cursors (every state unless `state` is given)
+    and yields the live sessions of each page as (session_id, context)
+    pairs, so at most `batch_size` contexts are held at a time. Sessions
+    that moved state or vanished while the walk was under way are skipped.
+
+    `fetch` loads the contexts of one page (default: `find_context` per id).
+    """
+    fetch = fetch or (lambda session_ids: asyncio.gather(*map(store.find_context, session_ids)))
+    for current in [state] if state is not None else WorkflowState:
+        cursor = None
+        while True:
+            session_ids, cursor = await store.list_sessions(state=current, cursor=cursor, limit=batch_size)
+            if session_ids:
+                batch = [
+                    (session_id, context)
+                    for session_id, context in zip(session_ids, await fetch(session_ids))
+                    if context is not None and context["state"] == current
+                ]
+                if batch:
+                    yield batch
+            if cursor is None:
+                break
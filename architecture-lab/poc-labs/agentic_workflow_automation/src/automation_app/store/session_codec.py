@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import msgpack
+
+# msgpack extension type holding a plan's actions as
+# [adapter name id, method name id, params] rows
+ACTIONS_EXT = 1
+
+
+class PackedSession:
+    """
+    Session data held as msgpack bytes plus an overlay of fields written
+    since it was packed, so partial updates never re-encode the plan.
+    """
+
+    __slots__ = ("codec", "base", "overlay")
+
+    def __init__(self, codec: SessionCodec, base: bytes):
+        self.codec = codec
+        self.base = base
+        self.overlay: Dict[str, Any] | None = None
+
+    def update(self, fields: dict):
+        if self.overlay is None:
+            self.overlay = {}
+        self.overlay.update(fields)
+
+    def unpack(self) -> dict:
+        data = self.codec.decode(self.base)
+        if self.overlay:
+            data.update(self.overlay)
+        return data
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+
+class SessionCodec:
+    """
+    Compact msgpack encoding for StateStore session data.
+
+    The actions of a stored plan (`data["last_plan"]["actions"]`) are packed
+    as rows with adapter and method names interned in a table shared by
+    every session this codec encodes. Values msgpack cannot represent raise
+    TypeError (the store then keeps the plain dict).
+    """
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+
+    def pack(self, data: dict) -> PackedSession:
+        return PackedSession(self, self.encode(data))
+
+    def encode(self, data: dict) -> bytes:
+        plan = data.get("last_plan")
+        actions = plan.get("actions") if isinstance(plan, dict) else None
+        if isinstance(actions, list) and all(_is_action(a) for a in actions):
+            rows = [[self._intern(a["adapter"]), self._intern(a["method"]), a["params"]] for a in actions]
+            packed_actions = msgpack.ExtType(ACTIONS_EXT, msgpack.packb(rows, use_bin_type=True))
+            data = {**data, "last_plan": {**plan, "actions": packed_actions}}
+        return msgpack.packb(data, use_bin_type=True)
+
+    def decode(self, payload: bytes) -> dict:
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False, ext_hook=self._ext_hook)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def _ext_hook(self, code: int, payload: bytes):
+        if code != ACTIONS_EXT:
+            return msgpack.ExtType(code, payload)
+        names = self._names
+        return [
+            {"adapter": names[adapter], "method": names[method], "params": params}
+            for adapter, method, params in msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        ]
+
+
+def _is_action(value) -> bool:
+    return (
+        isinstance(value, dict)
+        and value.keys() == {"adapter", "method", "params"}
+        and isinstance(value["adapter"], str)
+        and isinstance(value["method"], str)
+    )
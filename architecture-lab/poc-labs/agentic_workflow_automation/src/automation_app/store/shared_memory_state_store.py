@@ -0,0 +1,395 @@
+from __future__ import annotations
+
+import os
+from time import time
+from typing import AsyncIterator, Dict, List, Tuple
+
+import msgpack
+
+from automation_app.config.constants import (
+    SESSION_PAGE_SIZE,
+    SESSION_TTLS,
+    SHARED_SESSIONS_SLOT_BYTES,
+    SHARED_SESSIONS_SLOTS,
+)
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.session_batches import SessionBatch, iter_session_batches
+from automation_app.store.shared_session_table import SharedSessionTable
+from automation_app.utils.metrics import MetricsRegistry
+
+DEFAULT_TTL = "*"
+# Key namespaces within the table
+SESSION_PREFIX = "s:"
+PLAN_PREFIX = "p:"
+IDEMPOTENCY_PREFIX = "i:"
+INDEX_PREFIX = "x:"
+# Most session ids held by one page of a state's index
+INDEX_PAGE_ENTRIES = 64
+
+
+class SharedMemoryStateStore:
+    """
+    State store over a SharedSessionTable, so every worker process on the
+    host (uvicorn `--workers N`) sees the same sessions without an external
+    service.
+
+    Entries are msgpack-encoded; sessions expire once unwritten for the TTL
+    of their state (`ttls`, "*" as default). Read-modify-write operations
+    (`update_context`, the `update_if_state_matches` CAS, idempotency
+    claims) run under the table's write lock, so they are atomic across
+    processes.
+
+    Sessions are also indexed by state in the table itself: every entry
+    into a state takes the state's next sequence number, stored with the
+    session and appended to the state's newest index page. `list_sessions`
+    walks those pages (entries whose session has moved on are skipped), so
+    it never scans the table; `purge_expired` prunes such stale entries.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        slots: int = SHARED_SESSIONS_SLOTS,
+        slot_bytes: int = SHARED_SESSIONS_SLOT_BYTES,
+        ttls: Dict[str, float] | None = None,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.table = SharedSessionTable(path, slots=slots, slot_bytes=slot_bytes)
+        self.ttls = ttls or SESSION_TTLS
+        self.metrics = metrics or MetricsRegistry()
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    async def save_context(
+        self,
+        session_id: str,
+        data: dict,
+        state: WorkflowState = WorkflowState.PROPOSED,
+        timestamp: float | None = None,
+    ):
+        state = _state_value(state)
+        self._write_session(session_id, lambda current: [state, timestamp or time(), data, 0])
+
+    async def update_context(
+        self,
+        session_id: str,
+        fields: dict,
+        state: WorkflowState | None = None,
+    ) -> bool:
+        """
+        Partial update: merges `fields` into the session data instead of
+        replacing it. State and timestamp are kept unless `state` is given.
+        Returns False, changing nothing, when the session does not exist.
+        """
+        new_state = _state_value(state) if state is not None else None
+
+        def merge(current):
+            if current is None:
+                return None
+            current[2].update(fields)
+            if new_state is not None and new_state != current[0]:
+                current[0], current[1] = new_state, time()
+            return current
+
+        return self._write_session(session_id, merge)
+
+    async def update_if_state_matches(
+        self,
+        session_id: str,
+        expected_state: WorkflowState,
+        new_state: WorkflowState,
+        data: dict,
+    ) -> bool:
+        """
+        Compare-and-set on the session state: only transitions (and replaces
+        the data) when the session is currently in `expected_state`.
+        """
+        expected, new_state = _state_value(expected_state), _state_value(new_state)
+
+        def swap(current):
+            if current is None or current[0] != expected:
+                return None
+            return [new_state, time(), data, current[3]]
+
+        return self._write_session(session_id, swap)
+
+    async def get_context(self, session_id: str) -> dict:
+        context = await self.find_context(session_id)
+        if context is None:
+            return {
+                "state": WorkflowState.PROPOSED,
+                "data": {},
+                "timestamp": time(),
+            }
+        return context
+
+    async def find_context(self, session_id: str) -> dict | None:
+        """
+        The session's context, or None if it does not exist (or has expired).
+        """
+        value = self.table.get(_session_key(session_id))
+        return _context(value) if value is not None else None
+
+    async def get_all_sessions(self) -> Dict[str, dict]:
+        """
+        Returns a snapshot of all live sessions for cleanup / inspection.
+        """
+        return {
+            key[len(SESSION_PREFIX):]: _context(value)
+            for _, key, value in self.table.scan()
+            if key.startswith(SESSION_PREFIX)
+        }
+
+    async def list_sessions(
+        self,
+        state: WorkflowState,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Tuple[List[str], str | None]:
+        """
+        One page of ids of live sessions in `state`, oldest entry first, and
+        the opaque cursor for the next page (None when exhausted). Raises
+        ValueError for a malformed cursor.
+        """
+        state = _state_value(state)
+        meta = self.table.get(_index_key(state))
+        if meta is None:
+            return [], None
+        _, head, tail = _unpack(meta)
+        page_no, after = _parse_cursor(cursor) if cursor else (tail, 0)
+        session_ids: List[str] = []
+
+        for page_no in range(max(page_no, tail), head + 1):
+            page = self.table.get(_index_key(state, page_no))
+            for seq, session_id in _unpack(page) if page is not None else ():
+                if seq <= after:
+                    continue
+                if len(session_ids) == limit:
+                    return session_ids, f"{page_no}:{after}"
+                after = seq
+                if self._indexed(state, seq, session_id):
+                    session_ids.append(session_id)
+        return session_ids, None
+
+    def iter_sessions(
+        self,
+        state: WorkflowState | None = None,
+        batch_size: int = SESSION_PAGE_SIZE,
+    ) -> AsyncIterator[SessionBatch]:
+        """
+        Live sessions (only those in `state`, if given) as batches of
+        (session_id, context), walked by cursor so memory stays bounded.
+        """
+        return iter_session_batches(self, state=state, batch_size=batch_size)
+
+    async def delete_session(self, session_id: str):
+        """
+        Remove a session (used by HITL cleanup).
+        """
+        self.table.delete(_session_key(session_id))
+
+    async def purge_expired(self) -> int:
+        """
+        Frees the slots of every expired entry; returns how many were freed.
+        """
+        purged = self.table.purge_expired()
+        if purged:
+            self.metrics.increment("shared_store.evictions", purged, reason="expired")
+        with self.table.locked():
+            for state in _STATES:
+                self._prune_index(state)
+        return purged
+
+    # ------------------------------------------------------------------
+    # Plans and idempotency
+    # ------------------------------------------------------------------
+
+    async def claim_idempotency_key(self, key: str, ttl: float) -> dict | None:
+        """
+        Atomically claims `key` for `ttl` seconds. Returns None when the caller
+        now owns the key, or the existing record when it is a duplicate.
+        """
+        existing = []
+
+        def claim(current):
+            if current is not None:
+                existing.append(_unpack(current))
+                return None
+            return _pack({"status": "PENDING", "response": None}), ttl
+
+        self.table.update(_idempotency_key(key), claim)
+        return existing[0] if existing else None
+
+    async def complete_idempotency_key(self, key: str, response):
+        """
+        Stores the response handed back to duplicates of a claimed key.
+        """
+        def complete(current):
+            if current is None:
+                return None
+            return _pack({"status": "DONE", "response": response}), None
+
+        self.table.update(_idempotency_key(key), complete, keep_expiry=True)
+
+    async def release_idempotency_key(self, key: str):
+        self.table.delete(_idempotency_key(key))
+
+    async def save_plan(self, plan_hash: str, plan_data: dict):
+        """
+        Stores a serialized plan under its content hash (no-op if already stored).
+        """
+        self.table.update(
+            PLAN_PREFIX + plan_hash,
+            lambda current: None if current is not None else (_pack(plan_data), self.ttl_for(DEFAULT_TTL)),
+        )
+
+    async def get_plan(self, plan_hash: str) -> dict | None:
+        value = self.table.get(PLAN_PREFIX + plan_hash)
+        return _unpack(value) if value is not None else None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def restore(self) -> int:
+        """
+        Nothing to rebuild: the table outlives the worker processes.
+        """
+        return 0
+
+    async def close(self):
+        self.table.close()
+
+    def ttl_for(self, state) -> float | None:
+        ttl = self.ttls.get(_state_value(state), self.ttls.get(DEFAULT_TTL))
+        return ttl if ttl is not None and ttl != float("inf") else None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _write_session(self, session_id: str, compute) -> bool:
+        """
+        Under the table lock: `compute(current [state, timestamp, data, seq]
+        or None)` returns the new session (or None to leave it untouched);
+        a session entering a state is appended to that state's index.
+        """
+        key = _session_key(session_id)
+        with self.table.locked():
+            value = self.table.get(key)
+            current = _unpack(value) if value is not None else None
+            previous_state = current[0] if current is not None else None
+            session = compute(current)
+            if session is None:
+                return False
+            if session[0] != previous_state:
+                session[3] = self._index_add(session[0], session_id)
+            else:
+                session[3] = current[3]
+            self.table.put(key, _pack(session), ttl=self.ttl_for(session[0]))
+            return True
+
+    def _index_add(self, state: str, session_id: str) -> int:
+        """
+        Under the table lock: appends `session_id` to the newest index page
+        of `state`, opening a new page once it holds INDEX_PAGE_ENTRIES or
+        would outgrow a slot. Returns the entry's sequence number.
+        """
+        meta = self.table.get(_index_key(state))
+        seq, head, tail = _unpack(meta) if meta is not None else (1, 0, 0)
+        page = self.table.get(_index_key(state, head))
+        entries = _unpack(page) if page is not None else []
+        entries.append([seq, session_id])
+        packed = _pack(entries)
+        if len(entries) > 1 and (
+            len(entries) > INDEX_PAGE_ENTRIES
+            or len(_index_key(state, head)) + len(packed) > self.table.capacity
+        ):
+            head += 1
+            packed = _pack([[seq, session_id]])
+        self.table.put(_index_key(state, head), packed)
+        self.table.put(_index_key(state), _pack([seq + 1, head, tail]))
+        return seq
+
+    def _indexed(self, state: str, seq: int, session_id: str) -> bool:
+        value = self.table.get(_session_key(session_id))
+        if value is None:
+            return False
+        session = _unpack(value)
+        return session[0] == state and session[3] == seq
+
+    def _prune_index(self, state: str):
+        """
+        Under the table lock: drops entries of sessions that left `state`
+        from its sealed index pages, and pages left empty.
+        """
+        meta = self.table.get(_index_key(state))
+        if meta is None:
+            return
+        seq, head, tail = _unpack(meta)
+        stale = 0
+        for page_no in range(tail, head):
+            page = self.table.get(_index_key(state, page_no))
+            if page is None:
+                continue
+            entries = _unpack(page)
+            live = [entry for entry in entries if self._indexed(state, *entry)]
+            stale += len(entries) - len(live)
+            if not live:
+                self.table.delete(_index_key(state, page_no))
+            elif len(live) < len(entries):
+                self.table.put(_index_key(state, page_no), _pack(live))
+
+        new_tail = tail
+        while new_tail < head and self.table.get(_index_key(state, new_tail)) is None:
+            new_tail += 1
+        if new_tail != tail:
+            self.table.put(_index_key(state), _pack([seq, head, new_tail]))
+        if stale:
+            self.metrics.increment("shared_store.stale_index_entries", stale)
+
+
+_STATES = {state.value: state for state in WorkflowState}
+
+
+def _session_key(session_id: str) -> str:
+    return SESSION_PREFIX + session_id
+
+
+def _idempotency_key(key: str) -> str:
+    return IDEMPOTENCY_PREFIX + key
+
+
+def _index_key(state: str, page_no: int | None = None) -> str:
+    """
+    Key of a state's index metadata [next seq, head page, tail page], or of
+    one of its pages [[seq, session_id], ...].
+    """
+    return f"{INDEX_PREFIX}{state}" if page_no is None else f"{INDEX_PREFIX}{state}:{page_no}"
+
+
+def _parse_cursor(cursor: str) -> Tuple[int, int]:
+    page_no, _, after = cursor.partition(":")
+    page_no, after = int(page_no), int(after)
+    if page_no < 0 or after < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return page_no, after
+
+
+def _state_value(state) -> str:
+    return getattr(state, "value", state)
+
+
+def _pack(value) -> bytes:
+    return msgpack.packb(value, use_bin_type=True, default=str)
+
+
+def _unpack(value: bytes):
+    return msgpack.unpackb(value, raw=False, strict_map_key=False)
+
+
+def _context(value: bytes) -> dict:
+    state, timestamp, data, _ = _unpack(value)
+    return {"state": _STATES.get(state, state), "data": data, "timestamp": timestamp}
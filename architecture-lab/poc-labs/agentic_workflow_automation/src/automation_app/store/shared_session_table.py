@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from time import time
+from typing import Callable, Iterator, Set, Tuple
+
+MAGIC = b"AWSTBL02"
+# magic, slot count, slot size
+HEADER = struct.Struct("<8sII")
+# generation (odd while compacting), empty slots, tombstones; after HEADER
+STATS = struct.Struct("<III")
+HEADER_BYTES = 64
+# Per-slot sequence counter (seqlock): odd while a write is in progress
+SEQ = struct.Struct("<I")
+# status, key length, value length, expiry instant (0 = never)
+SLOT = struct.Struct("<BxHId")
+SLOT_HEADER_BYTES = SEQ.size + SLOT.size
+
+EMPTY, USED, DELETED = 0, 1, 2
+# Reader retries on a slot being written before checking for a dead writer
+SPIN_LIMIT = 10_000
+# Tombstones are compacted away once they take this share of the slots, or
+# once fewer than MIN_EMPTY_SHARE of the slots are still EMPTY (probes only
+# stop at EMPTY slots). At least COMPACT_MIN_TOMBSTONES must have piled up.
+COMPACT_TOMBSTONE_SHARE = 0.25
+MIN_EMPTY_SHARE = 0.125
+COMPACT_MIN_TOMBSTONES = 64
+
+Updater = Callable[[bytes | None], Tuple[bytes, float | None] | None]
+
+
+class SharedSessionTable:
+    """
+    Fixed-size hash table of bytes values in a memory-mapped file, shared by
+    every process that opens the same `path` (e.g. uvicorn workers).
+
+    Slots are `slot_bytes` each and addressed by open addressing (linear
+    probing on a stable hash of the key); deletes leave tombstones, reused
+    by later inserts and compacted away in place once they pile up, so
+    probe sequences stay short under churn. Writers serialize on an flock
+    of the file; readers take no lock and use a per-slot seqlock instead,
+    retrying a slot whose sequence number is odd or changed while they
+    copied it, plus a table generation bumped around compactions. A key and
+    its value must fit one slot, and every slot holding a live entry counts
+    against the table until the entry is deleted or expires.
+    """
+
+    def __init__(self, path: str | os.PathLike, slots: int, slot_bytes: int):
+        self.path = os.fspath(path)
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.capacity = slot_bytes - SLOT_HEADER_BYTES
+        size = HEADER_BYTES + slots * slot_bytes
+        self._depth = 0
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, HEADER.pack(MAGIC, slots, slot_bytes) + STATS.pack(0, slots, 0), 0)
+            matches = os.pread(self._fd, HEADER.size, 0) == HEADER.pack(MAGIC, slots, slot_bytes)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        if not matches:
+            os.close(self._fd)
+            raise ValueError(f"{self.path} holds a table of a different layout")
+        self._buf = mmap.mmap(self._fd, size)
+
+    # ------------------------------------------------------------------
+    # Reads (lock-free)
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> bytes | None:
+        """
+        The live value stored under `key`, or None.
+        """
+        key_bytes = key.encode()
+        while True:
+            generation = self._generation()
+            value = self._lookup(key_bytes)
+            if self._stats()[0] == generation:
+                return value
+
+    def scan(self) -> Iterator[Tuple[int, str, bytes]]:
+        """
+        (slot, key, value) for every live entry. Restarts, skipping keys
+        already yielded, if a compaction moves entries meanwhile.
+        """
+        seen: Set[bytes] = set()
+        restart = True
+        while restart:
+            restart = False
+            generation = self._generation()
+            now = time()
+            for idx in range(self.slots):
+                if self._stats()[0] != generation:
+                    restart = True
+                    break
+                status, key, value, expires_at = self._read(idx)
+                if status == USED and (not expires_at or expires_at > now) and key not in seen:
+                    seen.add(key)
+                    yield idx, key.decode(), value
+
+    # ------------------------------------------------------------------
+    # Writes (under the file lock)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def locked(self):
+        """
+        Holds the write lock, e.g. to make several writes atomic for other
+        processes. Reentrant within this table object.
+        """
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            if self._stats()[0] & 1:
+                # A process died compacting: finish its job
+                self._compact()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def put(self, key: str, value: bytes, ttl: float | None = None):
+        self.update(key, lambda current: (value, ttl))
+
+    def update(self, key: str, updater: Updater, keep_expiry: bool = False) -> bool:
+        """
+        Atomic read-modify-write: `updater(current value or None)` returns
+        (new value, ttl) or None to leave the entry untouched; with
+        `keep_expiry` an existing entry keeps its expiry instead. Returns
+        whether a value was written. Raises ValueError when the entry does
+        not fit a slot or the table is full.
+        """
+        key_bytes = key.encode()
+        with self.locked():
+            idx, current, expires_at = self._find(key_bytes)
+            result = updater(current)
+            if result is None:
+                return False
+
+            value, ttl = result
+            if not (keep_expiry and current is not None):
+                expires_at = time() + ttl if ttl is not None else 0.0
+            if len(key_bytes) + len(value) > self.capacity:
+                raise ValueError(f"Entry '{key}' ({len(value)} bytes) exceeds the {self.capacity} byte slot capacity")
+            if idx is None:
+                raise ValueError(f"Shared session table {self.path} is full ({self.slots} slots)")
+            self._write(idx, USED, key_bytes, value, expires_at)
+            self._maybe_compact()
+            return True
+
+    def delete(self, key: str) -> bool:
+        key_bytes = key.encode()
+        with self.locked():
+            idx, current, _ = self._find(key_bytes)
+            if current is None:
+                return False
+            self._write(idx, DELETED, b"", b"", 0.0)
+            self._maybe_compact()
+            return True
+
+    def purge_expired(self) -> int:
+        """
+        Tombstones every expired entry; returns how many were dropped.
+        """
+        purged = 0
+        now = time()
+        with self.locked():
+            for idx in range(self.slots):
+                status, _, _, expires_at = self._read_locked(idx)
+                if status == USED and expires_at and expires_at <= now:
+                    self._write(idx, DELETED, b"", b"", 0.0)
+                    purged += 1
+            self._maybe_compact()
+        return purged
+
+    def close(self):
+        self._buf.close()
+        os.close(self._fd)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _stats(self) -> Tuple[int, int, int]:
+        return STATS.unpack_from(self._buf, HEADER.size)
+
+    def _generation(self) -> int:
+        """
+        The current table generation, once no compaction is running.
+        """
+        for _ in range(SPIN_LIMIT):
+            generation = self._stats()[0]
+            if not generation & 1:
+                return generation
+        # Taking the lock waits out the compaction, or finishes a dead one
+        with self.locked():
+            return self._stats()[0]
+
+    def _home(self, key_bytes: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little") % self.slots
+
+    def _probe(self, key_bytes: bytes) -> Iterator[int]:
+        start = self._home(key_bytes)
+        for step in range(self.slots):
+            yield (start + step) % self.slots
+
+    def _lookup(self, key_bytes: bytes) -> bytes | None:
+        now = time()
+        for idx in self._probe(key_bytes):
+            status, found, value, expires_at = self._read(idx, key_bytes)
+            if status == EMPTY:
+                return None
+            if status == USED and found:
+                return value if not expires_at or expires_at > now else None
+        return None
+
+    def _find(self, key_bytes: bytes) -> Tuple[int | None, bytes | None, float]:
+        """
+        Under the lock: the slot holding `key_bytes`, its live value and
+        expiry, or the first reusable slot on its probe sequence.
+        """
+        free = None
+        now = time()
+        for idx in self._probe(key_bytes):
+            status, key, value, expires_at = self._read_locked(idx)
+            expired = status == USED and expires_at and expires_at <= now
+            if status == USED and key == key_bytes:
+                return (idx, None, 0.0) if expired else (idx, value, expires_at)
+            if free is None and (status != USED or expired):
+                free = idx
+            if status == EMPTY:
+                break
+        return free, None, 0.0
+
+    def _maybe_compact(self):
+        _, empty, tombstones = self._stats()
+        if tombstones >= COMPACT_MIN_TOMBSTONES and (
+            tombstones >= self.slots * COMPACT_TOMBSTONE_SHARE or empty < self.slots * MIN_EMPTY_SHARE
+        ):
+            self._compact()
+
+    def _compact(self):
+        """
+        Under the lock: turns tombstones (and expired entries) into EMPTY
+        slots, then moves every entry to the first EMPTY slot of its probe
+        sequence until none can move, so every probe again stops at the
+        first EMPTY slot. Readers see the generation odd meanwhile.
+        """
+        generation, _, _ = self._stats()
+        self._set_stats(generation | 1)
+        now = time()
+        start = None
+        for idx in range(self.slots):
+            status, _, _, expires_at = self._read_locked(idx)
+            if status == EMPTY and start is None:
+                start = idx
+            elif status == DELETED or (status == USED and expires_at and expires_at <= now):
+                self._write(idx, EMPTY, b"", b"", 0.0)
+
+        # Sweeping from just after an EMPTY slot moves most entries in one
+        # pass; repeat until no entry can move closer to its home slot.
+        # Duplicates only exist if a compacting process died mid-move.
+        start = start or 0
+        seen: Set[bytes] = set()
+        moved = True
+        while moved:
+            moved = False
+            for step in range(1, self.slots + 1):
+                idx = (start + step) % self.slots
+                status, key, value, expires_at = self._read_locked(idx)
+                if status != USED:
+                    continue
+                if seen is not None:
+                    if key in seen:
+                        self._write(idx, EMPTY, b"", b"", 0.0)
+                        continue
+                    seen.add(key)
+                target = next(
+                    slot for slot in self._probe(key)
+                    if slot == idx or self._read_locked(slot)[0] == EMPTY
+                )
+                if target != idx:
+                    self._write(target, USED, key, value, expires_at)
+                    self._write(idx, EMPTY, b"", b"", 0.0)
+                    moved = True
+            seen = None
+
+        self._set_stats((generation + 2) & 0xFFFFFFFE)
+
+    def _set_stats(self, generation: int | None = None, empty: int = 0, tombstones: int = 0):
+        """
+        Sets the generation (if given) and adjusts the slot counts by deltas.
+        """
+        current, current_empty, current_tombstones = self._stats()
+        STATS.pack_into(
+            self._buf,
+            HEADER.size,
+            current if generation is None else generation & 0xFFFFFFFF,
+            current_empty + empty,
+            current_tombstones + tombstones,
+        )
+
+    def _offset(self, idx: int) -> int:
+        return HEADER_BYTES + idx * self.slot_bytes
+
+    def _read(self, idx: int, key_bytes: bytes | None = None):
+        """
+        Seqlock read of a slot: (status, key or whether it matches
+        `key_bytes`, value, expires_at). The value is only copied when no
+        key is given or the key matches.
+        """
+        offset = self._offset(idx)
+        body = offset + SLOT_HEADER_BYTES
+        for _ in range(SPIN_LIMIT):
+            before = SEQ.unpack_from(self._buf, offset)[0]
+            if before & 1:
+                continue
+            status, key_len, value_len, expires_at = SLOT.unpack_from(self._buf, offset + SEQ.size)
+            if key_len + value_len > self.capacity:
+                continue
+            key = self._buf[body:body + key_len]
+            found = key if key_bytes is None else key == key_bytes
+            value = self._buf[body + key_len:body + key_len + value_len] if found else None
+            if SEQ.unpack_from(self._buf, offset)[0] == before:
+                return status, found, value, expires_at
+
+        # A writer holding the slot this long has died mid-write
+        with self.locked():
+            if SEQ.unpack_from(self._buf, offset)[0] & 1:
+                self._write(idx, DELETED, b"", b"", 0.0)
+        return self._read(idx, key_bytes)
+
+    def _read_locked(self, idx: int):
+        offset = self._offset(idx)
+        body = offset + SLOT_HEADER_BYTES
+        status, key_len, value_len, expires_at = SLOT.unpack_from(self._buf, offset + SEQ.size)
+        if key_len + value_len > self.capacity:
+            return DELETED, b"", b"", 0.0  # torn by a writer that died
+        key = self._buf[body:body + key_len]
+        return status, key, self._buf[body + key_len:body + key_len + value_len], expires_at
+
+    def _write(self, idx: int, status: int, key: bytes, value: bytes, expires_at: float):
+        offset = self._offset(idx)
+        body = offset + SLOT_HEADER_BYTES
+        previous = SLOT.unpack_from(self._buf, offset + SEQ.size)[0]
+        seq = SEQ.unpack_from(self._buf, offset)[0] | 1
+        SEQ.pack_into(self._buf, offset, seq)
+        SLOT.pack_into(self._buf, offset + SEQ.size, status, len(key), len(value), expires_at)
+        self._buf[body:body + len(key)] = key
+        self._buf[body + len(key):body + len(key) + len(value)] = value
+        SEQ.pack_into(self._buf, offset, (seq + 1) & 0xFFFFFFFF)
+        self._set_stats(
+            empty=(status == EMPTY) - (previous == EMPTY),
+            tombstones=(status == DELETED) - (previous == DELETED),
+        )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Stale entries tolerated per state before its list is compacted
+COMPACT_SLACK = 64
+
+
+class StateIndex:
+    """
+    Secondary index of session ids by workflow state, in the order sessions
+    entered each state.
+
+    Every entry into a state gets a new sequence number; a page resumes
+    after the last sequence number it returned, so cursors stay valid while
+    sessions move between states (including ones removed by the caller
+    while paging). Entries left behind by moves are skipped and
+    periodically compacted.
+    """
+
+    def __init__(self):
+        self._seq = 0
+        # session_id -> (state, seq of its entry into that state)
+        self._current: Dict[str, Tuple[str, int]] = {}
+        # state -> [(seq, session_id)] ascending, may hold stale entries
+        self._entries: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        # state -> number of sessions currently in it
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    def set(self, session_id: str, state) -> None:
+        state = _state_key(state)
+        current = self._current.get(session_id)
+        if current is not None:
+            if current[0] == state:
+                return
+            self._remove(session_id, current[0])
+
+        self._seq += 1
+        self._current[session_id] = (state, self._seq)
+        self._entries[state].append((self._seq, session_id))
+        self._counts[state] += 1
+
+    def discard(self, session_id: str) -> None:
+        current = self._current.get(session_id)
+        if current is not None:
+            self._remove(session_id, current[0])
+
+    def page(self, state, after: int = 0, limit: int = 100) -> Tuple[List[Tuple[int, str]], bool]:
+        """
+        Up to `limit` (seq, session_id) pairs in `state` entered after
+        sequence number `after`, and whether more entries may follow.
+        """
+        state = _state_key(state)
+        entries = self._entries.get(state, [])
+        idx = bisect_left(entries, (after + 1,))
+
+        page = []
+        while idx < len(entries) and len(page) < limit:
+            seq, session_id = entries[idx]
+            idx += 1
+            if self._current.get(session_id) == (state, seq):
+                page.append((seq, session_id))
+        return page, idx < len(entries)
+
+    def count(self, state) -> int:
+        return self._counts.get(_state_key(state), 0)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _remove(self, session_id: str, state: str) -> None:
+        del self._current[session_id]
+        self._counts[state] -= 1
+        entries = self._entries[state]
+        if len(entries) > 2 * self._counts[state] + COMPACT_SLACK:
+            self._entries[state] = [
+                (seq, sid) for seq, sid in entries if self._current.get(sid) == (state, seq)
+            ]
+
+
+# state (enum member or plain string) -> index key
+_KEYS: Dict[object, str] = {}
+
+
+def _state_key(state) -> str:
+    key = _KEYS.get(state)
+    if key is None:
+        key = _KEYS[state] = getattr(state, "value", state)
+    return key
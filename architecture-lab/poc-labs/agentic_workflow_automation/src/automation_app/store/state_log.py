@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List
+
+import msgpack
+
+from automation_app.config.constants import (
+    STATE_LOG_COMMIT_INTERVAL,
+    STATE_LOG_SNAPSHOT_BYTES,
+    STATE_LOG_SNAPSHOT_CHUNK,
+)
+from automation_app.utils.metrics import MetricsRegistry
+
+FILE_PATTERN = re.compile(r"^(log|snapshot)\.(\d+)$")
+
+
+class StateLog:
+    """
+    Append-only mutation log with compacted snapshots, for restart
+    survivability of an in-memory store.
+
+    Records are msgpack arrays written back to back to `log.<gen>` files.
+    Appends are group-committed: everything appended within
+    `commit_interval` shares one write + fsync, and `append()` returns a
+    future resolved once its record is durable. A snapshot (`snapshot.<gen>`)
+    holds the records that rebuild the whole state as of the start of
+    `log.<gen>`; older files are deleted once it is renamed into place, so
+    recovery is "newest snapshot, then every log from its generation on".
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        commit_interval: float = STATE_LOG_COMMIT_INTERVAL,
+        snapshot_bytes: int | None = STATE_LOG_SNAPSHOT_BYTES,
+        snapshot_chunk: int = STATE_LOG_SNAPSHOT_CHUNK,
+        metrics: MetricsRegistry | None = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval
+        self.snapshot_bytes = snapshot_bytes
+        self.snapshot_chunk = snapshot_chunk
+        self.metrics = metrics or MetricsRegistry()
+        # Produces the records of a full snapshot; set by the owning store
+        self.snapshot_source: Callable[[], Iterable[list]] | None = None
+        self.log_bytes = 0
+
+        self._gen: int | None = None
+        self._file = None
+        self._packer = msgpack.Packer(use_bin_type=True, default=str)
+        self._buffer: List[bytes] = []
+        self._waiters: List[asyncio.Future] = []
+        self._flusher: asyncio.Task | None = None
+        self._snapshotting = False
+        self._snapshot_task: asyncio.Task | None = None
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+
+    def records(self) -> Iterator[list]:
+        """
+        Every record needed to rebuild state: the newest snapshot (memory
+        mapped) followed by the logs written since. A torn record at the
+        end of a log (crash mid-write) ends that log.
+        """
+        snapshots = self._generations("snapshot")
+        start = snapshots[-1] if snapshots else 0
+        if snapshots:
+            yield from self._read(self._path("snapshot", start))
+        for gen in self._generations("log"):
+            if gen >= start:
+                yield from self._read(self._path("log", gen))
+
+    # ------------------------------------------------------------------
+    # Appends
+    # ------------------------------------------------------------------
+
+    def append(self, record: list) -> asyncio.Future:
+        """
+        Queues `record` (serialized immediately) for the next group commit.
+        """
+        if self._file is None:
+            self._open()
+        self._buffer.append(self._packer.pack(record))
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_soon())
+        return waiter
+
+    async def flush(self):
+        """
+        Waits until every record appended so far is durable.
+        """
+        while self._flusher is not None and not self._flusher.done():
+            await asyncio.shield(self._flusher)
+
+    async def close(self):
+        await self.flush()
+        if self._snapshot_task is not None:
+            await self._snapshot_task
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    async def snapshot(self, records: Iterable[list] | None = None):
+        """
+        Writes a compacted snapshot and drops the files it supersedes.
+
+        The new log generation starts first; the records are then packed
+        `snapshot_chunk` bytes at a time on the loop and written off it, so
+        a large state never stalls other requests. A record packed after
+        the switch may already hold a later mutation; that mutation is in
+        the new log too, and replaying it again over the snapshot yields
+        the same state (every record sets, merges or deletes).
+        """
+        self._snapshotting = True
+        try:
+            await self.flush()
+            if self._file is None:
+                self._open()
+
+            records = records if records is not None else self.snapshot_source()
+            old_file = self._file
+            gen = self._gen + 1
+            self._file = open(self._path("log", gen), "ab")
+            self._gen = gen
+            self.log_bytes = 0
+            old_file.close()
+
+            tmp = self.directory / f"snapshot.{gen}.tmp"
+            file = await asyncio.to_thread(open, tmp, "wb")
+            size = 0
+            try:
+                for chunk in self._chunks(records):
+                    await asyncio.to_thread(file.write, chunk)
+                    size += len(chunk)
+                await asyncio.to_thread(self._seal_snapshot, file, tmp, gen)
+            except BaseException:
+                file.close()
+                tmp.unlink(missing_ok=True)
+                raise
+        finally:
+            self._snapshotting = False
+
+        self.metrics.increment("state_log.snapshots")
+        self.metrics.set_gauge("state_log.snapshot_bytes", size)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        existing = self._generations("log") + self._generations("snapshot")
+        self._gen = max(existing, default=0) + 1
+        self._file = open(self._path("log", self._gen), "ab")
+
+    async def _flush_soon(self):
+        if self.commit_interval:
+            await asyncio.sleep(self.commit_interval)
+        else:
+            await asyncio.sleep(0)
+
+        while self._buffer:
+            batch, self._buffer = b"".join(self._buffer), []
+            waiters, self._waiters = self._waiters, []
+            try:
+                await asyncio.to_thread(self._write, self._file, batch)
+            except Exception as exc:
+                self.metrics.increment("state_log.commit_failures")
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(exc)
+                continue
+
+            self.log_bytes += len(batch)
+            self.metrics.increment("state_log.commits")
+            self.metrics.observe("state_log.commit_records", len(waiters))
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+        self._maybe_snapshot()
+
+    def _maybe_snapshot(self):
+        if (
+            self.snapshot_bytes is not None
+            and self.snapshot_source is not None
+            and self.log_bytes >= self.snapshot_bytes
+            and not self._snapshotting
+        ):
+            self._snapshotting = True
+            self._snapshot_task = asyncio.ensure_future(self.snapshot())
+
+    @staticmethod
+    def _write(file, batch: bytes):
+        file.write(batch)
+        file.flush()
+        os.fsync(file.fileno())
+
+    def _chunks(self, records: Iterable[list]) -> Iterator[bytes]:
+        chunk: List[bytes] = []
+        size = 0
+        for record in records:
+            packed = self._packer.pack(record)
+            chunk.append(packed)
+            size += len(packed)
+            if size >= self.snapshot_chunk:
+                yield b"".join(chunk)
+                chunk, size = [], 0
+        if chunk:
+            yield b"".join(chunk)
+
+    def _seal_snapshot(self, file, tmp: Path, gen: int):
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+        os.replace(tmp, self._path("snapshot", gen))
+        self._fsync_directory()
+
+        for kind in ("snapshot", "log"):
+            for old in self._generations(kind):
+                if old < gen:
+                    self._path(kind, old).unlink(missing_ok=True)
+
+    def _fsync_directory(self):
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _generations(self, kind: str) -> List[int]:
+        gens = []
+        for path in self.directory.iterdir():
+            match = FILE_PATTERN.match(path.name)
+            if match and match.group(1) == kind:
+                gens.append(int(match.group(2)))
+        return sorted(gens)
+
+    def _path(self, kind: str, gen: int) -> Path:
+        return self.directory / f"{kind}.{gen}"
+
+    @staticmethod
+    def _read(path: Path) -> Iterator[list]:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                unpacker = msgpack.Unpacker(mapped, raw=False, strict_map_key=False)
+                try:
+                    yield from unpacker
+                except ValueError:
+                    return
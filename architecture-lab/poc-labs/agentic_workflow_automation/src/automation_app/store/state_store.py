@@ -1,8 +1,24 @@
 from __future__ import annotations
 
+import gc
+import json
+from collections import OrderedDict
 from time import time
+from automation_app.config.constants import (
+    PLAN_ORPHAN_TTL,
+    SESSION_MAX_BYTES,
+    SESSION_MAX_ENTRIES,
+    SESSION_PAGE_SIZE,
+    SESSION_PINNED_STATES,
+    SESSION_TTLS,
+)
 from automation_app.models.workflow_state import WorkflowState
-from typing import Dict
+from automation_app.store.session_batches import SessionBatch, iter_session_batches
+from automation_app.store.state_index import StateIndex
+from automation_app.utils.metrics import MetricsRegistry
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+
+DEFAULT_TTL = "*"
 
 
 class StateStore:
@@ -13,11 +29,74 @@ class StateStore:
         In a production environment, this would be replaced by a persistent, distributed
         store such as Redis or CosmosDB to support horizontal scaling and session
         persistence across container restarts.
+
+        Sessions are bounded: each expires once unwritten for the TTL of its
+        state (`ttls`, "*" as default), checked lazily on access and by
+        `purge_expired()`, and the least recently used are evicted beyond
+        `max_entries` sessions or ~`max_bytes` of serialized data (stored
+        plans included); sessions in `pinned_states` are mid-execution and
+        never evicted that way (they are kept out of the eviction order, so
+        picking a victim is O(1)). Stored plans are kept while a session
+        references them (data["plan_hash"]) and swept `plan_orphan_ttl`
+        seconds after the last reference goes, or sooner under byte pressure.
+
+        A StateIndex (state -> session ids) is maintained on every write so
+        `list_sessions` pages through one state without scanning the store.
+
+        With a `codec` (SessionCodec), session data is held packed and only
+        decoded by `get_context`; data the codec cannot encode stays a dict.
+
+        With a `log` (StateLog), every mutation is appended to a group-committed
+        log before the call returns, snapshots are compacted from the live
+        state, and `restore()` rebuilds the store after a restart (restored
+        sessions start a fresh TTL).
     """
 
-    def __init__(self):
-        # session_id -> context
-        self.storage: Dict[str, dict] = {}
+    def __init__(
+        self,
+        ttls: Dict[str, float] | None = None,
+        max_entries: int | None = SESSION_MAX_ENTRIES,
+        max_bytes: int | None = SESSION_MAX_BYTES,
+        metrics: MetricsRegistry | None = None,
+        codec=None,
+        log=None,
+        plan_orphan_ttl: float = PLAN_ORPHAN_TTL,
+        pinned_states=SESSION_PINNED_STATES,
+    ):
+        # session_id -> context, least recently used first
+        self.storage: "OrderedDict[str, dict]" = OrderedDict()
+        # The same order restricted to sessions the caps may evict (not pinned)
+        self._evictable: "OrderedDict[str, None]" = OrderedDict()
+        # plan content hash -> serialized plan (written once per execution)
+        self.plans: Dict[str, dict] = {}
+        # idempotency key -> {"status", "response", "expires_at"}
+        self.idempotency: Dict[str, dict] = {}
+        self.ttls = ttls or SESSION_TTLS
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.plan_orphan_ttl = plan_orphan_ttl
+        self.pinned_states = {_workflow_state(state) for state in pinned_states}
+        self.metrics = metrics or MetricsRegistry()
+        self.codec = codec
+        # session_id -> expiry instant, refreshed on every write
+        self._expires_at: Dict[str, float] = {}
+        # session_id -> data key -> approximate serialized size
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self._resident_bytes = 0
+        self._index = StateIndex()
+        # session_id -> plan_hash it references; plan_hash -> referencing sessions
+        self._session_plans: Dict[str, str] = {}
+        self._plan_refs: Dict[str, int] = {}
+        # plan_hash -> instant it became (or was stored) unreferenced, oldest first
+        self._orphan_plans: Dict[str, float] = {}
+        # plan_hash -> approximate serialized size
+        self._plan_sizes: Dict[str, int] = {}
+        # state -> resolved TTL (enum attribute access is slow on hot paths)
+        self._ttl_by_state: Dict[object, float] = {}
+        self.log = log
+        self._replaying = False
+        if log is not None:
+            log.snapshot_source = self._snapshot_records
 
     async def save_context(
         self,
@@ -26,30 +105,443 @@ class StateStore:
         state: WorkflowState = WorkflowState.PROPOSED,
         timestamp: float | None = None,
     ):
-        self.storage[session_id] = {
-            "state": state,
-            "data": data,
-            "timestamp": timestamp or time(),
-        }
+        timestamp = timestamp or time()
+        self._set_context(session_id, state, data, timestamp)
+        await self._log_write(["S", session_id, state, data, timestamp])
+
+    async def update_context(
+        self,
+        session_id: str,
+        fields: dict,
+        state: WorkflowState | None = None,
+    ) -> bool:
+        """
+        Partial update: merges `fields` into the session data instead of
+        replacing it. State and timestamp are kept unless `state` is given.
+        Returns False, changing nothing, when the session does not exist (or
+        has expired or been evicted).
+        """
+        context = self._live(session_id)
+        if context is None:
+            self.metrics.increment("state_store.missing_updates")
+            return False
+
+        self._merge(session_id, context, fields, state)
+        await self._log_write(["U", session_id, fields, state, context["timestamp"]])
+        return True
+
+    async def update_if_state_matches(
+        self,
+        session_id: str,
+        expected_state: WorkflowState,
+        new_state: WorkflowState,
+        data: dict,
+    ) -> bool:
+        """
+        Compare-and-set on the session state: only transitions (and replaces
+        the data) when the session is currently in `expected_state`.
+        """
+        context = self._live(session_id)
+        if context is None or context["state"] != expected_state:
+            return False
+        timestamp = time()
+        self._set_context(session_id, new_state, data, timestamp)
+        await self._log_write(["S", session_id, new_state, data, timestamp])
+        return True
+
+    async def claim_idempotency_key(self, key: str, ttl: float) -> dict | None:
+        """
+        Atomically claims `key` for `ttl` seconds. Returns None when the caller
+        now owns the key, or the existing record when it is a duplicate.
+        """
+        record = self.idempotency.get(key)
+        now = time()
+        if record is not None and record["expires_at"] > now:
+            return record
+        self.idempotency[key] = {"status": "PENDING", "response": None, "expires_at": now + ttl}
+        await self._log_write(["I", key, self.idempotency[key]])
+        return None
+
+    async def complete_idempotency_key(self, key: str, response):
+        """
+        Stores the response handed back to duplicates of a claimed key.
+        """
+        record = self.idempotency.get(key)
+        if record is not None:
+            record["status"] = "DONE"
+            record["response"] = response
+            await self._log_write(["I", key, record])
+
+    async def release_idempotency_key(self, key: str):
+        if self.idempotency.pop(key, None) is not None:
+            await self._log_write(["X", key])
+
+    async def save_plan(self, plan_hash: str, plan_data: dict):
+        """
+        Stores a serialized plan under its content hash (no-op if already stored).
+        """
+        if plan_hash not in self.plans:
+            self._add_plan(plan_hash, plan_data)
+            await self._log_write(["P", plan_hash, plan_data])
+            if not self._replaying:
+                self._enforce_caps()
+                self._report()
+        elif plan_hash in self._orphan_plans:
+            self._orphan(plan_hash)
+
+    async def get_plan(self, plan_hash: str) -> dict | None:
+        return self.plans.get(plan_hash)
 
     async def get_context(self, session_id: str) -> dict:
-        return self.storage.get(
-            session_id,
-            {
+        context = await self.find_context(session_id)
+        if context is None:
+            return {
                 "state": WorkflowState.PROPOSED,
                 "data": {},
                 "timestamp": time(),
-            },
-        )
+            }
+        return context
+
+    async def find_context(self, session_id: str) -> dict | None:
+        """
+        The session's context, or None if it does not exist (or has expired).
+        """
+        context = self._live(session_id)
+        return None if context is None else self._decoded(context)
 
     async def get_all_sessions(self) -> Dict[str, dict]:
         """
-        Returns all sessions for cleanup / inspection.
+        Returns a snapshot of all live sessions for cleanup / inspection.
+        """
+        await self.purge_expired()
+        return {session_id: self._decoded(context) for session_id, context in self.storage.items()}
+
+    async def list_sessions(
+        self,
+        state: WorkflowState,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Tuple[List[str], str | None]:
+        """
+        One page of ids of live sessions in `state`, oldest entry first, and
+        the opaque cursor for the next page (None when exhausted). Raises
+        ValueError for a malformed cursor.
         """
-        return self.storage
+        after = int(cursor) if cursor else 0
+        now = time()
+        session_ids: List[str] = []
+        more = True
+
+        while more and len(session_ids) < limit:
+            page, more = self._index.page(state, after=after, limit=limit - len(session_ids))
+            for seq, session_id in page:
+                after = seq
+                expires_at = self._expires_at.get(session_id)
+                if expires_at is not None and expires_at <= now:
+                    self._evict(session_id, "expired")
+                    continue
+                session_ids.append(session_id)
+            if not page:
+                break
+
+        self._report()
+        return session_ids, str(after) if more else None
+
+    def iter_sessions(
+        self,
+        state: WorkflowState | None = None,
+        batch_size: int = SESSION_PAGE_SIZE,
+    ) -> AsyncIterator[SessionBatch]:
+        """
+        Live sessions (only those in `state`, if given) as batches of
+        (session_id, context), walked by cursor so memory stays bounded.
+        """
+        return iter_session_batches(self, state=state, batch_size=batch_size)
 
     async def delete_session(self, session_id: str):
         """
         Remove a session (used by HITL cleanup).
         """
+        if self.storage.pop(session_id, None) is not None:
+            await self._log_write(["D", session_id])
+        self._forget(session_id)
+        self._report()
+
+    async def purge_expired(self) -> int:
+        """
+        Drops every expired session (and idempotency record); returns how
+        many sessions were evicted.
+        """
+        now = time()
+        expired = [sid for sid, expires_at in self._expires_at.items() if expires_at <= now]
+        for session_id in expired:
+            self._evict(session_id, "expired")
+
+        for key in [k for k, record in self.idempotency.items() if record["expires_at"] <= now]:
+            del self.idempotency[key]
+
+        for plan_hash in [h for h, since in self._orphan_plans.items() if since + self.plan_orphan_ttl <= now]:
+            self._drop_plan(plan_hash)
+
+        self._report()
+        return len(expired)
+
+    async def restore(self) -> int:
+        """
+        Rebuilds the store from its log (newest snapshot, then the log tail);
+        returns the number of records replayed. Call before serving traffic.
+        """
+        if self.log is None:
+            return 0
+        replayed = 0
+        self._replaying = True
+        # Replay allocates millions of acyclic containers; pause cyclic GC
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for record in self.log.records():
+                self._apply(record)
+                replayed += 1
+        finally:
+            self._replaying = False
+            if gc_enabled:
+                gc.enable()
+        self._enforce_caps()
+        self._report()
+        return replayed
+
+    async def snapshot(self):
+        """
+        Compacts the log into a snapshot of the current state.
+        """
+        if self.log is not None:
+            await self.log.snapshot()
+
+    async def close(self):
+        """
+        Waits for pending log commits and closes the log.
+        """
+        if self.log is not None:
+            await self.log.close()
+
+    def ttl_for(self, state) -> float:
+        ttl = self._ttl_by_state.get(state)
+        if ttl is None:
+            key = getattr(state, "value", state)
+            ttl = self._ttl_by_state[state] = self.ttls.get(key, self.ttls.get(DEFAULT_TTL, float("inf")))
+        return ttl
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _set_context(self, session_id: str, state, data: dict, timestamp: float):
+        self.storage[session_id] = {"state": state, "data": self._pack(data), "timestamp": timestamp}
+        self._written(session_id, data, replace=True)
+
+    def _merge(self, session_id: str, context: dict, fields: dict, state, timestamp: float | None = None):
+        context["data"].update(fields)
+        if state is not None and state != context["state"]:
+            context["state"] = state
+            context["timestamp"] = timestamp or time()
+        self._written(session_id, fields)
+
+    async def _log_write(self, record: list):
+        if self.log is not None and not self._replaying:
+            await self.log.append(record)
+
+    def _log_nowait(self, record: list):
+        if self.log is not None and not self._replaying:
+            self.log.append(record).add_done_callback(_consume_result)
+
+    def _apply(self, record: list):
+        """
+        Replays one log / snapshot record without logging it again.
+        """
+        op = record[0]
+        if op == "S":
+            _, session_id, state, data, timestamp = record
+            self._set_context(session_id, _workflow_state(state), data, timestamp)
+        elif op == "U":
+            _, session_id, fields, state, timestamp = record
+            context = self.storage.get(session_id)
+            if context is not None:
+                self._merge(session_id, context, fields, _workflow_state(state), timestamp)
+        elif op == "D":
+            self.storage.pop(record[1], None)
+            self._forget(record[1])
+        elif op == "P":
+            if record[1] not in self.plans:
+                self._add_plan(record[1], record[2])
+        elif op == "I":
+            self.idempotency[record[1]] = record[2]
+        elif op == "X":
+            self.idempotency.pop(record[1], None)
+
+    def _snapshot_records(self) -> Iterator[list]:
+        # Consumed across awaits: iterate copies of the tables, not the live dicts
+        for session_id, context in list(self.storage.items()):
+            data = context["data"]
+            if not isinstance(data, dict):
+                data = data.unpack()
+            yield ["S", session_id, context["state"], data, context["timestamp"]]
+        for plan_hash, plan_data in list(self.plans.items()):
+            yield ["P", plan_hash, plan_data]
+        for key, record in list(self.idempotency.items()):
+            yield ["I", key, record]
+
+    def _pack(self, data: dict):
+        if self.codec is None:
+            return data
+        try:
+            return self.codec.pack(data)
+        except (TypeError, ValueError, OverflowError):
+            self.metrics.increment("state_store.unpacked_sessions")
+            return data
+
+    @staticmethod
+    def _decoded(context: dict) -> dict:
+        if isinstance(context["data"], dict):
+            return context
+        return {**context, "data": context["data"].unpack()}
+
+    def _live(self, session_id: str) -> dict | None:
+        """
+        The session's context unless it has expired; marks it recently used.
+        """
+        context = self.storage.get(session_id)
+        if context is None:
+            return None
+
+        expires_at = self._expires_at.get(session_id)
+        if expires_at is not None and expires_at <= time():
+            self._evict(session_id, "expired")
+            self._report()
+            return None
+
+        self.storage.move_to_end(session_id)
+        if session_id in self._evictable:
+            self._evictable.move_to_end(session_id)
+        return context
+
+    def _written(self, session_id: str, fields: dict, replace: bool = False):
+        self.storage.move_to_end(session_id)
+        state = self.storage[session_id]["state"]
+        if state in self.pinned_states:
+            self._evictable.pop(session_id, None)
+        else:
+            self._evictable[session_id] = None
+            self._evictable.move_to_end(session_id)
+        self._expires_at[session_id] = time() + self.ttl_for(state)
+        self._index.set(session_id, state)
+        if replace or "plan_hash" in fields:
+            self._reference_plan(session_id, fields.get("plan_hash"))
+
+        if self.max_bytes is not None:
+            sizes = self._sizes.setdefault(session_id, {})
+            if replace:
+                self._resident_bytes -= sum(sizes.values())
+                sizes.clear()
+            for key, value in fields.items():
+                size = len(key) + len(json.dumps(value, default=str))
+                self._resident_bytes += size - sizes.get(key, 0)
+                sizes[key] = size
+
+        if not self._replaying:
+            self._enforce_caps()
+            self._report()
+
+    def _enforce_caps(self):
+        while self._over_caps():
+            # Plans nothing references go first, oldest first
+            if self._over_bytes() and self._orphan_plans:
+                self._drop_plan(next(iter(self._orphan_plans)))
+                continue
+            victim = self._eviction_candidate()
+            if victim is None:
+                self.metrics.increment("state_store.over_capacity")
+                break
+            self._evict(victim, "capacity")
+
+    def _over_caps(self) -> bool:
+        return (self.max_entries is not None and len(self.storage) > self.max_entries) or self._over_bytes()
+
+    def _over_bytes(self) -> bool:
+        return self.max_bytes is not None and self._resident_bytes > self.max_bytes
+
+    def _eviction_candidate(self) -> str | None:
+        """
+        The least recently used session that is not mid-execution; the most
+        recently written session is never a candidate.
+        """
+        oldest = next(iter(self._evictable), None)
+        if oldest is None or oldest == next(reversed(self.storage)):
+            return None
+        return oldest
+
+    def _evict(self, session_id: str, reason: str):
         self.storage.pop(session_id, None)
+        self._forget(session_id)
+        self.metrics.increment("state_store.evictions", reason=reason)
+        self._log_nowait(["D", session_id])
+
+    def _forget(self, session_id: str):
+        self._evictable.pop(session_id, None)
+        self._expires_at.pop(session_id, None)
+        self._index.discard(session_id)
+        self._reference_plan(session_id, None)
+        self._resident_bytes -= sum(self._sizes.pop(session_id, {}).values())
+
+    def _add_plan(self, plan_hash: str, plan_data: dict):
+        self.plans[plan_hash] = plan_data
+        if plan_hash not in self._plan_refs:
+            self._orphan(plan_hash)
+        if self.max_bytes is not None:
+            size = len(plan_hash) + len(json.dumps(plan_data, default=str))
+            self._plan_sizes[plan_hash] = size
+            self._resident_bytes += size
+
+    def _drop_plan(self, plan_hash: str):
+        self._orphan_plans.pop(plan_hash, None)
+        if self.plans.pop(plan_hash, None) is not None:
+            self._resident_bytes -= self._plan_sizes.pop(plan_hash, 0)
+            self.metrics.increment("state_store.plans_dropped")
+
+    def _orphan(self, plan_hash: str):
+        # Re-inserted so the dict stays ordered oldest orphan first
+        self._orphan_plans.pop(plan_hash, None)
+        self._orphan_plans[plan_hash] = time()
+
+    def _reference_plan(self, session_id: str, plan_hash: str | None):
+        previous = self._session_plans.get(session_id)
+        if previous == plan_hash:
+            return
+        if previous is not None:
+            del self._session_plans[session_id]
+            self._plan_refs[previous] -= 1
+            if not self._plan_refs[previous]:
+                del self._plan_refs[previous]
+                if previous in self.plans:
+                    self._orphan(previous)
+        if plan_hash is not None:
+            self._session_plans[session_id] = plan_hash
+            self._plan_refs[plan_hash] = self._plan_refs.get(plan_hash, 0) + 1
+            self._orphan_plans.pop(plan_hash, None)
+
+    def _report(self):
+        self.metrics.set_gauge("state_store.sessions", len(self.storage))
+        if self.max_bytes is not None:
+            self.metrics.set_gauge("state_store.resident_bytes", self._resident_bytes)
+
+
+_STATES = {state.value: state for state in WorkflowState}
+
+
+def _workflow_state(value):
+    return _STATES.get(value, value)
+
+
+def _consume_result(future):
+    # Evictions are logged without waiting; failures surface in metrics
+    if not future.cancelled():
+        future.exception()
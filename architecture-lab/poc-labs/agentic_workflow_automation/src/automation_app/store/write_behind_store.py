@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Tuple
+
+from automation_app.config.constants import (
+    SESSION_PAGE_SIZE,
+    WRITE_BEHIND_CACHE_ENTRIES,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    WRITE_BEHIND_MAX_DIRTY,
+)
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.session_batches import SessionBatch, iter_session_batches
+from automation_app.store.state_store import StateStore
+from automation_app.utils.metrics import MetricsRegistry
+
+# Dirty-map marker for a session deleted since the last flush
+DELETED = object()
+
+
+class WriteBehindStateStore:
+    """
+    Read-through cache with write-behind batching in front of a durable
+    state store (any backend with the StateStore interface).
+
+    Session writes land in the in-memory `cache` and mark the session dirty;
+    every `flush_interval` seconds the latest context of each dirty session
+    is written to the backend once, however many updates it received in the
+    window. At most `max_dirty` sessions may be pending: the writer that
+    reaches the limit flushes inline (backpressure). Compare-and-set and
+    idempotency calls go straight to the backend, after flushing the session
+    they concern. `close()` flushes everything before closing the backend.
+
+    The default cache is bounded to `cache_entries` sessions, none of them
+    pinned: an evicted session is read through again, or restored from the
+    dirty map if it had not been flushed yet.
+    """
+
+    def __init__(
+        self,
+        backend,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+        max_dirty: int = WRITE_BEHIND_MAX_DIRTY,
+        cache: StateStore | None = None,
+        metrics: MetricsRegistry | None = None,
+        cache_entries: int = WRITE_BEHIND_CACHE_ENTRIES,
+    ):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        # The cache keeps its own registry so its gauges don't shadow the backend's
+        self.cache = cache or StateStore(max_entries=cache_entries, max_bytes=None, pinned_states=())
+        self.metrics = metrics or MetricsRegistry()
+        # session_id -> live cached context (or DELETED), pending flush
+        self._dirty: Dict[str, object] = {}
+        # plan hash -> plan, pending flush
+        self._plans: Dict[str, dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+
+    # ------------------------------------------------------------------
+    # Sessions (write-behind)
+    # ------------------------------------------------------------------
+
+    async def save_context(
+        self,
+        session_id: str,
+        data: dict,
+        state: WorkflowState = WorkflowState.PROPOSED,
+        timestamp: float | None = None,
+    ):
+        await self.cache.save_context(session_id, data, state=state, timestamp=timestamp)
+        await self._mark_dirty(session_id)
+
+    async def update_context(
+        self,
+        session_id: str,
+        fields: dict,
+        state: WorkflowState | None = None,
+    ) -> bool:
+        await self._load(session_id)
+        if not await self.cache.update_context(session_id, fields, state=state):
+            return False
+        await self._mark_dirty(session_id)
+        return True
+
+    async def delete_session(self, session_id: str):
+        await self.cache.delete_session(session_id)
+        self._dirty[session_id] = DELETED
+        await self._after_mark()
+
+    async def get_context(self, session_id: str) -> dict:
+        context = await self._load(session_id)
+        if context is None:
+            return await self.cache.get_context(session_id)
+        return context
+
+    async def find_context(self, session_id: str) -> dict | None:
+        return await self._load(session_id)
+
+    # ------------------------------------------------------------------
+    # Sessions (write-through)
+    # ------------------------------------------------------------------
+
+    async def update_if_state_matches(
+        self,
+        session_id: str,
+        expected_state: WorkflowState,
+        new_state: WorkflowState,
+        data: dict,
+    ) -> bool:
+        """
+        CAS is decided by the backend so it holds across instances. It runs
+        under the flush lock, so a flush already writing an older copy of
+        the session finishes first and none can land one after it.
+        """
+        async with self._flush_lock:
+            await self._flush_session(session_id)
+            if not await self.backend.update_if_state_matches(
+                session_id=session_id,
+                expected_state=expected_state,
+                new_state=new_state,
+                data=data,
+            ):
+                await self.cache.delete_session(session_id)  # stale; re-read next time
+                return False
+
+            # Writes that raced the CAS are superseded by its outcome
+            self._dirty.pop(session_id, None)
+            await self.cache.save_context(session_id, dict(data), state=new_state)
+            return True
+
+    async def get_all_sessions(self) -> Dict[str, dict]:
+        await self.flush()
+        return await self.backend.get_all_sessions()
+
+    async def list_sessions(
+        self,
+        state: WorkflowState,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> Tuple[List[str], str | None]:
+        await self.flush()
+        return await self.backend.list_sessions(state=state, cursor=cursor, limit=limit)
+
+    def iter_sessions(
+        self,
+        state: WorkflowState | None = None,
+        batch_size: int = SESSION_PAGE_SIZE,
+    ) -> AsyncIterator[SessionBatch]:
+        """
+        Live sessions (only those in `state`, if given) as batches of
+        (session_id, context), walked by cursor so memory stays bounded.
+        """
+        return iter_session_batches(self, state=state, batch_size=batch_size)
+
+    async def purge_expired(self) -> int:
+        await self.cache.purge_expired()
+        return await self.backend.purge_expired()
+
+    # ------------------------------------------------------------------
+    # Plans and idempotency
+    # ------------------------------------------------------------------
+
+    async def save_plan(self, plan_hash: str, plan_data: dict):
+        if await self.cache.get_plan(plan_hash) is None:
+            await self.cache.save_plan(plan_hash, plan_data)
+            self._plans[plan_hash] = plan_data
+
+    async def get_plan(self, plan_hash: str) -> dict | None:
+        plan = await self.cache.get_plan(plan_hash)
+        if plan is None:
+            plan = await self.backend.get_plan(plan_hash)
+        return plan
+
+    async def claim_idempotency_key(self, key: str, ttl: float) -> dict | None:
+        return await self.backend.claim_idempotency_key(key, ttl)
+
+    async def complete_idempotency_key(self, key: str, response):
+        await self.backend.complete_idempotency_key(key, response)
+
+    async def release_idempotency_key(self, key: str):
+        await self.backend.release_idempotency_key(key)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def flush(self):
+        """
+        Writes every dirty session and pending plan to the backend. Failed
+        writes stay dirty for the next flush.
+        """
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, {}
+            plans, self._plans = self._plans, {}
+            if not dirty and not plans:
+                return
+
+            started = time.monotonic()
+            results = await asyncio.gather(
+                *(self._write(session_id, entry) for session_id, entry in dirty.items()),
+                *(self.backend.save_plan(plan_hash, plan) for plan_hash, plan in plans.items()),
+                return_exceptions=True,
+            )
+
+            failed = 0
+            pending = list(dirty.items()) + list(plans.items())
+            for (key, entry), result in zip(pending, results):
+                if not isinstance(result, Exception):
+                    continue
+                failed += 1
+                # A newer write since this flush started supersedes the failed one
+                if key in dirty:
+                    self._dirty.setdefault(key, entry)
+                else:
+                    self._plans.setdefault(key, entry)
+
+            self.metrics.increment("write_behind.flushes")
+            self.metrics.increment("write_behind.flushed", len(pending) - failed)
+            if failed:
+                self.metrics.increment("write_behind.flush_failures", failed)
+            self.metrics.observe("write_behind.flush_seconds", time.monotonic() - started)
+            self.metrics.set_gauge("write_behind.dirty", len(self._dirty))
+
+    async def restore(self) -> int:
+        restore = getattr(self.backend, "restore", None)
+        return await restore() if restore else 0
+
+    async def close(self):
+        """
+        Stops the background flusher, flushes synchronously, closes the backend.
+        """
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        close = getattr(self.backend, "close", None)
+        if close:
+            await close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _load(self, session_id: str) -> dict | None:
+        """
+        The cached context, read through from the backend on a miss (or
+        restored from the dirty map if the cache evicted it before a flush).
+        """
+        entry = self._dirty.get(session_id)
+        if entry is DELETED:
+            return None
+
+        context = await self.cache.find_context(session_id)
+        if context is not None:
+            self.metrics.increment("write_behind.cache", result="hit")
+            return context
+
+        self.metrics.increment("write_behind.cache", result="miss")
+        source = entry if entry is not None else await self.backend.find_context(session_id)
+        if source is None:
+            return None
+
+        # Copy: the cache mutates its data in place, the backend must not see that
+        await self.cache.save_context(
+            session_id,
+            dict(source["data"]),
+            state=source["state"],
+            timestamp=source["timestamp"],
+        )
+        context = await self.cache.find_context(session_id)
+        if entry is not None:
+            self._dirty[session_id] = context
+        return context
+
+    async def _mark_dirty(self, session_id: str):
+        if session_id in self._dirty:
+            self.metrics.increment("write_behind.coalesced")
+        # Holding the live context keeps it flushable even if the cache evicts it
+        self._dirty[session_id] = await self.cache.find_context(session_id)
+        await self._after_mark()
+
+    async def _after_mark(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._run_flusher())
+        if len(self._dirty) >= self.max_dirty:
+            self.metrics.increment("write_behind.backpressure")
+            await self.flush()
+
+    async def _run_flusher(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _flush_session(self, session_id: str):
+        # Caller holds _flush_lock
+        entry = self._dirty.pop(session_id, None)
+        if entry is None:
+            return
+        try:
+            await self._write(session_id, entry)
+        except Exception:
+            self._dirty.setdefault(session_id, entry)
+            raise
+
+    async def _write(self, session_id: str, entry):
+        if entry is DELETED:
+            await self.backend.delete_session(session_id)
+            return
+        await self.backend.save_context(
+            session_id,
+            dict(entry["data"]),
+            state=entry["state"],
+            timestamp=entry["timestamp"],
+        )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, Tuple
+
+MetricKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry (counters, gauges, timing summaries).
+
+    Engines receive a shared instance so operational signals can be read
+    from a single place; a Prometheus/OpenTelemetry exporter can be layered
+    on top of `snapshot()` later.
+    """
+
+    def __init__(self):
+        self.counters: Dict[MetricKey, float] = defaultdict(float)
+        self.gauges: Dict[MetricKey, float] = {}
+        self.summaries: Dict[MetricKey, dict] = {}
+
+    def increment(self, name: str, value: float = 1, **labels):
+        self.counters[self._key(name, labels)] += value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(name, labels)
+        summary = self.summaries.get(key)
+        if summary is None:
+            self.summaries[key] = {"count": 1, "sum": value, "max": value}
+            return
+        summary["count"] += 1
+        summary["sum"] += value
+        if value > summary["max"]:
+            summary["max"] = value
+
+    def counter(self, name: str, **labels) -> float:
+        return self.counters.get(self._key(name, labels), 0)
+
+    def gauge(self, name: str, **labels) -> float | None:
+        return self.gauges.get(self._key(name, labels))
+
+    def summary(self, name: str, **labels) -> dict | None:
+        return self.summaries.get(self._key(name, labels))
+
+    def snapshot(self) -> dict:
+        """
+        Returns a JSON-friendly view of every metric, keyed by `name{labels}`.
+        """
+        return {
+            "counters": {self._render(k): v for k, v in self.counters.items()},
+            "gauges": {self._render(k): v for k, v in self.gauges.items()},
+            "summaries": {
+                self._render(k): {**v, "avg": v["sum"] / v["count"]}
+                for k, v in self.summaries.items()
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> MetricKey:
+        return name, tuple(sorted(labels.items()))
+
+    @staticmethod
+    def _render(key: MetricKey) -> str:
+        name, labels = key
+        if not labels:
+            return name
+        rendered = ",".join(f"{k}={v}" for k, v in labels)
+        return f"{name}{{{rendered}}}"
@@ -26,6 +26,14 @@ class PIIScrubber:
             re.IGNORECASE
         )
 
+    @property
+    def cache_key(self):
+        """
+        Scrubbers of the same type and mask produce identical output, so
+        cached scrubbed views can be shared between instances.
+        """
+        return type(self), self.mask
+
     def scrub(self, text: str) -> str:
         """
         Replace detected PII in text with a mask.
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import MagicMock
 from automation_app.adapters.base_adapter import EnterpriseAdapter
 
 
@@ -127,3 +128,15 @@ def test_abstract_method_body_raises_not_implemented(method, args):
     adapter = CallsSuper()
     with pytest.raises(NotImplementedError):
         getattr(adapter, method)(*args)
+
+
+def test_register_errors_defaults_to_noop():
+    adapter = FullAdapter()
+    classifier = MagicMock()
+
+    assert adapter.register_errors(classifier) is None
+    classifier.assert_not_called()
+
+
+def test_idempotent_reads_defaults_to_empty():
+    assert FullAdapter().idempotent_reads() == set()
@@ -74,7 +74,7 @@ async def test_compensate_unknown_action_is_ignored():
 # ---------------------------------------------------------------------------
 def test_supported_actions():
     adapter = MSGraphAdapter()
-    assert adapter.supported_actions() == {"send_email", "create_calendar_event"}
+    assert adapter.supported_actions() == {"send_email", "create_calendar_event", "check_calendar_availability"}
 
 
 # ---------------------------------------------------------------------------
@@ -105,3 +105,12 @@ async def test_log_email_compensation_is_noop():
 
     # Should not raise
     await adapter.log_email_compensation({"message_id": "MSG-1"})
+
+@pytest.mark.asyncio
+async def test_check_calendar_availability_is_an_idempotent_read():
+    adapter = MSGraphAdapter()
+
+    result = await adapter.execute("check_calendar_availability", {"date": "2026-02-13"})
+
+    assert result == {"available": True, "date": "2026-02-13"}
+    assert adapter.idempotent_reads() == {"check_calendar_availability"}
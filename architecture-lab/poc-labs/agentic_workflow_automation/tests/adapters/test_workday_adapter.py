@@ -69,7 +69,7 @@ async def test_compensate_ignores_unknown_action():
 
 def test_supported_actions():
     adapter = WorkdayAdapter()
-    assert adapter.supported_actions() == {"create_time_off"}
+    assert adapter.supported_actions() == {"create_time_off", "get_pto_balance"}
 
 
 # ---------------------------------------------------------------------------
@@ -90,3 +90,13 @@ async def test_cancel_time_off_is_idempotent():
 
     # Should not raise
     await adapter.cancel_time_off("WD123")
+
+
+@pytest.mark.asyncio
+async def test_get_pto_balance_is_an_idempotent_read():
+    adapter = WorkdayAdapter()
+
+    result = await adapter.execute("get_pto_balance", {"user_id": "u1"})
+
+    assert result == {"balance_days": 12.5}
+    assert adapter.idempotent_reads() == {"get_pto_balance"}
@@ -1,14 +1,20 @@
 # tests/api/test_orchestrator_routes.py
 
+import json
+
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, AsyncMock
 
 from automation_app.api.routes.orchestrator_routes import OrchestratorRoutes
+from automation_app.audit.audit_store import AuditStore
 from automation_app.models.workflow_state import WorkflowState
 
 
-def create_test_app():
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def create_test_app(admin_token=None):
     orchestrator = AsyncMock()
 
     # Default async return values
@@ -27,7 +33,7 @@ def create_test_app():
         "state": WorkflowState.REJECTED.name
     }
 
-    routes = OrchestratorRoutes(orchestrator)
+    routes = OrchestratorRoutes(orchestrator, admin_token=admin_token)
     app = FastAPI()
     app.include_router(routes.router)
     client = TestClient(app)  # <- wrap app in TestClient
@@ -55,7 +61,8 @@ def test_process_route_success():
     assert response.json() == {"message": "Processed OK", 'plan': None, 'state': None}
 
     orchestrator.process_request.assert_awaited_once_with(
-        user_input='Book PTO for Friday', session_id='s1', user_id='anonymous', role='Manager', department='Engineering'
+        user_input='Book PTO for Friday', session_id='s1', user_id='anonymous', role='Manager', department='Engineering',
+        idempotency_key=None,
     )
 
 
@@ -123,7 +130,7 @@ def test_confirm_route_success():
         "plan": None
     }
 
-    orchestrator.confirm.assert_called_once_with("s1")
+    orchestrator.confirm.assert_called_once_with("s1", idempotency_key=None)
 
 
 def test_confirm_route_validation_error():
@@ -190,3 +197,96 @@ def test_reject_route_validation_error():
     response = client.post("/reject", json={"text": "ignored"})
 
     assert response.status_code == 422
+
+
+def test_routes_forward_idempotency_key_header():
+    client, orchestrator = create_test_app()
+    payload = {"session_id": "s1", "text": "Book PTO for Friday"}
+
+    client.post("/process", json=payload, headers={"Idempotency-Key": "abc"})
+    client.post("/confirm", json=payload, headers={"Idempotency-Key": "def"})
+
+    assert orchestrator.process_request.call_args.kwargs["idempotency_key"] == "abc"
+    orchestrator.confirm.assert_called_once_with("s1", idempotency_key="def")
+
+
+# ---------------------------------------------------------------------------
+# /admin/sessions
+# ---------------------------------------------------------------------------
+
+def test_admin_sessions_route_pages_by_state():
+    client, orchestrator = create_test_app(admin_token="secret")
+    orchestrator.list_sessions.return_value = {
+        "sessions": [{"session_id": "s1", "state": "PROPOSED", "timestamp": 1.0}],
+        "next_cursor": "7",
+    }
+
+    response = client.get(
+        "/admin/sessions", params={"state": "PROPOSED", "cursor": "3", "limit": 10}, headers=ADMIN
+    )
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] == "7"
+    orchestrator.list_sessions.assert_called_once_with(
+        state=WorkflowState.PROPOSED, cursor="3", limit=10
+    )
+
+
+def test_admin_sessions_route_validates_params():
+    client, orchestrator = create_test_app(admin_token="secret")
+    orchestrator.list_sessions.side_effect = ValueError("bad cursor")
+
+    def get(**params):
+        return client.get("/admin/sessions", params=params, headers=ADMIN)
+
+    assert get(state="NOPE").status_code == 422
+    assert get(state="PROPOSED", limit=0).status_code == 422
+    assert get(state="PROPOSED", cursor="x").status_code == 400
+
+
+def test_admin_routes_require_the_admin_token():
+    client, orchestrator = create_test_app(admin_token="secret")
+
+    assert client.get("/admin/sessions", params={"state": "PROPOSED"}).status_code == 401
+    assert client.get(
+        "/admin/sessions", params={"state": "PROPOSED"}, headers={"X-Admin-Token": "guess"}
+    ).status_code == 401
+    assert client.get("/audit/s1").status_code == 401
+    orchestrator.list_sessions.assert_not_called()
+
+
+def test_admin_routes_are_not_served_without_a_token():
+    client, orchestrator = create_test_app()
+
+    assert client.get("/admin/sessions", params={"state": "PROPOSED"}, headers=ADMIN).status_code == 404
+    assert client.get("/audit/s1", headers=ADMIN).status_code == 404
+    orchestrator.list_sessions.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# /audit/{session_id}
+# ---------------------------------------------------------------------------
+
+def test_audit_route_streams_session_events(tmp_path):
+    store = AuditStore(tmp_path)
+    store.write({"workflow_id": "s1", "event_type": "PLAN_GENERATED", "payload": {}})
+    store.write({"workflow_id": "s2", "event_type": "PLAN_GENERATED", "payload": {}})
+    store.write({"workflow_id": "s1", "event_type": "EXECUTION_COMPLETED", "payload": {}})
+    app = FastAPI()
+    app.include_router(OrchestratorRoutes(AsyncMock(), audit_store=store, admin_token="secret").router)
+    client = TestClient(app, headers=ADMIN)
+
+    response = client.get("/audit/s1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["event_type"] for event in events] == ["PLAN_GENERATED", "EXECUTION_COMPLETED"]
+    assert client.get("/audit/unknown").status_code == 404
+    store.close()
+
+
+def test_audit_route_is_404_without_a_store():
+    client, _ = create_test_app(admin_token="secret")
+
+    assert client.get("/audit/s1", headers=ADMIN).status_code == 404
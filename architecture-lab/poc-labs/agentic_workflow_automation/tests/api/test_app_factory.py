@@ -45,10 +45,25 @@ def test_process_route_calls_orchestrator_correctly():
             user_id="anonymous",
             role=None,
             department=None,
+            idempotency_key=None,
         )
         # And we know lifespan at least tried to call cleanup once
         mock_orchestrator.cleanup_stale_proposals.assert_awaited()
 
+def test_failed_cleanup_sweep_does_not_stop_the_app():
+    with patch("automation_app.api.app_factory.AgenticOrchestrator") as MockOrchestrator:
+        mock_orchestrator = MagicMock()
+        mock_orchestrator.process_request = AsyncMock(return_value="OK")
+        mock_orchestrator.cleanup_stale_proposals = AsyncMock(side_effect=KeyError("last_plan"))
+        MockOrchestrator.return_value = mock_orchestrator
+
+        factory = AppFactory()
+        with TestClient(factory.get_app()) as client:
+            response = client.post("/process", json={"session_id": "s1", "text": "hi"})
+
+        assert response.status_code == 200
+        assert factory.metrics.counter("cleanup.failures") == 1
+
 def test_process_route_validation_error():
     factory = AppFactory()
     app = factory.get_app()
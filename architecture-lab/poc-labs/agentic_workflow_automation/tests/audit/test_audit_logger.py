@@ -2,6 +2,7 @@ import pytest
 import json
 from unittest.mock import MagicMock, patch, ANY
 from automation_app.audit.audit_logger import AuditLogger, logger
+from automation_app.models.action import Action
 from automation_app.models.plan import Plan
 
 
@@ -16,10 +17,9 @@ def mock_logger():
 
 @pytest.fixture
 def mock_scrubber():
-    """Mocks the PIIScrubber to control scrubbing output."""
-    with patch('automation_app.audit.audit_logger.PIIScrubber') as mocked_class:
-        instance = mocked_class.return_value
-        # Default behavior: just return the data as is unless specified
+    """Mocks the shared PIIScrubber to control scrubbing output."""
+    with patch.object(AuditLogger, 'scrubber') as instance:
+        # Default behavior: mask every value
         instance.scrub_data.side_effect = lambda x: {k: "***" for k in x.keys()}
         yield instance
 
@@ -53,16 +53,14 @@ def test_log_plan_scrubs_pii(mock_logger, mock_scrubber):
     """Verifies that log_plan iterates through actions and calls the scrubber."""
     session_id = "sess-999"
 
-    # Mock a Plan with actions
-    mock_action = MagicMock()
-    mock_action.adapter = "email_service"
-    mock_action.method = "send"
-    mock_action.params = {"to": "user@example.com", "body": "secret"}
+    action = Action(
+        adapter="email_service",
+        method="send",
+        params={"to": "user@example.com", "body": "secret"},
+    )
+    plan = Plan(actions=[action])
 
-    mock_plan = MagicMock(spec=Plan)
-    mock_plan.actions = [mock_action]
-
-    AuditLogger.log_plan(session_id, mock_plan)
+    AuditLogger.log_plan(session_id, plan)
 
     # Verify scrubber was called with action params
     mock_scrubber.scrub_data.assert_called_once_with({"to": "user@example.com", "body": "secret"})
@@ -81,6 +79,16 @@ def test_log_plan_scrubs_pii(mock_logger, mock_scrubber):
     assert log_data["payload"]["actions"] == expected_actions
 
 
+def test_log_plan_reuses_cached_scrubbed_params(mock_logger, mock_scrubber):
+    """A plan logged twice only scrubs each action once."""
+    plan = Plan(actions=[Action(adapter="email_service", method="send", params={"to": "a@b.com"})])
+
+    AuditLogger.log_plan("sess-1", plan)
+    AuditLogger.log_plan("sess-1", plan)
+
+    mock_scrubber.scrub_data.assert_called_once_with({"to": "a@b.com"})
+
+
 @pytest.mark.parametrize("payload", [
     ({"simple": "data"}),
     ({"nested": {"list": [1, 2, 3]}}),
@@ -104,4 +112,21 @@ def test_log_plan_empty_actions(mock_logger):
 
     log_arg = mock_logger.call_args[0][0]
     log_data = json.loads(log_arg)
-    assert log_data["payload"]["actions"] == []
\ No newline at end of file
+    assert log_data["payload"]["actions"] == []
+
+def test_log_fans_out_to_sinks(mock_logger):
+    """Every record reaches registered sinks; a failing sink does not break logging."""
+    sink, broken = MagicMock(), MagicMock()
+    broken.write.side_effect = OSError("disk full")
+    AuditLogger.add_sink(broken)
+    AuditLogger.add_sink(sink)
+    try:
+        AuditLogger.log("wf-1", "TYPE", {"a": 1})
+    finally:
+        AuditLogger.remove_sink(broken)
+        AuditLogger.remove_sink(sink)
+
+    record = sink.write.call_args[0][0]
+    assert record["workflow_id"] == "wf-1"
+    assert record["payload"] == {"a": 1}
+    assert AuditLogger.sinks == []
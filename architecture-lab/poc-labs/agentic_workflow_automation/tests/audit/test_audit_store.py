@@ -0,0 +1,148 @@
+import json
+
+import pytest
+
+from automation_app.audit.audit_store import AuditStore
+
+
+def _event(workflow_id, n, event_type="STEP_COMPLETED"):
+    return {"workflow_id": workflow_id, "event_type": event_type, "timestamp": "t", "payload": {"n": n}}
+
+
+def test_reads_back_only_the_sessions_events_in_order(tmp_path):
+    store = AuditStore(tmp_path)
+    for n in range(3):
+        store.write(_event("s1", n))
+        store.write(_event("s2", n))
+
+    assert [event["payload"]["n"] for event in store.events("s1")] == [0, 1, 2]
+    assert len(list(store.events("s2"))) == 3
+    assert not store.contains("missing")
+    assert list(store.events("missing")) == []
+    store.close()
+
+
+def test_segments_roll_and_reload_from_their_indexes(tmp_path):
+    store = AuditStore(tmp_path, segment_bytes=300)
+    for n in range(10):
+        store.write(_event("s1" if n % 2 else "s2", n))
+    store.close()
+
+    assert len(list(tmp_path.glob("writer.0/segment.*.log"))) > 1
+    assert len(list(tmp_path.glob("writer.0/segment.*.idx"))) == len(list(tmp_path.glob("writer.0/segment.*.log"))) - 1
+
+    reopened = AuditStore(tmp_path, segment_bytes=300)
+    assert [event["payload"]["n"] for event in reopened.events("s1")] == [1, 3, 5, 7, 9]
+    reopened.write(_event("s1", 11))
+    assert [event["payload"]["n"] for event in reopened.events("s1")][-1] == 11
+    reopened.close()
+
+
+def test_missing_index_is_rebuilt_and_torn_tail_cut(tmp_path):
+    store = AuditStore(tmp_path, segment_bytes=300)
+    for n in range(6):
+        store.write(_event("s1", n))
+    store.close()
+
+    next(tmp_path.glob("writer.0/segment.*.idx")).unlink()
+    active = max(tmp_path.glob("writer.0/segment.*.log"), key=lambda path: int(path.name.split(".")[1]))
+    with open(active, "ab") as file:
+        file.write(b'{"workflow_id": "s1", "event')
+
+    reopened = AuditStore(tmp_path, segment_bytes=300)
+
+    assert [event["payload"]["n"] for event in reopened.events("s1")] == list(range(6))
+    assert active.read_bytes().endswith(b"\n")
+    reopened.close()
+
+
+def test_retention_drops_oldest_segments_and_their_entries(tmp_path):
+    store = AuditStore(tmp_path, segment_bytes=200, max_segments=2)
+    store.write(_event("old", 0))
+    for n in range(10):
+        store.write(_event("new", n))
+
+    store.close()
+
+    assert len(list(tmp_path.glob("writer.0/segment.*.log"))) == 2
+    assert len(list(tmp_path.glob("writer.0/segment.*.idx"))) == 1
+    reopened = AuditStore(tmp_path, segment_bytes=200, max_segments=2)
+    assert not reopened.contains("old")
+    assert [event["payload"]["n"] for event in reopened.events("new")][-1] == 9
+    reopened.close()
+
+
+def test_events_written_while_streaming_are_not_included(tmp_path):
+    store = AuditStore(tmp_path)
+    store.write(_event("s1", 0))
+
+    lines = store.read_lines("s1")
+    store.write(_event("s1", 1))
+
+    assert len(list(lines)) == 1
+    store.close()
+
+
+def test_index_keeps_only_the_workflows_of_each_segment(tmp_path):
+    store = AuditStore(tmp_path, segment_bytes=300)
+    for n in range(10):
+        store.write(_event("s1" if n < 5 else "s2", n))
+    store.close()
+
+    indexes = [json.loads(path.read_bytes()) for path in sorted(tmp_path.glob("writer.0/segment.*.idx"))]
+    assert all(sorted(index) in (["s1"], ["s1", "s2"], ["s2"]) for index in indexes)
+
+
+def test_index_keeps_one_offset_per_workflow_and_block(tmp_path):
+    store = AuditStore(tmp_path, index_block_bytes=256)
+    for n in range(20):
+        store.write(_event("s1" if n % 5 == 0 else "s2", n))
+    store.close()
+
+    reopened = AuditStore(tmp_path, index_block_bytes=256)
+    starts = reopened._postings[1]
+    blocks = -(-(tmp_path / "writer.0" / "segment.1.log").stat().st_size // 256)
+    for workflow_starts in starts.values():
+        assert len({start // 256 for start in workflow_starts}) == len(workflow_starts)
+    assert len(starts["s2"]) <= blocks < 16
+    assert [event["payload"]["n"] for event in reopened.events("s1")] == [0, 5, 10, 15]
+    assert len(list(reopened.events("s2"))) == 16
+    reopened.close()
+
+
+def test_reads_only_the_blocks_holding_the_workflow(tmp_path):
+    store = AuditStore(tmp_path, index_block_bytes=256)
+    store.write(_event("s1", 0))
+    for n in range(20):
+        store.write(_event("s2", n))
+    store.write(_event("s1", 1))
+    store.flush()
+
+    # Bytes outside the indexed blocks are never read
+    path = tmp_path / "writer.0" / "segment.1.log"
+    data = bytearray(path.read_bytes())
+    _, last = store._postings[1]["s1"]
+    data[256:last - last % 256] = b"x" * (last - last % 256 - 256)
+    path.write_bytes(bytes(data))
+
+    assert [event["payload"]["n"] for event in store.events("s1")] == [0, 1]
+    store.close()
+
+
+def test_each_open_store_appends_to_its_own_writer_directory(tmp_path):
+    first = AuditStore(tmp_path)
+    second = AuditStore(tmp_path)
+    first.write({**_event("s1", 0), "timestamp": "2026-10-19T10:00:00"})
+    second.write({**_event("s1", 1), "timestamp": "2026-10-19T10:00:01"})
+    first.write({**_event("s1", 2), "timestamp": "2026-10-19T10:00:02"})
+    second.flush()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["writer.0", "writer.1"]
+    assert [event["payload"]["n"] for event in first.events("s1")] == [0, 1, 2]
+    assert second.contains("s1") and not second.contains("s2")
+    first.close()
+    second.close()
+
+    reopened = AuditStore(tmp_path)
+    assert [event["payload"]["n"] for event in reopened.events("s1")] == [0, 1, 2]
+    reopened.close()
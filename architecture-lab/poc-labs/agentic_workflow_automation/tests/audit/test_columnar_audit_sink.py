@@ -0,0 +1,151 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from automation_app.audit.audit_logger import AuditLogger
+from automation_app.audit.columnar_audit_sink import ColumnarAuditSink
+from automation_app.models.workflow_state import WorkflowState
+
+
+def _event(workflow_id, event_type, payload, second=0):
+    return {
+        "workflow_id": workflow_id,
+        "event_type": event_type,
+        "timestamp": f"2026-10-19T10:00:{second:02d}.000000",
+        "payload": payload,
+    }
+
+
+def _step(sink, workflow_id, adapter, failed):
+    action = {"adapter": adapter, "method": "get", "step": 0}
+    sink.write(_event(workflow_id, "ACTION_STARTED", {**action, "params": {}}))
+    sink.write(_event(workflow_id, "ATTEMPT FAILED", {"step": 0, "attempt": 1, "decision": "RecoveryDecision.RETRY"}, 1))
+    if failed:
+        sink.write(_event(workflow_id, "ACTION_FAILED", {**action, "decision": "FAIL"}, 2))
+    else:
+        sink.write(_event(workflow_id, WorkflowState.PROPOSED, action, 2))
+
+
+def test_events_become_typed_rows(tmp_path):
+    sink = ColumnarAuditSink(tmp_path / "audit.duckdb")
+    _step(sink, "s1", "Workday", failed=True)
+
+    rows = sink.query(
+        "SELECT event_type, adapter, method, step, decision, latency_ms, payload->>'attempt' "
+        "FROM audit_events ORDER BY timestamp"
+    )
+
+    assert rows == [
+        ("ACTION_STARTED", "Workday", "get", 0, None, None, None),
+        ("ATTEMPT FAILED", "Workday", "get", 0, "RETRY", 1000.0, "1"),
+        ("ACTION_FAILED", "Workday", "get", 0, "FAIL", 2000.0, None),
+    ]
+    sink.close()
+
+
+def test_rows_are_buffered_until_a_batch_fills(tmp_path):
+    sink = ColumnarAuditSink(tmp_path / "audit.duckdb", batch_size=4, flush_interval=3600)
+    _step(sink, "s1", "Workday", failed=False)
+    assert sink.metrics.counter("columnar_audit.flushes") == 0
+
+    sink.write(_event("s1", "WORKFLOW_COMPLETED", {}))
+    sink.query("SELECT 1")
+
+    assert sink.metrics.counter("columnar_audit.flushes") == 1
+    assert sink.metrics.counter("columnar_audit.rows") == 4
+    sink.close()
+
+
+def test_duckdb_file_keeps_rows_across_reopen(tmp_path):
+    sink = ColumnarAuditSink(tmp_path / "audit.duckdb")
+    _step(sink, "s1", "Workday", failed=False)
+    sink.close()
+
+    reopened = ColumnarAuditSink(tmp_path / "audit.duckdb")
+    _step(reopened, "s2", "MSGraph", failed=True)
+
+    assert reopened.query("SELECT count(DISTINCT workflow_id), count(*) FROM audit_events") == [(2, 6)]
+    reopened.close()
+
+
+def test_parquet_files_are_partitioned_by_hour_and_queryable(tmp_path):
+    sink = ColumnarAuditSink(tmp_path / "audit", format="parquet")
+    assert sink.query("SELECT count(*) FROM audit_events") == [(0,)]
+
+    for i in range(4):
+        _step(sink, f"w{i}", "Workday", failed=i == 0)
+        _step(sink, f"m{i}", "MSGraph", failed=i < 2)
+    sink.write({**_event("late", "ACTION_STARTED", {"adapter": "Workday"}), "timestamp": "2026-10-19T11:30:00"})
+
+    failure_rates = sink.query(
+        "SELECT adapter, avg((event_type = 'ACTION_FAILED')::INT) FROM audit_events "
+        "WHERE event_type IN ('ACTION_FAILED', 'PROPOSED') GROUP BY adapter ORDER BY adapter"
+    )
+    assert failure_rates == [("MSGraph", 0.5), ("Workday", 0.25)]
+    assert sorted(path.name for path in (tmp_path / "audit").iterdir()) == [
+        "hour=2026-10-19T10",
+        "hour=2026-10-19T11",
+    ]
+    sink.close()
+
+    reopened = ColumnarAuditSink(tmp_path / "audit", format="parquet")
+    assert reopened.query("SELECT count(*) FROM audit_events") == [(25,)]
+    reopened.close()
+
+
+def test_receives_records_as_an_audit_logger_sink(tmp_path):
+    sink = ColumnarAuditSink(tmp_path / "audit.duckdb")
+    AuditLogger.add_sink(sink)
+    try:
+        AuditLogger.log("s1", "POLICY_VIOLATION", {"adapter": "MSGraph", "matched_rules": ["no_external_email"]})
+    finally:
+        AuditLogger.remove_sink(sink)
+
+    assert sink.query(
+        "SELECT adapter, payload->'matched_rules'->>0 FROM audit_events WHERE event_type = 'POLICY_VIOLATION'"
+    ) == [("MSGraph", "no_external_email")]
+    sink.close()
+
+
+def test_batches_load_on_the_writer_thread(tmp_path):
+    sink = ColumnarAuditSink(tmp_path / "audit.duckdb", batch_size=3, max_pending=1)
+    gate = threading.Event()
+    sink._writer.submit(gate.wait)  # hold the writer thread
+
+    _step(sink, "s1", "Workday", failed=False)  # fills a batch, returns while it waits
+    _step(sink, "s2", "Workday", failed=False)  # over max_pending: dropped
+    assert sink.metrics.counter("columnar_audit.flushes") == 0
+    assert sink.metrics.counter("columnar_audit.dropped") == 3
+
+    gate.set()
+    assert sink.query("SELECT DISTINCT workflow_id FROM audit_events") == [("s1",)]
+    assert not list(tmp_path.glob("*.batch"))
+    sink.close()
+
+
+def test_duckdb_file_takes_a_single_writer_process(tmp_path):
+    sink = ColumnarAuditSink(tmp_path / "audit.duckdb")
+    other = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from automation_app.audit.columnar_audit_sink import ColumnarAuditSink; "
+            "ColumnarAuditSink(sys.argv[1])",
+            str(tmp_path / "audit.duckdb"),
+        ],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    sink.close()
+
+    assert other.returncode != 0
+    assert "single writer" in other.stderr
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ColumnarAuditSink(tmp_path / "audit", format="csv")
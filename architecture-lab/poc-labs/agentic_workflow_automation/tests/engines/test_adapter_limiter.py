@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from automation_app.engines.adapter_limiter import AdapterLimiter, FairLimiter, TokenBucket
+from automation_app.utils.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# TokenBucket
+# ---------------------------------------------------------------------------
+
+def test_token_bucket_allows_burst_then_reports_delay():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+
+    bucket.take()
+    bucket.take()
+
+    assert bucket.delay() == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.delay() == 0.0
+
+
+def test_token_bucket_never_exceeds_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=3, clock=clock)
+
+    clock.now = 100.0
+    bucket.delay()
+
+    assert bucket.tokens == 3
+
+
+# ---------------------------------------------------------------------------
+# FairLimiter
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_fair_limiter_caps_concurrency():
+    limiter = FairLimiter("Workday.*", max_concurrent=2)
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        await limiter.acquire("s1")
+        try:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+        finally:
+            active -= 1
+            limiter.release()
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_fair_limiter_serves_sessions_round_robin():
+    limiter = FairLimiter("MSGraph.*", max_concurrent=1)
+    order = []
+
+    await limiter.acquire("holder")
+
+    async def call(session_id, tag):
+        await limiter.acquire(session_id)
+        order.append(tag)
+        limiter.release()
+
+    tasks = [asyncio.create_task(call("big", f"big-{i}")) for i in range(3)]
+    tasks.append(asyncio.create_task(call("small", "small-0")))
+    await asyncio.sleep(0)
+
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    # The single "small" request is not stuck behind every "big" request
+    assert order.index("small-0") == 1
+
+
+@pytest.mark.asyncio
+async def test_fair_limiter_waits_for_rate_tokens():
+    metrics = MetricsRegistry()
+    limiter = FairLimiter("Workday.*", rate_per_second=50.0, burst=1, metrics=metrics)
+
+    await limiter.acquire("s1")
+    limiter.release()
+    await limiter.acquire("s1")
+    limiter.release()
+
+    summary = metrics.summary("adapter_limiter.wait_seconds", key="Workday.*")
+    assert summary["count"] == 2
+    assert summary["max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_fair_limiter_cancelled_waiter_does_not_leak_slot():
+    limiter = FairLimiter("Workday.*", max_concurrent=1)
+    await limiter.acquire("s1")
+
+    waiter = asyncio.create_task(limiter.acquire("s2"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    limiter.release()
+
+    assert limiter.in_flight == 0
+    assert limiter.queue_depth() == 0
+
+
+# ---------------------------------------------------------------------------
+# AdapterLimiter
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_adapter_limiter_passes_through_unconfigured_adapters():
+    limiter = AdapterLimiter()
+
+    async with limiter.limit("Workday", "create_time_off", "s1"):
+        pass
+
+    assert limiter.snapshot() == {}
+
+
+@pytest.mark.asyncio
+async def test_adapter_limiter_prefers_method_specific_limits():
+    limiter = AdapterLimiter({
+        "MSGraph": {
+            "*": {"max_concurrent": 8},
+            "send_email": {"max_concurrent": 1},
+        }
+    })
+
+    async with limiter.limit("MSGraph", "send_email", "s1"):
+        async with limiter.limit("MSGraph", "create_calendar_event", "s1"):
+            snapshot = limiter.snapshot()
+
+    assert snapshot["MSGraph.send_email"]["in_flight"] == 1
+    assert snapshot["MSGraph.send_email"]["max_concurrent"] == 1
+    assert snapshot["MSGraph.*"]["in_flight"] == 1
+    assert limiter.snapshot()["MSGraph.send_email"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_adapter_limiter_releases_on_error():
+    limiter = AdapterLimiter({"Workday": {"*": {"max_concurrent": 1}}})
+
+    with pytest.raises(RuntimeError):
+        async with limiter.limit("Workday", "create_time_off", "s1"):
+            raise RuntimeError("429")
+
+    assert limiter.snapshot()["Workday.*"]["in_flight"] == 0
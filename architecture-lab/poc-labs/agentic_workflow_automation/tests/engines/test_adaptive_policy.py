@@ -0,0 +1,95 @@
+import pytest
+
+from automation_app.engines.adaptive_policy import AdaptiveRetryPolicy, AdapterStats, RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_stats_track_ewma_latency_and_error_rate():
+    stats = AdapterStats(alpha=0.5)
+
+    stats.record(1.0, failed=False, transient=False, now=0)
+    stats.record(3.0, failed=True, transient=True, now=1)
+
+    assert stats.latency == 2.0
+    assert stats.error_rate == 0.5
+
+
+def test_stats_measure_time_to_recover():
+    stats = AdapterStats(alpha=1.0)
+
+    stats.record(0.1, failed=True, transient=True, now=10)
+    stats.record(0.1, failed=True, transient=True, now=11)
+    stats.record(0.1, failed=False, transient=False, now=14)
+
+    assert stats.time_to_recover == 4
+
+
+def test_defaults_until_min_samples():
+    policy = AdaptiveRetryPolicy(default_retries=3, default_backoff=0.5, min_samples=5)
+
+    for _ in range(4):
+        policy.record("Workday", "create_time_off", 0.2, failed=True, transient=True)
+
+    assert policy.policy_for("Workday", "create_time_off") == RetryPolicy(3, 0.5)
+    assert policy.policy_for("MSGraph", "send_email") == RetryPolicy(3, 0.5)
+
+
+def test_flaky_method_gets_more_attempts_within_bounds():
+    policy = AdaptiveRetryPolicy(min_samples=1, alpha=1.0, min_retries=2, max_retries=5)
+
+    policy.record("MSGraph", "send_email", 0.1, failed=True, transient=True)
+    stats = policy._stats[("MSGraph", "send_email")]
+
+    stats.error_rate = 0.5
+    assert policy.policy_for("MSGraph", "send_email").max_retries == 5  # 0.5**7 <= 1% -> clamped
+
+    stats.error_rate = 0.05
+    assert policy.policy_for("MSGraph", "send_email").max_retries == 2
+
+
+def test_outage_collapses_to_min_retries():
+    policy = AdaptiveRetryPolicy(min_samples=1, alpha=1.0, min_retries=1)
+
+    policy.record("Workday", "create_time_off", 5.0, failed=True, transient=True)
+
+    assert policy.policy_for("Workday", "create_time_off").max_retries == 1
+
+
+def test_backoff_follows_time_to_recover():
+    clock = FakeClock()
+    policy = AdaptiveRetryPolicy(min_samples=1, alpha=1.0, max_backoff=10.0, clock=clock)
+
+    policy.record("Workday", "create_time_off", 0.1, failed=True, transient=True)
+    clock.now = 6.0
+    policy.record("Workday", "create_time_off", 0.1, failed=False)
+
+    assert policy.policy_for("Workday", "create_time_off").base_backoff == 3.0
+
+
+def test_backoff_is_clamped():
+    policy = AdaptiveRetryPolicy(min_samples=1, alpha=1.0, min_backoff=0.2, max_backoff=1.0)
+
+    policy.record("MSGraph", "send_email", 0.001, failed=False)
+    policy.record("Workday", "create_time_off", 30.0, failed=False)
+
+    assert policy.policy_for("MSGraph", "send_email").base_backoff == 0.2
+    assert policy.policy_for("Workday", "create_time_off").base_backoff == 1.0
+
+
+def test_snapshot_exposes_applied_policy():
+    policy = AdaptiveRetryPolicy(min_samples=1, alpha=1.0, min_backoff=0.1)
+
+    policy.record("Workday", "create_time_off", 0.5, failed=False)
+
+    snapshot = policy.snapshot()["Workday.create_time_off"]
+    assert snapshot["samples"] == 1
+    assert snapshot["latency_ewma"] == 0.5
+    assert snapshot["max_retries"] == 2
+    assert snapshot["base_backoff"] == pytest.approx(1.0)
@@ -0,0 +1,116 @@
+import pytest
+from unittest.mock import MagicMock
+
+from automation_app.config.constants import CircuitState
+from automation_app.engines.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from automation_app.utils.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("Workday", failure_threshold=2, reset_timeout=10.0, clock=clock)
+
+
+def test_breaker_opens_after_threshold(breaker):
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_limits_probes(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.now = 10.0
+    assert breaker.allow_request() is True
+    assert breaker.state == CircuitState.HALF_OPEN
+    # Only one probe at a time
+    assert breaker.allow_request() is False
+
+
+def test_half_open_probe_success_closes(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10.0
+    breaker.allow_request()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_half_open_probe_failure_reopens(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10.0
+    breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    clock.now = 15.0
+    assert breaker.allow_request() is False
+
+
+def test_release_frees_probe_slot(breaker, clock):
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10.0
+    breaker.allow_request()
+
+    breaker.release()
+
+    assert breaker.allow_request() is True
+
+
+def test_registry_uses_adapter_config_with_fallback():
+    registry = CircuitBreakerRegistry(
+        {"*": {"failure_threshold": 5}, "Workday": {"failure_threshold": 1}},
+        auditor=MagicMock(),
+    )
+
+    assert registry.get("Workday").failure_threshold == 1
+    assert registry.get("MSGraph").failure_threshold == 5
+    assert registry.get("Workday") is registry.get("Workday")
+
+
+def test_registry_reports_transitions_to_metrics_and_audit():
+    auditor = MagicMock()
+    metrics = MetricsRegistry()
+    registry = CircuitBreakerRegistry({"*": {"failure_threshold": 1}}, metrics=metrics, auditor=auditor)
+
+    registry.get("Workday").record_failure("s1")
+
+    auditor.log.assert_called_once_with(
+        "s1",
+        "CIRCUIT_STATE_CHANGED",
+        {"adapter": "Workday", "from": "CLOSED", "to": "OPEN"},
+    )
+    assert metrics.gauge("circuit_breaker.state", adapter="Workday") == 2
+    assert metrics.counter("circuit_breaker.transitions", adapter="Workday", to="OPEN") == 1
+    assert registry.snapshot() == {"Workday": "OPEN"}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from automation_app.config.constants import RecoveryDecision
+from automation_app.engines.error_classifier import ErrorClassifier
+
+
+class WorkdayThrottled(Exception):
+    pass
+
+
+class WorkdayQuotaExceeded(WorkdayThrottled):
+    pass
+
+
+class HttpError(Exception):
+    def __init__(self, status_code, message="http error"):
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class ResponseError(Exception):
+    def __init__(self, status_code):
+        self.response = type("Response", (), {"status_code": status_code})()
+        super().__init__("request failed")
+
+
+@pytest.fixture
+def classifier():
+    return ErrorClassifier()
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (asyncio.TimeoutError(), RecoveryDecision.RETRY),
+        (ConnectionResetError(), RecoveryDecision.RETRY),
+        (PermissionError(), RecoveryDecision.PERMISSION),
+        (NotImplementedError(), RecoveryDecision.NOT_SUPPORTED),
+    ],
+)
+def test_builtin_exception_types(classifier, exc, expected):
+    assert classifier.classify(exc) == expected
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (HttpError(429), RecoveryDecision.RETRY),
+        (HttpError(503), RecoveryDecision.RETRY),
+        (HttpError(403), RecoveryDecision.PERMISSION),
+        (ResponseError(401), RecoveryDecision.PERMISSION),
+        (HttpError(501), RecoveryDecision.NOT_SUPPORTED),
+        (HttpError(500), RecoveryDecision.UNKNOWN),
+    ],
+)
+def test_http_status_lookup(classifier, exc, expected):
+    assert classifier.classify(exc) == expected
+
+
+def test_registered_exception_type_matches_subclasses(classifier):
+    classifier.register_exception(WorkdayThrottled, RecoveryDecision.RETRY)
+
+    assert classifier.classify(WorkdayQuotaExceeded("boom")) == RecoveryDecision.RETRY
+
+
+def test_registration_invalidates_type_cache(classifier):
+    assert classifier.classify(WorkdayQuotaExceeded("boom")) == RecoveryDecision.UNKNOWN
+
+    classifier.register_exception(WorkdayQuotaExceeded, RecoveryDecision.PERMISSION)
+
+    assert classifier.classify(WorkdayQuotaExceeded("boom")) == RecoveryDecision.PERMISSION
+
+
+def test_registered_status_overrides_default(classifier):
+    classifier.register_status(500, RecoveryDecision.RETRY)
+
+    assert classifier.classify(HttpError(500)) == RecoveryDecision.RETRY
+
+
+def test_structured_lookup_wins_over_keywords(classifier):
+    # The message says "forbidden" but the status code is authoritative
+    assert classifier.classify(HttpError(503, "forbidden")) == RecoveryDecision.RETRY
+
+
+def test_keyword_fallback_keeps_priority_order(classifier):
+    exc = Exception("Permission check hit a timeout")
+
+    assert classifier.classify(exc) == RecoveryDecision.RETRY
+
+
+def test_custom_keywords():
+    classifier = ErrorClassifier(keywords={RecoveryDecision.RETRY: ["try again"]})
+
+    assert classifier.classify(Exception("Please TRY AGAIN later")) == RecoveryDecision.RETRY
+    assert classifier.classify(Exception("timeout")) == RecoveryDecision.UNKNOWN
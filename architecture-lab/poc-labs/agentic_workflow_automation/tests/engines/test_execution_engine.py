@@ -1,22 +1,17 @@
 import pytest
 import asyncio
-from unittest.mock import MagicMock, AsyncMock, patch, ANY
+import time
+from unittest.mock import MagicMock, AsyncMock, patch, ANY, call
 
 from automation_app.config.constants import RecoveryDecision
 from automation_app.engines.exceptions import ActionFailure
 from automation_app.engines.execution_engine import ExecutionEngine
 from automation_app.models.action import Action
+from automation_app.models.executed_step import ExecutedStep
 from automation_app.models.plan import Plan
 from automation_app.models.workflow_state import WorkflowState
 
 
-class MockAction:
-    def __init__(self, adapter, method, params):
-        self.adapter = adapter
-        self.method = method
-        self.params = params
-
-
 @pytest.fixture
 def mock_adapter():
     adapter = MagicMock()  # NOT AsyncMock
@@ -35,7 +30,7 @@ def engine(mock_adapter):
 
     return ExecutionEngine(
         adapters=adapters,
-        state_store=MagicMock(),
+        state_store=AsyncMock(),
         auditor=MagicMock(),
         planner=mock_planner
     )
@@ -100,7 +95,7 @@ async def test_run_unsupported_action(engine, mock_adapter):
 
 @pytest.mark.asyncio
 async def test_rollback_compensation_failure_logging(engine, mock_adapter):
-    action = MockAction("identity_service", "create_user", {"id": 1})
+    action = Action(adapter="identity_service", method="create_user", params={"id": 1})
     plan = MagicMock(spec=Plan)
     plan.actions = [action]
 
@@ -115,30 +110,27 @@ async def test_rollback_compensation_failure_logging(engine, mock_adapter):
     )
 
 
-def test_save_state_early_return(engine):
-    """Verifies that if session_id is missing, save_context is never called."""
-    plan = MagicMock(spec=Plan)
-
+@pytest.mark.asyncio
+async def test_save_state_early_return(engine):
+    """Verifies that if session_id is missing, the store is never called."""
     # Reset engine to have no state_store for this test
     engine.state_store = None
 
     # This should not raise any errors or call any methods
-    engine._save_state(None, plan, 0, "STARTED")
+    await engine._save_state(None, "plan-hash", 0, "STARTED")
 
     # Ensure auditor wasn't even called for a failure
     engine.auditor.log.assert_not_called()
 
 
-def test_save_state_exception_handling(engine):
+@pytest.mark.asyncio
+async def test_save_state_exception_handling(engine):
     """Verifies that a failure in the state store is audited but doesn't crash."""
-    plan = MagicMock(spec=Plan)
-    plan.dict.return_value = {"actions": []}
-
     # Force the state store to fail
-    engine.state_store.save_context.side_effect = Exception("Redis Connection Lost")
+    engine.state_store.update_context.side_effect = Exception("Redis Connection Lost")
 
     # This should NOT raise an exception
-    engine._save_state("session_123", plan, 0, "STARTED")
+    await engine._save_state("session_123", "plan-hash", 0, "STARTED")
 
     # Verify the audit log captured the failure
     engine.auditor.log.assert_called_with(
@@ -151,7 +143,7 @@ def test_save_state_exception_handling(engine):
 @pytest.mark.asyncio
 async def test_run_adapter_missing(engine):
     # Action points to an adapter that doesn't exist in engine.adapters
-    action = MockAction("missing_service", "do_thing", {})
+    action = Action(adapter="missing_service", method="do_thing", params={})
     plan = MagicMock(spec=Plan)
     plan.actions = [action]
 
@@ -162,7 +154,7 @@ async def test_run_adapter_missing(engine):
         # Verify specific audit log
         engine.auditor.log.assert_any_call("fail_1", "ACTION_FAILED", ANY)
         # Verify rollback was called for step 0
-        mock_rollback.assert_awaited_once_with(plan, up_to_step=0, session_id="fail_1")
+        mock_rollback.assert_awaited_once_with(plan, up_to_step=0, session_id="fail_1", executed={})
 
 @pytest.fixture
 def make_plan():
@@ -180,7 +172,7 @@ async def test_run_missing_adapter():
     engine.scrubber = MagicMock()
     engine.scrubber.scrub_data.return_value = {"x": 1}
     engine._audit = MagicMock()
-    engine._save_state = MagicMock()
+    engine._save_state = AsyncMock()
     engine.rollback = AsyncMock()
 
     plan = Plan(actions=[
@@ -214,7 +206,7 @@ async def test_run_unsupported_method():
     engine.scrubber = MagicMock()
     engine.scrubber.scrub_data.return_value = {"x": 1}
     engine._audit = MagicMock()
-    engine._save_state = MagicMock()
+    engine._save_state = AsyncMock()
     engine.rollback = AsyncMock()
 
     engine._is_action_supported = MagicMock(return_value=False)
@@ -300,7 +292,7 @@ async def test_run_adapter_exception_triggers_re_plan(engine):
 
 @pytest.mark.asyncio
 async def test_rollback_no_compensation_available(engine, mock_adapter):
-    action = MockAction("identity_service", "create_user", {})
+    action = Action(adapter="identity_service", method="create_user", params={})
     plan = MagicMock(spec=Plan)
     plan.actions = [action]
 
@@ -314,7 +306,7 @@ async def test_rollback_no_compensation_available(engine, mock_adapter):
 
 @pytest.mark.asyncio
 async def test_rollback_sync_fallback(engine, mock_adapter):
-    action = MockAction("identity_service", "create_user", {"id": 5})
+    action = Action(adapter="identity_service", method="create_user", params={"id": 5})
     plan = MagicMock(spec=Plan)
     plan.actions = [action]
 
@@ -323,7 +315,8 @@ async def test_rollback_sync_fallback(engine, mock_adapter):
 
     await engine.rollback(plan, up_to_step=1, session_id="roll_sync")
 
-    mock_adapter.compensate.assert_called_once_with("create_user", {"id": 5})
+    # No execute result is known without the saga state
+    mock_adapter.compensate.assert_called_once_with("create_user", {"id": 5}, None)
     engine.auditor.log.assert_any_call("roll_sync", "ACTION_COMPENSATED", ANY)
 
 
@@ -353,7 +346,7 @@ async def test_replan_on_failure_triggers_audit_and_returns_false():
     )
 
     # Validate return value
-    assert result is False
+    assert result is None
 
     # Validate audit log
     engine._audit.assert_called_once_with(
@@ -419,13 +412,13 @@ async def test_replan_on_failure_with_repaired_plan_reruns():
     repaired_action = Action(adapter="Workday", method="approve_time_off", params={"x": 1})
     repaired_plan = Plan(actions=[repaired_action])
 
-    # Create ExecutionEngine with mocked planner, auditor, and run
+    # Create ExecutionEngine with mocked planner and auditor
     engine = ExecutionEngine(adapters={})
     engine._audit = MagicMock()
     engine.auditor = MagicMock()
     engine.planner = AsyncMock()
     engine.planner.repair_plan = AsyncMock(return_value=repaired_plan)
-    engine.run = AsyncMock(return_value=True)  # pretend rerun succeeds
+    engine.run = AsyncMock()
 
     # --- Exercise ---
     result = await engine._replan_on_failure(
@@ -436,8 +429,8 @@ async def test_replan_on_failure_with_repaired_plan_reruns():
     )
 
     # --- Verify ---
-    # The return value should be whatever `run` returned
-    assert result is True
+    # The repaired plan is handed back to run()'s replanning loop
+    assert result is repaired_plan
 
     # `_audit` should be called for REPLAN_TRIGGERED
     engine._audit.assert_called_with(
@@ -457,8 +450,8 @@ async def test_replan_on_failure_with_repaired_plan_reruns():
         decision=RecoveryDecision.FAIL,
     )
 
-    # run() should have been called with the repaired plan
-    engine.run.assert_awaited_once_with(repaired_plan, session_id="session_42")
+    # The repair is not re-run recursively
+    engine.run.assert_not_awaited()
 
     # Auditor.log should log PLAN_REPAIRED
     engine.auditor.log.assert_any_call(
@@ -469,3 +462,478 @@ async def test_replan_on_failure_with_repaired_plan_reruns():
             "new_plan": ["approve_time_off"],
         },
     )
+
+@pytest.mark.asyncio
+async def test_execute_action_waits_on_adapter_limiter():
+    class FakeAdapter:
+        def execute(self, method, params):
+            return {"ok": True}
+
+    limiter = MagicMock()
+    limiter.limit.return_value.__aenter__ = AsyncMock()
+    limiter.limit.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    engine = ExecutionEngine(adapters={"Workday": FakeAdapter()}, auditor=MagicMock(), limiter=limiter)
+    action = Action(adapter="Workday", method="create_time_off", params={"x": 1})
+
+    result = await engine._execute_action_with_recovery(
+        action=action,
+        adapter=FakeAdapter(),
+        session_id="S5",
+        step_idx=0,
+    )
+
+    assert result == {"ok": True}
+    limiter.limit.assert_called_once_with("Workday", "create_time_off", "S5")
+    limiter.limit.return_value.__aenter__.assert_awaited_once()
+
+
+def test_engine_lets_adapters_register_error_mappings():
+    adapter = MagicMock()
+    engine = ExecutionEngine(adapters={"Workday": adapter}, auditor=MagicMock())
+
+    adapter.register_errors.assert_called_once_with(engine.recovery.classifier)
+
+
+@pytest.mark.asyncio
+async def test_idempotent_reads_go_through_hedger():
+    class ReadAdapter:
+        async def execute(self, method, params):
+            return {"available": True}
+
+        def supported_actions(self):
+            return {"check_calendar_availability"}
+
+        def idempotent_reads(self):
+            return {"check_calendar_availability"}
+
+    adapter = ReadAdapter()
+    async def passthrough(key, call_fn):
+        return await call_fn()
+
+    hedger = MagicMock()
+    hedger.call = AsyncMock(side_effect=passthrough)
+    engine = ExecutionEngine(adapters={"MSGraph": adapter}, auditor=MagicMock(), hedger=hedger)
+    action = Action(adapter="MSGraph", method="check_calendar_availability", params={})
+
+    result = await engine._execute_action_with_recovery(
+        action=action,
+        adapter=adapter,
+        session_id="S6",
+        step_idx=0,
+    )
+
+    assert result == {"available": True}
+    hedger.call.assert_awaited_once_with("MSGraph.check_calendar_availability", ANY)
+
+
+@pytest.mark.asyncio
+async def test_mutating_actions_are_never_hedged():
+    class WriteAdapter:
+        async def execute(self, method, params):
+            return {"request_id": "WD1"}
+
+        def idempotent_reads(self):
+            return set()
+
+    hedger = MagicMock()
+    hedger.call = AsyncMock()
+    engine = ExecutionEngine(adapters={"Workday": WriteAdapter()}, auditor=MagicMock(), hedger=hedger)
+    action = Action(adapter="Workday", method="create_time_off", params={})
+
+    result = await engine._execute_action_with_recovery(
+        action=action,
+        adapter=WriteAdapter(),
+        session_id="S7",
+        step_idx=0,
+    )
+
+    assert result == {"request_id": "WD1"}
+    hedger.call.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_run_writes_plan_once_and_step_deltas(engine, mock_adapter):
+    plan = Plan(actions=[
+        Action(adapter="identity_service", method="send_email", params={"n": i})
+        for i in range(3)
+    ])
+
+    assert await engine.run(plan, session_id="delta_1") is True
+
+    plan_hash = plan.content_hash()
+    engine.state_store.save_plan.assert_awaited_once_with(plan_hash, plan.model_dump(mode="json"))
+    engine.state_store.save_context.assert_not_called()
+
+    calls = engine.state_store.update_context.await_args_list
+    deltas = [c.args[1] for c in calls]
+    assert deltas[0] == {"plan_hash": plan_hash}
+    # Two transitions per step, each carrying only (plan_hash, step, status),
+    # then the terminal state
+    assert len(deltas) == 1 + 2 * 3 + 1
+    assert deltas[-2] == {
+        "plan_hash": plan_hash,
+        "last_action_index": 2,
+        "last_action_status": WorkflowState.PROPOSED,
+    }
+    assert calls[-1] == call("delta_1", {}, state=WorkflowState.COMPLETED)
+
+
+@pytest.mark.asyncio
+async def test_run_and_rollback_scrub_each_action_once(engine, mock_adapter):
+    engine.scrubber = MagicMock()
+    engine.scrubber.scrub_data.return_value = {"email": "***"}
+
+    action = Action(adapter="identity_service", method="send_email", params={"email": "a@b.com"})
+    plan = Plan(actions=[action])
+
+    assert await engine.run(plan, session_id="scrub") is True
+    await engine.rollback(plan, up_to_step=1, session_id="scrub")
+
+    engine.scrubber.scrub_data.assert_called_once_with({"email": "a@b.com"})
+    engine.auditor.log.assert_any_call(
+        "scrub",
+        "ACTION_COMPENSATED",
+        {"adapter": "identity_service", "method": "send_email", "step": 0, "params": {"email": "***"}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_deadline_exceeded_rolls_back_without_replan(engine, mock_adapter):
+    engine._replan_on_failure = AsyncMock()
+    engine.rollback = AsyncMock()
+
+    async def hang(method, params):
+        await asyncio.sleep(10)
+
+    mock_adapter.execute_async.side_effect = hang
+    plan = Plan(actions=[
+        Action(adapter="identity_service", method="send_email", params={"id": 1}),
+        Action(adapter="identity_service", method="create_calendar_event", params={"id": 2}),
+    ])
+
+    result = await engine.run(plan, session_id="late", deadline=time.monotonic() + 0.05)
+
+    assert result is False
+    engine.rollback.assert_awaited_once_with(plan, up_to_step=0, session_id="late", executed={})
+    engine._replan_on_failure.assert_not_awaited()
+    engine.auditor.log.assert_any_call(
+        "late",
+        "PLAN_DEADLINE_EXCEEDED",
+        {"adapter": "identity_service", "method": "send_email", "step": 0},
+    )
+
+
+# ----------------------------------------------------------------------
+# Iterative replanning
+# ----------------------------------------------------------------------
+def _failing_engine(decisions, **kwargs):
+    engine = ExecutionEngine(adapters={"Workday": MagicMock()}, auditor=MagicMock(), **kwargs)
+    engine._is_action_supported = MagicMock(return_value=True)
+    engine.rollback = AsyncMock()
+    engine.recovery.attempt_with_recovery = AsyncMock(
+        side_effect=[
+            ActionFailure(decision, RuntimeError("boom")) if decision else "OK"
+            for decision in decisions
+        ]
+    )
+    engine.planner = MagicMock()
+    return engine
+
+
+def _plan(method):
+    return Plan(actions=[Action(adapter="Workday", method=method, params={})])
+
+
+@pytest.mark.asyncio
+async def test_replan_loop_runs_repairs_iteratively_until_success():
+    engine = _failing_engine([RecoveryDecision.PERMISSION, RecoveryDecision.PERMISSION, None])
+    engine.planner.repair_plan = AsyncMock(side_effect=[_plan("second"), _plan("third")])
+
+    result = await engine.run(_plan("first"), session_id="loop")
+
+    assert result is True
+    assert engine.planner.repair_plan.await_count == 2
+    assert engine.metrics.summary("replan.depth")["max"] == 2
+    assert engine.metrics.counter("replan.outcome", result="success") == 1
+
+
+@pytest.mark.asyncio
+async def test_replan_loop_stops_at_max_depth():
+    engine = _failing_engine([RecoveryDecision.PERMISSION] * 3, max_replan_depth=2)
+    engine.planner.repair_plan = AsyncMock(side_effect=[_plan("second"), _plan("third")])
+
+    result = await engine.run(_plan("first"), session_id="deep")
+
+    assert result is False
+    assert engine.planner.repair_plan.await_count == 2
+    assert engine.metrics.counter("replan.limit_reached", reason="max_depth") == 1
+    assert engine.metrics.counter("replan.outcome", result="failure") == 1
+
+
+@pytest.mark.asyncio
+async def test_replan_loop_detects_repair_cycles():
+    first = _plan("first")
+    engine = _failing_engine([RecoveryDecision.PERMISSION] * 3)
+    engine.planner.repair_plan = AsyncMock(side_effect=[_plan("second"), first])
+
+    result = await engine.run(first, session_id="cycle")
+
+    assert result is False
+    assert engine.metrics.counter("replan.limit_reached", reason="cycle") == 1
+
+
+@pytest.mark.asyncio
+async def test_replan_loop_respects_time_budget():
+    engine = _failing_engine([RecoveryDecision.PERMISSION], replan_time_budget=0)
+    engine.planner.repair_plan = AsyncMock()
+
+    result = await engine.run(_plan("first"), session_id="slow")
+
+    assert result is False
+    engine.planner.repair_plan.assert_not_awaited()
+    assert engine.metrics.counter("replan.limit_reached", reason="time_budget") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("rate, traced", [(0.0, False), (1.0, True)])
+async def test_rejection_trace_is_sampled(rate, traced):
+    engine = _failing_engine([RecoveryDecision.FAIL], trace_sample_rate=rate)
+    engine.planner.repair_plan = AsyncMock(return_value=None)
+
+    await engine.run(_plan("first"), session_id="s")
+
+    rejected = next(c.args[2] for c in engine.auditor.log.call_args_list if c.args[1] == WorkflowState.REJECTED)
+    assert (rejected["trace"] is not None) is traced
+    if traced:
+        assert "ActionFailure: boom" in rejected["trace"]
+
+
+@pytest.mark.asyncio
+async def test_repair_memo_skips_planner_for_known_failures():
+    engine = _failing_engine([RecoveryDecision.FAIL, None, RecoveryDecision.FAIL, None])
+    engine.planner.repair_plan = AsyncMock(return_value=_plan("second"))
+
+    assert await engine.run(_plan("first"), session_id="a") is True
+    assert await engine.run(_plan("first"), session_id="b") is True
+
+    engine.planner.repair_plan.assert_awaited_once()
+    assert engine.metrics.counter("replan.memo_hits") == 1
+
+
+@pytest.mark.asyncio
+async def test_unrecoverable_repairs_are_not_memoized():
+    engine = _failing_engine([RecoveryDecision.FAIL, RecoveryDecision.FAIL])
+    engine.planner.repair_plan = AsyncMock(return_value=None)
+
+    assert await engine.run(_plan("first"), session_id="a") is False
+    assert await engine.run(_plan("first"), session_id="b") is False
+
+    assert engine.planner.repair_plan.await_count == 2
+    assert engine.metrics.counter("replan.memo_hits") == 0
+
+
+# ----------------------------------------------------------------------
+# Speculative prefetch
+# ----------------------------------------------------------------------
+@pytest.fixture
+def prefetch_engine():
+    adapter = MagicMock()
+    adapter.supported_actions.return_value = ["get_pto_balance", "create_time_off"]
+    adapter.idempotent_reads.return_value = {"get_pto_balance"}
+    adapter.execute_async = AsyncMock(return_value={"ok": True})
+    engine = ExecutionEngine(adapters={"Workday": adapter}, auditor=MagicMock())
+    return engine, adapter
+
+
+@pytest.mark.asyncio
+async def test_start_prefetch_only_launches_idempotent_reads(prefetch_engine):
+    engine, adapter = prefetch_engine
+    plan = Plan(actions=[
+        Action(adapter="Workday", method="get_pto_balance", params={}),
+        Action(adapter="Workday", method="create_time_off", params={"dates": ["Fri"]}),
+        Action(adapter="Missing", method="get_pto_balance", params={}),
+    ])
+
+    assert engine.start_prefetch(plan, session_id="s1", proposal_id="p1") == 1
+    await asyncio.gather(*(e["task"] for e in engine.prefetch_cache._entries["p1"].values()))
+
+    adapter.execute_async.assert_awaited_once_with("get_pto_balance", {})
+
+
+@pytest.mark.asyncio
+async def test_run_reuses_prefetched_reads_and_runs_mutations(prefetch_engine):
+    engine, adapter = prefetch_engine
+    plan = Plan(actions=[
+        Action(adapter="Workday", method="get_pto_balance", params={}),
+        Action(adapter="Workday", method="create_time_off", params={"dates": ["Fri"]}),
+    ])
+
+    engine.start_prefetch(plan, session_id="s1", proposal_id="p1")
+    result = await engine.run(plan, session_id="s1", proposal_id="p1")
+
+    assert result is True
+    assert [c.args[0] for c in adapter.execute_async.await_args_list] == ["get_pto_balance", "create_time_off"]
+    engine.auditor.log.assert_any_call(
+        "s1", "PREFETCH_REUSED", {"adapter": "Workday", "method": "get_pto_balance", "step": 0}
+    )
+    # Results are dropped once the proposal has executed
+    assert "p1" not in engine.prefetch_cache._entries
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_falls_back_to_execution(prefetch_engine):
+    engine, adapter = prefetch_engine
+    engine.recovery.max_retries = 1
+    adapter.execute_async.side_effect = [ValueError("Invalid input"), {"balance_days": 3}]
+    plan = Plan(actions=[Action(adapter="Workday", method="get_pto_balance", params={})])
+
+    engine.start_prefetch(plan, session_id="s1", proposal_id="p1")
+    result = await engine.run(plan, session_id="s1", proposal_id="p1")
+
+    assert result is True
+    assert adapter.execute_async.await_count == 2
+    engine.auditor.log.assert_any_call("s1", "PREFETCH_FAILED", ANY)
+
+
+# ----------------------------------------------------------------------
+# Saga rollback
+# ----------------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_rollback_passes_execute_results_and_skips_unexecuted_steps(engine, mock_adapter):
+    plan = Plan(actions=[
+        Action(adapter="identity_service", method="send_email", params={"a": 1}),
+        Action(adapter="identity_service", method="create_calendar_event", params={"b": 2}),
+    ])
+    executed = {0: ExecutedStep("identity_service", "send_email", {"a": 1}, {"message_id": "M1"})}
+
+    assert await engine.rollback(plan, up_to_step=2, session_id="s", executed=executed) is True
+
+    mock_adapter.compensate_async.assert_awaited_once_with("send_email", {"a": 1}, {"message_id": "M1"})
+
+
+@pytest.mark.asyncio
+async def test_failed_step_rolls_back_with_recorded_results(engine, mock_adapter):
+    mock_adapter.execute_async.side_effect = [{"message_id": "M1"}, ValueError("Invalid input")]
+    engine.planner.repair_plan = AsyncMock(return_value=None)
+    plan = Plan(actions=[
+        Action(adapter="identity_service", method="send_email", params={"a": 1}),
+        Action(adapter="identity_service", method="create_calendar_event", params={"b": 2}),
+    ])
+
+    assert await engine.run(plan, session_id="s") is False
+
+    mock_adapter.compensate_async.assert_awaited_once_with("send_email", {"a": 1}, {"message_id": "M1"})
+    engine.state_store.update_context.assert_awaited_with("s", {}, state=WorkflowState.REJECTED)
+
+
+def _compensation_engine(order, gates=None):
+    gates = gates or {}
+
+    def adapter_for(name):
+        adapter = MagicMock()
+
+        async def compensate(method, params, result):
+            if method in gates:
+                await asyncio.wait_for(gates[method].wait(), timeout=1)
+            order.append(method)
+            if f"after_{method}" in gates:
+                gates[f"after_{method}"].set()
+
+        adapter.compensate_async = compensate
+        return adapter
+
+    return ExecutionEngine(
+        adapters={"A": adapter_for("A"), "B": adapter_for("B")},
+        auditor=MagicMock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_rollback_without_declared_dependencies_is_reverse_order():
+    order = []
+    plan = Plan(actions=[
+        Action(adapter="A", method="a1", params={}),
+        Action(adapter="B", method="b1", params={}),
+        Action(adapter="A", method="a2", params={}),
+    ])
+
+    await _compensation_engine(order).rollback(plan, session_id="s")
+
+    assert order == ["a2", "b1", "a1"]
+
+
+@pytest.mark.asyncio
+async def test_rollback_follows_declared_dependencies():
+    order = []
+    # b1 declares no dependencies, so it may wait for a1 without a deadlock
+    gates = {"b1": asyncio.Event()}
+    gates["after_a1"] = gates["b1"]
+    plan = Plan(actions=[
+        Action(adapter="A", method="a1", params={}, depends_on=()),
+        Action(adapter="B", method="b1", params={}, depends_on=()),
+        Action(adapter="A", method="a2", params={}, depends_on=(0,)),
+    ])
+
+    assert await _compensation_engine(order, gates).rollback(plan, session_id="s") is True
+
+    assert order == ["a2", "a1", "b1"]
+
+
+@pytest.mark.asyncio
+async def test_rollback_dependencies_carry_through_steps_that_did_not_run():
+    order = []
+    plan = Plan(actions=[
+        Action(adapter="A", method="a1", params={}, depends_on=()),
+        Action(adapter="B", method="b1", params={}, depends_on=(0,)),
+        Action(adapter="A", method="a2", params={}, depends_on=(1,)),
+    ])
+    executed = {
+        0: ExecutedStep("A", "a1", {}, None),
+        2: ExecutedStep("A", "a2", {}, None),
+    }
+
+    await _compensation_engine(order).rollback(plan, session_id="s", executed=executed)
+
+    assert order == ["a2", "a1"]
+
+
+## --- Compiled plans ---
+
+@pytest.mark.asyncio
+async def test_invalid_plan_is_rejected_before_any_step_runs(engine, mock_adapter):
+    plan = Plan(actions=[
+        Action(adapter="identity_service", method="send_email", params={"a": 1}),
+        Action(adapter="identity_service", method="delete_user", params={"b": 2}),
+    ])
+
+    assert await engine.run(plan, session_id="s") is False
+
+    mock_adapter.execute_async.assert_not_awaited()
+    mock_adapter.compensate_async.assert_not_awaited()
+    engine.auditor.log.assert_any_call(
+        "s",
+        "ACTION_FAILED",
+        {
+            "adapter": "identity_service",
+            "method": "delete_user",
+            "step": 1,
+            "error": "Action 'delete_user' not supported by adapter 'identity_service'",
+        },
+    )
+    started = [c for c in engine.auditor.log.call_args_list if c.args[1] == "ACTION_STARTED"]
+    assert started == []
+
+
+@pytest.mark.asyncio
+async def test_adapter_capabilities_are_not_requeried_per_step(engine, mock_adapter):
+    plan = Plan(actions=[
+        Action(adapter="identity_service", method="send_email", params={"n": i})
+        for i in range(5)
+    ])
+
+    assert await engine.run(plan, session_id="s") is True
+    assert await engine.run(plan, session_id="s") is True
+
+    assert mock_adapter.supported_actions.call_count == 1
+    assert mock_adapter.execute_async.await_count == 10
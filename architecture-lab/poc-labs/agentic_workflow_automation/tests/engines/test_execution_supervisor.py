@@ -0,0 +1,102 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from automation_app.engines.execution_engine import ExecutionEngine
+from automation_app.engines.execution_supervisor import ExecutionSupervisor
+from automation_app.engines.plan_run import PlanRun
+from automation_app.engines.recovery_engine import RecoveryEngine
+from automation_app.models.action import Action
+from automation_app.models.plan import Plan
+from automation_app.models.workflow_state import WorkflowState
+
+
+def _engine(adapter, backoff=0.05):
+    auditor = MagicMock()
+    return ExecutionEngine(
+        adapters={"identity_service": adapter},
+        state_store=AsyncMock(),
+        auditor=auditor,
+        recovery_engine=RecoveryEngine(auditor=auditor, base_backoff=backoff, jitter="none"),
+    )
+
+
+def _adapter(*outcomes):
+    adapter = MagicMock()
+    adapter.supported_actions.return_value = ["send_email"]
+    adapter.execute_async = AsyncMock(side_effect=list(outcomes))
+    adapter.compensate_async = AsyncMock()
+    return adapter
+
+
+def _plan(n=0):
+    return Plan(actions=[Action(adapter="identity_service", method="send_email", params={"n": n})])
+
+
+async def _until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_backing_off_run_holds_no_task_and_resumes_when_due():
+    adapter = _adapter(Exception("connection timeout"), {"message_id": "M1"})
+    engine = _engine(adapter)
+    supervisor = ExecutionSupervisor(engine, auditor=engine.auditor)
+
+    run = supervisor.submit(_plan(), session_id="s1")
+    await _until(lambda: supervisor.parked() == 1 and not supervisor._tasks)
+
+    assert run.retry.attempt == 2
+    engine.auditor.log.assert_any_call("s1", "RETRY_DEFERRED", {
+        "adapter": "identity_service", "method": "send_email", "step": 0, "attempt": 2, "delay": 0.05,
+    })
+
+    await _until(lambda: not supervisor.parked() and not supervisor._tasks)
+    assert adapter.execute_async.await_count == 2
+    engine.state_store.update_context.assert_awaited_with("s1", {}, state=WorkflowState.COMPLETED)
+    # The step was announced once, not again when it was continued
+    started = [c for c in engine.auditor.log.call_args_list if c.args[1] == "ACTION_STARTED"]
+    assert len(started) == 1
+    await supervisor.close()
+
+
+@pytest.mark.asyncio
+async def test_parked_runs_share_one_timer_and_resume_in_due_order():
+    order = []
+
+    async def advance(run):
+        order.append(run.session_id)
+        return True
+
+    supervisor = ExecutionSupervisor(MagicMock(advance=advance))
+    now = time.monotonic()
+    for session_id, delay in [("late", 0.06), ("early", 0.02), ("mid", 0.04)]:
+        run = PlanRun(_plan(), session_id=session_id, defer_retries=True)
+        run.due = now + delay
+        supervisor._park(run)
+
+    assert supervisor.parked() == 3
+    assert supervisor._timer_due == now + 0.02
+
+    await _until(lambda: len(order) == 3)
+    assert order == ["early", "mid", "late"]
+    assert supervisor.metrics.counter("execution_supervisor.resumed") == 3
+    await supervisor.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_execution_is_audited():
+    engine = _engine(_adapter())
+    engine.advance = AsyncMock(side_effect=RuntimeError("boom"))
+    supervisor = ExecutionSupervisor(engine, auditor=MagicMock())
+
+    supervisor.submit(_plan(), session_id="s1")
+    await _until(lambda: not supervisor._tasks)
+
+    supervisor.auditor.log.assert_called_once_with("s1", WorkflowState.REJECTED, {"error": "boom"})
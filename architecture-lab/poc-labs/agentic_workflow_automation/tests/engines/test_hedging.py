@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from automation_app.engines.hedging import HedgedCaller, LatencyTracker
+from automation_app.utils.metrics import MetricsRegistry
+
+
+# ---------------------------------------------------------------------------
+# LatencyTracker
+# ---------------------------------------------------------------------------
+
+def test_percentile_requires_min_samples():
+    tracker = LatencyTracker()
+    tracker.record("MSGraph.check_calendar_availability", 0.1)
+
+    assert tracker.percentile("MSGraph.check_calendar_availability", 95, min_samples=2) is None
+    assert tracker.percentile("unknown", 95) is None
+
+
+def test_percentile_over_rolling_window():
+    tracker = LatencyTracker(window=100)
+    for i in range(1, 201):
+        tracker.record("k", i / 1000)
+
+    # Only the last 100 samples (0.101 .. 0.200) are kept
+    assert tracker.percentile("k", 0) == pytest.approx(0.101)
+    assert tracker.percentile("k", 95) == pytest.approx(0.195)
+
+
+# ---------------------------------------------------------------------------
+# HedgedCaller
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged():
+    metrics = MetricsRegistry()
+    hedger = HedgedCaller(default_delay=0.05, metrics=metrics)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return "fast"
+
+    assert await hedger.call("k", call) == "fast"
+    assert calls == 1
+    assert metrics.counter("hedge.calls", key="k") == 1
+    assert metrics.counter("hedge.issued", key="k") == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_hedge_wins():
+    metrics = MetricsRegistry()
+    hedger = HedgedCaller(default_delay=0.01, metrics=metrics)
+    delays = [1.0, 0.0]
+    cancelled = []
+
+    async def call():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    result = await hedger.call("k", call)
+    await asyncio.sleep(0)
+
+    assert result == 0.0
+    assert cancelled == [1.0]
+    assert metrics.counter("hedge.issued", key="k") == 1
+    assert metrics.counter("hedge.wins", key="k") == 1
+
+
+@pytest.mark.asyncio
+async def test_primary_result_kept_when_it_finishes_first():
+    metrics = MetricsRegistry()
+    hedger = HedgedCaller(default_delay=0.01, metrics=metrics)
+    delays = [0.03, 1.0]
+
+    async def call():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    assert await hedger.call("k", call) == 0.03
+    assert metrics.counter("hedge.issued", key="k") == 1
+    assert metrics.counter("hedge.wins", key="k") == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_falls_back_to_hedge():
+    hedger = HedgedCaller(default_delay=0.01)
+    outcomes = ["fail", "ok"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if outcome == "fail":
+            await asyncio.sleep(0.02)
+            raise RuntimeError("timeout")
+        await asyncio.sleep(0.05)
+        return outcome
+
+    assert await hedger.call("k", call) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_error_is_raised_when_all_attempts_fail():
+    hedger = HedgedCaller(default_delay=0.5)
+
+    async def call():
+        raise RuntimeError("503")
+
+    with pytest.raises(RuntimeError, match="503"):
+        await hedger.call("k", call)
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_uses_observed_percentile():
+    hedger = HedgedCaller(percentile=50, min_samples=3, default_delay=9.0)
+    for latency in (0.1, 0.2, 0.3):
+        hedger.tracker.record("k", latency)
+
+    assert hedger.hedge_delay("k") == pytest.approx(0.2)
+    assert hedger.hedge_delay("other") == 9.0
+
+
+@pytest.mark.asyncio
+async def test_hedge_win_records_latency_from_the_primary_start():
+    hedger = HedgedCaller(default_delay=0.02)
+    delays = [1.0, 0.02]
+
+    async def call():
+        await asyncio.sleep(delays.pop(0))
+
+    await hedger.call("k", call)
+
+    # Hedge delay + hedge latency, not the hedge's own 0.02s
+    assert hedger.tracker.percentile("k", 50) >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_failed_and_cancelled_calls_are_recorded():
+    hedger = HedgedCaller(default_delay=0.5)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("503")
+
+    with pytest.raises(RuntimeError):
+        await hedger.call("k", fail)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(hedger.call("k", lambda: asyncio.sleep(1.0)), 0.02)
+
+    samples = sorted(hedger.tracker._samples["k"])
+    assert len(samples) == 2
+    assert samples[0] >= 0.01 and samples[1] >= 0.02
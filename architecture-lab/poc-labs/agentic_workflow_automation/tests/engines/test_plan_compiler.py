@@ -0,0 +1,127 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from automation_app.engines.exceptions import PlanValidationError
+from automation_app.engines.plan_compiler import PlanCompiler
+from automation_app.models.action import Action
+from automation_app.models.plan import Plan
+
+
+class AsyncAdapter:
+    def __init__(self):
+        self.calls = 0
+
+    def supported_actions(self):
+        self.calls += 1
+        return {"create_time_off", "get_pto_balance"}
+
+    def idempotent_reads(self):
+        return {"get_pto_balance"}
+
+    async def execute(self, method, params):
+        return {"method": method, **params}
+
+
+class SyncAdapter:
+    def supported_actions(self):
+        return {"send_email"}
+
+    def execute(self, method, params):
+        return {"sent": params["to"]}
+
+
+def _plan(*actions):
+    return Plan(actions=[Action(adapter=a, method=m, params=p) for a, m, p in actions])
+
+
+@pytest.mark.asyncio
+async def test_compile_binds_each_action():
+    adapters = {"Workday": AsyncAdapter(), "MSGraph": SyncAdapter()}
+    plan = _plan(
+        ("Workday", "get_pto_balance", {"user_id": "u1"}),
+        ("MSGraph", "send_email", {"to": "a@b.c"}),
+    )
+
+    bindings = PlanCompiler().compile(plan, adapters)
+
+    assert [b.adapter for b in bindings] == [adapters["Workday"], adapters["MSGraph"]]
+    assert [b.idempotent_read for b in bindings] == [True, False]
+    assert [b.key for b in bindings] == ["Workday.get_pto_balance", "MSGraph.send_email"]
+    assert await bindings[0].call({"user_id": "u1"}) == {"method": "get_pto_balance", "user_id": "u1"}
+    assert await bindings[1].call({"to": "a@b.c"}) == {"sent": "a@b.c"}
+
+
+@pytest.mark.asyncio
+async def test_execute_async_is_preferred():
+    adapter = MagicMock()
+    adapter.supported_actions.return_value = {"send_email"}
+
+    async def execute_async(method, params):
+        return "async"
+
+    adapter.execute_async = execute_async
+
+    [binding] = PlanCompiler().compile(_plan(("MSGraph", "send_email", {})), {"MSGraph": adapter})
+
+    assert await binding.call({}) == "async"
+    adapter.execute.assert_not_called()
+
+
+def test_bindings_and_capabilities_are_resolved_once():
+    adapter = AsyncAdapter()
+    compiler = PlanCompiler()
+    plan = _plan(
+        ("Workday", "create_time_off", {"user_id": "u1"}),
+        ("Workday", "create_time_off", {"user_id": "u2"}),
+    )
+
+    first = compiler.compile(plan, {"Workday": adapter})
+    second = compiler.compile(plan, {"Workday": adapter})
+
+    assert first[0] is first[1] is second[0]
+    assert adapter.calls == 1
+
+
+def test_replaced_adapter_is_rebound():
+    compiler = PlanCompiler()
+    plan = _plan(("Workday", "create_time_off", {}))
+    old, new = AsyncAdapter(), AsyncAdapter()
+
+    compiler.compile(plan, {"Workday": old})
+    [binding] = compiler.compile(plan, {"Workday": new})
+
+    assert binding.adapter is new
+
+
+def test_missing_adapter_is_rejected_with_its_step():
+    plan = _plan(
+        ("Workday", "create_time_off", {}),
+        ("Jira", "create_issue", {}),
+    )
+
+    with pytest.raises(PlanValidationError, match="No adapter found for Jira") as exc_info:
+        PlanCompiler().compile(plan, {"Workday": AsyncAdapter()})
+
+    assert exc_info.value.step_idx == 1
+    assert exc_info.value.action == plan.actions[1]
+
+
+def test_unsupported_action_is_rejected():
+    plan = _plan(("Workday", "delete_worker", {}))
+
+    with pytest.raises(PlanValidationError, match="Action 'delete_worker' not supported by adapter 'Workday'"):
+        PlanCompiler().compile(plan, {"Workday": AsyncAdapter()})
+
+
+def test_predicates_override_adapter_declarations():
+    plan = _plan(("Workday", "delete_worker", {}))
+
+    [binding] = PlanCompiler().compile(
+        plan,
+        {"Workday": AsyncAdapter()},
+        supports=lambda adapter, method: True,
+        is_idempotent_read=lambda adapter, method: True,
+    )
+
+    assert binding.idempotent_read is True
@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from automation_app.engines.prefetch_cache import PrefetchCache
+from automation_app.models.action import Action
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _read(method="get_pto_balance"):
+    return Action(adapter="Workday", method=method, params={"user_id": "u1"})
+
+
+async def _settle(cache, proposal_id):
+    await asyncio.gather(*(e["task"] for e in cache._entries[proposal_id].values()))
+    await asyncio.sleep(0)  # let done callbacks record completion times
+
+
+def _cache(clock=None, **kwargs):
+    ttls = {"*": 10.0, "Workday.get_pto_balance": 60.0}
+    return PrefetchCache(ttls=ttls, clock=clock or FakeClock(), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_fresh_result_is_reused():
+    cache = _cache()
+
+    async def fetch():
+        return {"balance_days": 12.5}
+
+    assert cache.start("p1", _read(), fetch) is True
+    assert await cache.take("p1", _read()) == (True, {"balance_days": 12.5})
+    assert cache.metrics.counter("prefetch.hits", key="Workday.get_pto_balance") == 1
+
+
+@pytest.mark.asyncio
+async def test_same_action_is_only_prefetched_once():
+    cache = _cache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+
+    assert cache.start("p1", _read(), fetch) is True
+    assert cache.start("p1", _read(), fetch) is False
+    await cache.take("p1", _read())
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_result_uses_per_method_ttl():
+    clock = FakeClock()
+    cache = _cache(clock)
+
+    async def fetch():
+        return "ok"
+
+    cache.start("p1", _read(), fetch)
+    cache.start("p1", _read("other_read"), fetch)
+    await _settle(cache, "p1")
+
+    clock.now = 30.0
+    assert await cache.take("p1", _read()) == (True, "ok")
+    assert await cache.take("p1", _read("other_read")) == (False, None)
+    assert cache.metrics.counter("prefetch.misses", key="Workday.other_read", reason="stale") == 1
+
+
+@pytest.mark.asyncio
+async def test_in_flight_read_is_awaited_not_reissued():
+    cache = _cache()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "late"
+
+    cache.start("p1", _read(), fetch)
+    waiter = asyncio.ensure_future(cache.take("p1", _read()))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    release.set()
+    assert await waiter == (True, "late")
+
+
+@pytest.mark.asyncio
+async def test_pending_read_times_out_as_miss():
+    cache = _cache()
+
+    async def fetch():
+        await asyncio.sleep(10)
+
+    cache.start("p1", _read(), fetch)
+    assert await cache.take("p1", _read(), timeout=0.01) == (False, None)
+    cache.discard("p1")
+
+
+@pytest.mark.asyncio
+async def test_failed_read_is_a_miss():
+    cache = _cache()
+
+    async def fetch():
+        raise RuntimeError("workday down")
+
+    cache.start("p1", _read(), fetch)
+    assert await cache.take("p1", _read()) == (False, None)
+    assert cache.metrics.counter("prefetch.misses", key="Workday.get_pto_balance", reason="failed") == 1
+
+
+@pytest.mark.asyncio
+async def test_discard_cancels_in_flight_reads():
+    cache = _cache()
+
+    async def fetch():
+        await asyncio.sleep(10)
+
+    cache.start("p1", _read(), fetch)
+    task = cache._entries["p1"][_read().key()]["task"]
+
+    cache.discard("p1")
+    await asyncio.sleep(0)
+
+    assert task.cancelled()
+    assert await cache.take("p1", _read()) == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_oldest_proposals_are_evicted():
+    cache = _cache(max_proposals=2)
+
+    async def fetch():
+        return "ok"
+
+    for proposal_id in ("p1", "p2", "p3"):
+        cache.start(proposal_id, _read(), fetch)
+
+    assert list(cache._entries) == ["p2", "p3"]
+
+
+@pytest.mark.asyncio
+async def test_take_without_proposal_is_a_miss():
+    assert await _cache().take(None, _read()) == (False, None)
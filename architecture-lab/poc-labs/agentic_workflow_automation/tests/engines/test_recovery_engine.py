@@ -1,8 +1,12 @@
 import pytest
 import asyncio
+import time
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from automation_app.config.constants import RecoveryDecision
+from automation_app.config.constants import CircuitState, RecoveryDecision
+from automation_app.engines.circuit_breaker import CircuitBreakerRegistry
+from automation_app.engines.exceptions import ActionFailure, CircuitOpenError, DeadlineExceededError, RetryDeferred
 from automation_app.engines.recovery_engine import RecoveryEngine
 
 @pytest.fixture
@@ -159,3 +163,324 @@ def test_backoff_calculation():
     assert engine._backoff(1) == 0.5
     assert engine._backoff(2) == 1.0
     assert engine._backoff(3) == 2.0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_calling_adapter():
+
+    auditor = MagicMock()
+    breakers = CircuitBreakerRegistry({"*": {"failure_threshold": 1}}, auditor=auditor)
+    engine = RecoveryEngine(auditor=auditor, max_retries=3, breakers=breakers)
+    action = SimpleNamespace(adapter="Workday", method="create_time_off")
+
+    execute_fn = AsyncMock(side_effect=Exception("503 service unavailable"))
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(ActionFailure) as exc_info:
+            await engine.attempt_with_recovery(
+                execute_fn=execute_fn,
+                action=action,
+                session_id="s1",
+                step_idx=0,
+            )
+
+    # First failure opens the breaker, the retry is short-circuited
+    assert execute_fn.await_count == 1
+    assert exc_info.value.decision == RecoveryDecision.CIRCUIT_OPEN
+    assert isinstance(exc_info.value.original, CircuitOpenError)
+    auditor.log.assert_any_call("s1", "CIRCUIT_OPEN", {"adapter": "Workday", "step": 0, "attempt": 2})
+
+
+@pytest.mark.asyncio
+async def test_non_transient_errors_do_not_trip_breaker():
+
+    breakers = CircuitBreakerRegistry({"*": {"failure_threshold": 1}}, auditor=MagicMock())
+    engine = RecoveryEngine(auditor=MagicMock(), breakers=breakers)
+    action = SimpleNamespace(adapter="Workday", method="create_time_off")
+
+    with pytest.raises(Exception):
+        await engine.attempt_with_recovery(
+            execute_fn=AsyncMock(side_effect=Exception("permission denied")),
+            action=action,
+            session_id="s1",
+            step_idx=0,
+        )
+
+    assert breakers.get("Workday").state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_non_transient_errors_neither_reset_nor_close_breaker():
+    clock = [0.0]
+    breakers = CircuitBreakerRegistry(
+        {"*": {"failure_threshold": 2, "reset_timeout": 1.0, "clock": lambda: clock[0]}},
+        auditor=MagicMock(),
+    )
+    engine = RecoveryEngine(auditor=MagicMock(), max_retries=1, breakers=breakers)
+    action = SimpleNamespace(adapter="Workday", method="create_time_off")
+    breaker = breakers.get("Workday")
+
+    async def attempt(error):
+        with pytest.raises(ActionFailure):
+            await engine.attempt_with_recovery(
+                execute_fn=AsyncMock(side_effect=Exception(error)),
+                action=action,
+                session_id="s1",
+                step_idx=0,
+            )
+
+    await attempt("connection timeout")
+    await attempt("permission denied")
+    assert breaker._failures == 1
+
+    await attempt("connection timeout")
+    clock[0] = 2.0
+    await attempt("permission denied")
+    # The probe slot is freed, but the breaker stays half-open
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_exhausted_retry_budget_fails_fast():
+    auditor = MagicMock()
+    budgets = MagicMock()
+    budgets.try_spend.return_value = False
+    engine = RecoveryEngine(auditor=auditor, max_retries=3, budgets=budgets)
+    action = SimpleNamespace(adapter="MSGraph", method="send_email")
+
+    execute_fn = AsyncMock(side_effect=Exception("rate limit exceeded"))
+
+    with patch("asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        with pytest.raises(ActionFailure) as exc_info:
+            await engine.attempt_with_recovery(
+                execute_fn=execute_fn,
+                action=action,
+                session_id="s1",
+                step_idx=0,
+            )
+
+    assert exc_info.value.decision == RecoveryDecision.RETRY_BUDGET_EXHAUSTED
+    execute_fn.assert_awaited_once()
+    mock_sleep.assert_not_awaited()
+    budgets.try_spend.assert_called_once_with("MSGraph")
+    auditor.log.assert_any_call(
+        "s1", "RETRY_BUDGET_EXHAUSTED", {"adapter": "MSGraph", "step": 0, "attempt": 1}
+    )
+
+
+@pytest.mark.asyncio
+async def test_success_deposits_into_retry_budget():
+    budgets = MagicMock()
+    engine = RecoveryEngine(auditor=MagicMock(), budgets=budgets)
+    action = SimpleNamespace(adapter="Workday", method="create_time_off")
+
+    await engine.attempt_with_recovery(
+        execute_fn=AsyncMock(return_value="OK"),
+        action=action,
+        session_id="s1",
+        step_idx=0,
+    )
+
+    budgets.record_success.assert_called_once_with("Workday")
+
+
+def test_full_jitter_stays_within_exponential_ceiling():
+    engine = RecoveryEngine(base_backoff=0.5, jitter="full", max_backoff=1.5)
+
+    delays = [engine._retry_delay(3, 0.5) for _ in range(200)]
+
+    assert all(0 <= d <= 1.5 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_decorrelated_jitter_grows_from_previous_delay():
+    engine = RecoveryEngine(base_backoff=0.5, jitter="decorrelated", max_backoff=100)
+
+    delays = [engine._retry_delay(2, 2.0) for _ in range(200)]
+
+    assert all(0.5 <= d <= 6.0 for d in delays)
+
+
+def test_no_jitter_uses_capped_exponential():
+    engine = RecoveryEngine(base_backoff=0.5, jitter="none", max_backoff=1.0)
+
+    assert engine._retry_delay(1, 0.5) == 0.5
+    assert engine._retry_delay(4, 0.5) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_trace_only_rendered_for_surfaced_failure():
+    auditor = MagicMock()
+    engine = RecoveryEngine(auditor=auditor, max_retries=2, trace_sample_rate=0.0)
+
+    execute_fn = AsyncMock(side_effect=Exception("timeout"))
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        with pytest.raises(ActionFailure):
+            await engine.attempt_with_recovery(
+                execute_fn=execute_fn,
+                action=None,
+                session_id="s1",
+                step_idx=0,
+            )
+
+    first, second = [c.args[2] for c in auditor.log.call_args_list]
+    assert first["trace"] is None
+    assert "Exception: timeout" in second["trace"]
+
+
+def test_trace_sampling_for_retried_attempts():
+    engine = RecoveryEngine(trace_sample_rate=1.0)
+
+    assert engine._trace(Exception("timeout"), terminal=False) is not None
+
+
+def test_classify_error_delegates_to_classifier():
+    classifier = MagicMock()
+    classifier.classify.return_value = RecoveryDecision.PERMISSION
+    engine = RecoveryEngine(classifier=classifier)
+
+    exc = Exception("anything")
+
+    assert engine._classify_error(exc) == RecoveryDecision.PERMISSION
+    classifier.classify.assert_called_once_with(exc)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_policy_drives_retry_count_and_learns():
+    policy = MagicMock()
+    policy.policy_for.return_value = SimpleNamespace(max_retries=5, base_backoff=0.01)
+    budgets = MagicMock()
+    budgets.try_spend.return_value = True
+    engine = RecoveryEngine(auditor=MagicMock(), max_retries=2, policy=policy, budgets=budgets)
+    action = SimpleNamespace(adapter="Workday", method="create_time_off")
+
+    execute_fn = AsyncMock(side_effect=[Exception("timeout")] * 4 + ["OK"])
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        result = await engine.attempt_with_recovery(
+            execute_fn=execute_fn,
+            action=action,
+            session_id="s1",
+            step_idx=0,
+        )
+
+    assert result == "OK"
+    assert execute_fn.await_count == 5
+    policy.policy_for.assert_called_once_with("Workday", "create_time_off")
+    assert policy.record.call_count == 5
+    assert policy.record.call_args.kwargs == {"failed": False, "transient": False}
+
+
+def test_current_policies_without_adaptive_policy():
+    assert RecoveryEngine().current_policies() == {}
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_in_flight_call():
+    auditor = MagicMock()
+    engine = RecoveryEngine(auditor=auditor)
+    action = SimpleNamespace(adapter="Workday", method="create_time_off")
+    cancelled = asyncio.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(ActionFailure) as exc:
+        await engine.attempt_with_recovery(
+            execute_fn=hang,
+            action=action,
+            session_id="s1",
+            step_idx=2,
+            deadline=time.monotonic() + 0.05,
+        )
+
+    assert exc.value.decision == RecoveryDecision.DEADLINE_EXCEEDED
+    assert isinstance(exc.value.original, DeadlineExceededError)
+    assert cancelled.is_set()
+    auditor.log.assert_called_once_with(
+        "s1", "DEADLINE_EXCEEDED", {"adapter": "Workday", "step": 2, "attempt": 1}
+    )
+    # The attempt was abandoned, not failed: breaker stays closed and unburdened
+    assert engine.breakers.get("Workday")._failures == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_skips_call():
+    engine = RecoveryEngine(auditor=MagicMock())
+    execute_fn = AsyncMock(return_value="OK")
+
+    with pytest.raises(ActionFailure) as exc:
+        await engine.attempt_with_recovery(
+            execute_fn=execute_fn,
+            action=None,
+            session_id="s1",
+            step_idx=0,
+            deadline=time.monotonic() - 1,
+        )
+
+    assert exc.value.decision == RecoveryDecision.DEADLINE_EXCEEDED
+    execute_fn.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_backoff_past_deadline_is_not_started():
+    engine = RecoveryEngine(auditor=MagicMock(), base_backoff=5.0, jitter="none")
+    execute_fn = AsyncMock(side_effect=Exception("timeout"))
+
+    with patch("asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        with pytest.raises(ActionFailure) as exc:
+            await engine.attempt_with_recovery(
+                execute_fn=execute_fn,
+                action=None,
+                session_id="s1",
+                step_idx=0,
+                deadline=time.monotonic() + 1.0,
+            )
+
+    assert exc.value.decision == RecoveryDecision.DEADLINE_EXCEEDED
+    execute_fn.assert_awaited_once()
+    mock_sleep.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_adapter_timeout_within_deadline_is_retried():
+    engine = RecoveryEngine(auditor=MagicMock())
+    execute_fn = AsyncMock(side_effect=[asyncio.TimeoutError(), "OK"])
+
+    with patch("asyncio.sleep", new=AsyncMock()):
+        result = await engine.attempt_with_recovery(
+            execute_fn=execute_fn,
+            action=None,
+            session_id="s1",
+            step_idx=0,
+            deadline=time.monotonic() + 60,
+        )
+
+    assert result == "OK"
+
+
+@pytest.mark.asyncio
+async def test_deferred_retry_raises_instead_of_sleeping_and_resumes():
+    engine = RecoveryEngine(auditor=MagicMock(), max_retries=3, base_backoff=0.5, jitter="none")
+    action = SimpleNamespace(adapter="Workday", method="create_time_off")
+    execute_fn = AsyncMock(side_effect=[Exception("connection timeout"), "OK"])
+
+    with patch("automation_app.engines.recovery_engine.asyncio.sleep") as sleep:
+        with pytest.raises(RetryDeferred) as deferred:
+            await engine.attempt_with_recovery(
+                execute_fn=execute_fn, action=action, session_id="s1", step_idx=0, defer=True
+            )
+        sleep.assert_not_called()
+
+    assert (deferred.value.attempt, deferred.value.delay) == (2, 0.5)
+    result = await engine.attempt_with_recovery(
+        execute_fn=execute_fn, action=action, session_id="s1", step_idx=0, defer=True, resume=deferred.value
+    )
+    assert result == "OK"
+    assert execute_fn.await_count == 2
@@ -0,0 +1,92 @@
+import pytest
+
+from automation_app.engines.retry_budget import RetryBudget, RetryBudgets
+from automation_app.utils.metrics import MetricsRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_budget_without_reserve_requires_successes():
+    budget = RetryBudget("Workday", retry_ratio=0.5, min_retries_per_second=0)
+
+    assert budget.try_withdraw() is False
+
+    budget.deposit()
+    budget.deposit()
+
+    assert budget.try_withdraw() is True
+    assert budget.try_withdraw() is False
+    assert budget.snapshot() == {"balance": 0.0, "spent": 1, "rejected": 2}
+
+
+def test_budget_reserve_allows_low_traffic_retries():
+    clock = FakeClock()
+    budget = RetryBudget("Workday", retry_ratio=0.1, min_retries_per_second=1.0, clock=clock)
+
+    assert budget.try_withdraw() is True
+    assert budget.try_withdraw() is False
+
+    clock.now = 1.0
+    assert budget.try_withdraw() is True
+
+
+def test_budget_balance_is_capped():
+    budget = RetryBudget("Workday", retry_ratio=1.0, max_balance=2.0, min_retries_per_second=0)
+
+    for _ in range(10):
+        budget.deposit()
+
+    assert budget.balance == 2.0
+
+
+def test_budgets_require_both_global_and_adapter_allowance():
+    metrics = MetricsRegistry()
+    budgets = RetryBudgets(
+        {
+            "global": {"retry_ratio": 1.0, "min_retries_per_second": 0},
+            "*": {"retry_ratio": 1.0, "min_retries_per_second": 0},
+        },
+        metrics=metrics,
+    )
+
+    budgets.record_success("Workday")
+
+    assert budgets.try_spend("Workday") is True
+    # Global budget has been used up by Workday
+    assert budgets.try_spend("MSGraph") is False
+    assert metrics.counter("retry_budget.spent", scope="Workday") == 1
+    assert metrics.counter("retry_budget.exhausted", scope="MSGraph") == 1
+
+
+def test_budgets_refund_adapter_when_global_is_exhausted():
+    budgets = RetryBudgets({
+        "global": {"retry_ratio": 1.0, "min_retries_per_second": 0},
+        "*": {"retry_ratio": 1.0, "min_retries_per_second": 0},
+    })
+    budgets.record_success("Workday")
+    budgets.global_budget.balance = 0
+
+    assert budgets.try_spend("Workday") is False
+
+    snapshot = budgets.snapshot()
+    assert snapshot["Workday"]["balance"] == 1.0
+    assert snapshot["Workday"]["spent"] == 0
+
+
+def test_refund_returns_a_reserve_token_to_the_reserve():
+    clock = FakeClock()
+    budget = RetryBudget("Workday", retry_ratio=0.1, min_retries_per_second=1.0, clock=clock)
+
+    assert budget.try_withdraw() is True
+    budget.refund()
+
+    assert budget.balance == 0.0
+    assert budget.snapshot()["spent"] == 0
+    assert budget.try_withdraw() is True
+    assert budget.try_withdraw() is False
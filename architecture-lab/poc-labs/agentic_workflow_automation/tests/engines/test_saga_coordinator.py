@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from automation_app.engines.saga_coordinator import AdapterSagaStep, SagaCoordinator
+from automation_app.models.action import Action
+from automation_app.models.executed_step import ExecutedStep
+from automation_app.utils.saga_step import SagaStep
+
+
+def _step(index, adapter, method="create", depends_on=()):
+    return AdapterSagaStep(index, Action(adapter="A", method=method, params={"i": index}), adapter, depends_on)
+
+
+@pytest.mark.asyncio
+async def test_compensate_receives_execute_result():
+    adapter = MagicMock()
+    adapter.compensate_async = AsyncMock()
+    state = {0: ExecutedStep("A", "create", {"i": 0}, {"request_id": "WD123"})}
+
+    assert await SagaCoordinator().compensate([_step(0, adapter)], state) is True
+
+    adapter.compensate_async.assert_awaited_once_with("create", {"i": 0}, {"request_id": "WD123"})
+
+
+def test_adapter_step_is_a_saga_step_whose_execute_returns_the_record():
+    step = _step(0, MagicMock())
+    state = {0: ExecutedStep("A", "create", {"i": 0}, {"request_id": "WD123"})}
+
+    assert isinstance(step, SagaStep)
+    assert step.execute(state) is state[0]
+    assert step.execute({}) is None
+
+
+@pytest.mark.asyncio
+async def test_any_saga_step_can_be_compensated():
+    class Step(SagaStep):
+        index = 0
+        compensated = None
+
+        def execute(self, state):
+            return state.get(self.index)
+
+        def compensate(self, state):
+            self.compensated = self.execute(state)
+
+    step = Step()
+    coordinator = SagaCoordinator()
+
+    assert await coordinator.compensate([step], {0: "done"}) is True
+    assert step.compensated == "done"
+    assert coordinator.metrics.counter("saga.compensations", key="Step", result="compensated") == 1
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_are_compensated_concurrently():
+    in_flight = 0
+    peak = 0
+
+    async def compensate(method, params, result):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    adapter = MagicMock(compensate_async=compensate)
+    steps = [_step(i, adapter) for i in range(3)]
+
+    assert await SagaCoordinator().compensate(steps, {}) is True
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_dependent_steps_wait_for_their_dependents():
+    order = []
+
+    async def compensate(method, params, result):
+        order.append(params["i"])
+        await asyncio.sleep(0)
+
+    adapter = MagicMock(compensate_async=compensate)
+    steps = [_step(0, adapter), _step(1, adapter, depends_on=(0,)), _step(2, adapter, depends_on=(1,))]
+
+    await SagaCoordinator().compensate(steps, {})
+
+    assert order == [2, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_compensation_retries_are_bounded():
+    adapter = MagicMock()
+    adapter.compensate_async = AsyncMock(side_effect=RuntimeError("down"))
+    on_result = MagicMock()
+    coordinator = SagaCoordinator(max_attempts=3, backoff=0)
+
+    assert await coordinator.compensate([_step(0, adapter)], {}, on_result=on_result) is False
+
+    assert adapter.compensate_async.await_count == 3
+    step, exc, attempts = on_result.call_args.args
+    assert isinstance(exc, RuntimeError)
+    assert attempts == 3
+    assert coordinator.metrics.counter("saga.compensations", key="A.create", result="failed") == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_compensation_failure_recovers():
+    adapter = MagicMock()
+    adapter.compensate_async = AsyncMock(side_effect=[RuntimeError("blip"), None])
+    on_result = MagicMock()
+
+    assert await SagaCoordinator(backoff=0).compensate([_step(0, adapter)], {}, on_result=on_result) is True
+    assert on_result.call_args.args[1:] == (None, 2)
+
+
+@pytest.mark.asyncio
+async def test_failed_dependent_does_not_block_earlier_steps():
+    failing = MagicMock()
+    failing.compensate_async = AsyncMock(side_effect=RuntimeError("down"))
+    ok = MagicMock()
+    ok.compensate_async = AsyncMock()
+
+    steps = [_step(0, ok), _step(1, failing, depends_on=(0,))]
+    assert await SagaCoordinator(max_attempts=1).compensate(steps, {}) is False
+
+    ok.compensate_async.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_sync_compensate_is_supported():
+    adapter = MagicMock(spec=["compensate"])
+
+    assert await SagaCoordinator().compensate([_step(0, adapter)], {}) is True
+    adapter.compensate.assert_called_once_with("create", {"i": 0}, None)
@@ -110,6 +110,22 @@ async def test_repair_plan_permission_inserts_approval(sample_plan):
     # The failing action should now be at index 2
     assert new_plan.actions[2] == failed_action
 
+@pytest.mark.asyncio
+async def test_inserted_approval_shifts_declared_dependencies():
+    plan = Plan(actions=[
+        Action(adapter="Workday", method="create_time_off", params={}, depends_on=()),
+        Action(adapter="MSGraph", method="send_email", params={}, depends_on=(0,)),
+        Action(adapter="MSGraph", method="create_calendar_event", params={}, depends_on=(1,)),
+    ])
+
+    new_plan = await TaskPlanner().repair_plan(
+        failed_plan=plan,
+        failed_action=plan.actions[1],
+        decision=RecoveryDecision.PERMISSION,
+    )
+
+    assert [action.depends_on for action in new_plan.actions] == [(), None, (0,), (2,)]
+
 @pytest.mark.asyncio
 async def test_repair_plan_unrecoverable_returns_none(sample_plan):
     planner = TaskPlanner()
@@ -1,8 +1,12 @@
 # tests/models/test_action.py
 
+import json
+
 import pytest
+from unittest.mock import MagicMock
 from pydantic import ValidationError
 
+from automation_app.audit.audit_logger import json_default
 from automation_app.models.action import Action
 
 
@@ -65,7 +69,81 @@ def test_action_serialization_round_trip():
     assert action.model_dump() == data
 
 
+def test_declared_dependencies_are_serialized():
+    action = Action(adapter="Workday", method="create_time_off", params={}, depends_on=[0])
+
+    assert action.depends_on == (0,)
+    assert action.model_dump()["depends_on"] == (0,)
+    assert Action(**action.model_dump(mode="json")) == action
+
+
 def test_action_equality():
     a = Action(adapter="Workday", method="get_employee", params={"x": 1})
     b = Action(adapter="Workday", method="get_employee", params={"x": 1})
     assert a == b
+
+
+def test_action_is_frozen():
+    action = Action(adapter="Workday", method="get_employee", params={})
+    with pytest.raises(ValidationError):
+        action.method = "other"
+
+
+def test_action_hash_uses_canonical_params():
+    a = Action(adapter="Workday", method="get_employee", params={"x": 1, "y": 2})
+    b = Action(adapter="Workday", method="get_employee", params={"y": 2, "x": 1})
+    c = Action(adapter="Workday", method="get_employee", params={"x": "1", "y": 2})
+    assert hash(a) == hash(b)
+    assert len({a, b, c}) == 2
+
+
+def test_action_scrubbed_params_computed_once_per_scrubber_config():
+    action = Action(adapter="Workday", method="get_employee", params={"x": 1})
+    scrubber = MagicMock(cache_key="default")
+    scrubber.scrub_data.return_value = {"x": "***"}
+
+    assert action.scrubbed_params(scrubber) == {"x": "***"}
+    assert action.scrubbed_params(scrubber) == {"x": "***"}
+    scrubber.scrub_data.assert_called_once_with({"x": 1})
+
+    other = MagicMock(cache_key="redacted")
+    other.scrub_data.return_value = {"x": "[REDACTED]"}
+    assert action.scrubbed_params(other) == {"x": "[REDACTED]"}
+
+
+def test_action_scrubbed_params_fall_back_to_the_scrubber_identity():
+    action = Action(adapter="Workday", method="get_employee", params={"x": 1})
+    first, second = MagicMock(spec=["scrub_data"]), MagicMock(spec=["scrub_data"])
+    first.scrub_data.return_value = {"x": "***"}
+    second.scrub_data.return_value = {"x": "[REDACTED]"}
+
+    assert action.scrubbed_params(first) == {"x": "***"}
+    assert action.scrubbed_params(second) == {"x": "[REDACTED]"}
+    assert action.scrubbed_params(first) == {"x": "***"}
+    first.scrub_data.assert_called_once()
+
+
+def test_action_scrubbed_params_are_read_only():
+    action = Action(adapter="Workday", method="get_employee", params={"x": 1})
+    scrubber = MagicMock(cache_key="default")
+    scrubber.scrub_data.return_value = {"x": "***", "nested": {"y": "***"}, "items": [{"z": "***"}]}
+    scrubbed = action.scrubbed_params(scrubber)
+
+    with pytest.raises(TypeError):
+        scrubbed["x"] = "leak"
+    with pytest.raises(TypeError):
+        scrubbed["nested"]["y"] = "leak"
+    with pytest.raises(TypeError):
+        scrubbed["items"][0]["z"] = "leak"
+    assert json.loads(json.dumps({"params": scrubbed}, default=json_default)) == {
+        "params": {"x": "***", "nested": {"y": "***"}, "items": [{"z": "***"}]}
+    }
+
+
+def test_action_equality_ignores_cached_views():
+    a = Action(adapter="Workday", method="get_employee", params={"x": 1})
+    b = Action(adapter="Workday", method="get_employee", params={"x": 1})
+    scrubber = MagicMock(cache_key="default")
+    scrubber.scrub_data.return_value = {}
+    a.scrubbed_params(scrubber)
+    assert a == b
@@ -98,3 +98,13 @@ def test_plan_equality():
     b = Plan(actions=[Action(adapter="A", method="m", params={})])
 
     assert a == b
+
+
+def test_plan_content_hash_is_stable_and_content_based():
+    a = Plan(actions=[Action(adapter="A", method="m", params={"x": 1, "y": 2})])
+    b = Plan(actions=[Action(adapter="A", method="m", params={"y": 2, "x": 1})])
+    c = Plan(actions=[Action(adapter="A", method="m", params={"x": 2, "y": 2})])
+
+    assert a.content_hash() == b.content_hash()
+    assert a.content_hash() != c.content_hash()
+    assert len(a.content_hash()) == 64
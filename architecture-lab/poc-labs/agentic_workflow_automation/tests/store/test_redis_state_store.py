@@ -0,0 +1,186 @@
+import asyncio
+import shutil
+import socket
+import subprocess
+import time
+
+import pytest
+import pytest_asyncio
+from redis.asyncio import Redis
+
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.redis_state_store import RedisStateStore
+
+try:
+    import fakeredis
+except ImportError:  # optional: only needed where redis-server is not installed
+    fakeredis = None
+
+
+@pytest.fixture(scope="module")
+def connect():
+    """
+    Client factory for a local redis-server when installed, else an
+    in-process fakeredis server (`pip install "fakeredis[lua]"`) so the
+    suite still runs in CI.
+    """
+    if shutil.which("redis-server") is None:
+        if fakeredis is None:
+            pytest.skip("neither redis-server nor fakeredis installed")
+        server = fakeredis.FakeServer()
+        yield lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        return
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen(
+        ["redis-server", "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 5
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                server.kill()
+                raise
+            time.sleep(0.05)
+
+    yield lambda: Redis.from_url(f"redis://127.0.0.1:{port}/0", decode_responses=True)
+    server.terminate()
+    server.wait()
+
+
+@pytest.fixture
+def make_store(connect):
+    async def make(**kwargs):
+        client = connect()
+        await client.flushdb()
+        return RedisStateStore(client=client, **kwargs)
+
+    return make
+
+
+@pytest_asyncio.fixture
+async def store(make_store):
+    return await make_store()
+
+
+@pytest.mark.asyncio
+async def test_update_merges_fields_and_keeps_state(store):
+    await store.save_context("s1", {"last_plan": {"actions": []}}, state=WorkflowState.PROPOSED, timestamp=5)
+
+    assert await store.update_context("s1", {"plan_hash": "h1"})
+    assert not await store.update_context("missing", {"plan_hash": "h1"})
+    assert await store.find_context("missing") is None
+
+    assert await store.get_context("s1") == {
+        "state": WorkflowState.PROPOSED,
+        "data": {"last_plan": {"actions": []}, "plan_hash": "h1"},
+        "timestamp": 5.0,
+    }
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_compare_and_set_only_applies_from_the_expected_state(store):
+    await store.save_context("s1", {"a": 1})
+
+    assert not await store.update_if_state_matches("s1", WorkflowState.EXECUTING, WorkflowState.COMPLETED, {})
+    assert await store.update_if_state_matches("s1", WorkflowState.PROPOSED, WorkflowState.EXECUTING, {"a": 2})
+    assert not await store.update_if_state_matches("missing", WorkflowState.PROPOSED, WorkflowState.EXECUTING, {})
+
+    context = await store.get_context("s1")
+    assert context["state"] == WorkflowState.EXECUTING
+    assert context["data"] == {"a": 2}
+    assert store.metrics.counter("redis_store.cas", result="conflict") == 2
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_compare_and_set_has_one_winner(store):
+    await store.save_context("s1", {})
+
+    results = await asyncio.gather(*(
+        store.update_if_state_matches("s1", WorkflowState.PROPOSED, WorkflowState.CONFIRMED, {"winner": i})
+        for i in range(20)
+    ))
+
+    assert results.count(True) == 1
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_sessions_carry_the_ttl_of_their_state(make_store):
+    store = await make_store(ttls={"*": 100.0, "COMPLETED": 1.0})
+    await store.save_context("s1", {})
+    await store.update_context("s1", {}, state=WorkflowState.COMPLETED)
+
+    assert 0 < await store.client.pttl(store._session_key("s1")) <= 1000
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_pages_and_drops_expired_entries(store):
+    for i in range(5):
+        await store.save_context(f"s{i}", {}, state=WorkflowState.PROPOSED)
+    await store.update_context("s1", {}, state=WorkflowState.REJECTED)
+    await store.client.delete(store._session_key("s3"))  # as if expired by Redis
+
+    first, cursor = await store.list_sessions(WorkflowState.PROPOSED, limit=2)
+    rest, end = await store.list_sessions(WorkflowState.PROPOSED, cursor=cursor, limit=2)
+
+    assert first == ["s0", "s2"]
+    assert rest == ["s4"]
+    assert end is None
+    assert await store.list_sessions(WorkflowState.REJECTED) == (["s1"], None)
+    with pytest.raises(ValueError):
+        await store.list_sessions(WorkflowState.PROPOSED, cursor="bogus")
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_get_all_sessions_scans_every_session(store):
+    for i in range(1200):
+        await store.save_context(f"s{i}", {"i": i})
+    await store.delete_session("s0")
+
+    sessions = await store.get_all_sessions()
+
+    assert len(sessions) == 1199
+    assert sessions["s7"]["data"] == {"i": 7}
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_idempotency_keys_and_plans(store):
+    assert await store.claim_idempotency_key("k1", ttl=60) is None
+    assert (await store.claim_idempotency_key("k1", ttl=60))["status"] == "PENDING"
+    await store.complete_idempotency_key("k1", {"message": "ok"})
+    assert await store.claim_idempotency_key("k1", ttl=60) == {"status": "DONE", "response": {"message": "ok"}}
+    await store.release_idempotency_key("k1")
+    assert await store.claim_idempotency_key("k1", ttl=60) is None
+
+    await store.save_plan("h1", {"actions": [1]})
+    await store.save_plan("h1", {"actions": [2]})
+    assert await store.get_plan("h1") == {"actions": [1]}
+    assert await store.get_plan("missing") is None
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_iter_sessions_reads_each_batch_in_one_pipeline(store):
+    for i in range(5):
+        await store.save_context(f"s{i}", {"i": i})
+    await store.save_context("done", {}, state=WorkflowState.COMPLETED)
+
+    batches = [batch async for batch in store.iter_sessions(state=WorkflowState.PROPOSED, batch_size=2)]
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [context["data"]["i"] for batch in batches for _, context in batch] == list(range(5))
+    assert [len(batch) async for batch in store.iter_sessions()] == [5, 1]
+    await store.close()
@@ -0,0 +1,85 @@
+import pytest
+
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.session_codec import PackedSession, SessionCodec
+from automation_app.store.state_store import StateStore
+
+
+def _session(n=3):
+    return {
+        "last_plan": {
+            "actions": [
+                {"adapter": "Workday", "method": "create_time_off", "params": {"user_id": f"u{i}", "days": [1, 2]}}
+                for i in range(n)
+            ],
+        },
+        "plan_type": "REQUEST_TIME_OFF",
+        "proposal_id": "p-1",
+    }
+
+
+def test_round_trip_restores_session():
+    codec = SessionCodec()
+    data = _session()
+
+    assert codec.decode(codec.encode(data)) == data
+
+
+def test_adapter_and_method_names_are_interned():
+    codec = SessionCodec()
+    codec.encode(_session())
+    codec.encode(_session(10))
+
+    assert codec._names == ["Workday", "create_time_off"]
+
+    first = codec.decode(codec.encode(_session()))["last_plan"]["actions"]
+    second = codec.decode(codec.encode(_session()))["last_plan"]["actions"]
+    assert first[0]["adapter"] is second[0]["adapter"]
+
+
+def test_non_action_shapes_are_left_alone():
+    codec = SessionCodec()
+    data = {"last_plan": {"actions": [{"adapter": "Workday"}]}, "n": 1}
+
+    assert codec.decode(codec.encode(data)) == data
+
+
+def test_packed_session_overlays_partial_updates():
+    packed = SessionCodec().pack(_session())
+    packed.update({"last_action_index": 2})
+
+    data = packed.unpack()
+    assert data["last_action_index"] == 2
+    assert data["proposal_id"] == "p-1"
+
+
+@pytest.mark.asyncio
+async def test_store_holds_packed_data_and_decodes_on_read():
+    store = StateStore(codec=SessionCodec())
+    await store.save_context("s1", _session(), state=WorkflowState.PROPOSED)
+    await store.update_context("s1", {"plan_hash": "h1"})
+
+    assert isinstance(store.storage["s1"]["data"], PackedSession)
+    context = await store.get_context("s1")
+    assert context["state"] == WorkflowState.PROPOSED
+    assert context["data"] == {**_session(), "plan_hash": "h1"}
+
+
+@pytest.mark.asyncio
+async def test_get_all_sessions_decodes_packed_data():
+    store = StateStore(codec=SessionCodec())
+    await store.save_context("s1", _session())
+
+    sessions = await store.get_all_sessions()
+
+    assert sessions["s1"]["data"] == _session()
+    assert isinstance(store.storage["s1"]["data"], PackedSession)
+
+
+@pytest.mark.asyncio
+async def test_store_keeps_unencodable_data_as_dict():
+    store = StateStore(codec=SessionCodec())
+    await store.save_context("s1", {"when": object()})
+
+    assert isinstance(store.storage["s1"]["data"], dict)
+    assert store.metrics.counter("state_store.unpacked_sessions") == 1
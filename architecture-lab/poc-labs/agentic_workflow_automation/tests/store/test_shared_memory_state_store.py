@@ -0,0 +1,110 @@
+import pytest
+
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.shared_memory_state_store import SharedMemoryStateStore
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    def make(**kwargs):
+        kwargs.setdefault("slots", 64)
+        kwargs.setdefault("slot_bytes", 1024)
+        return SharedMemoryStateStore(tmp_path / "sessions", **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store()
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_visible_to_every_store_on_the_table(make_store):
+    worker_a, worker_b = make_store(), make_store()
+
+    await worker_a.save_context("s1", {"last_plan": {"actions": []}}, state=WorkflowState.PROPOSED, timestamp=5)
+    assert await worker_b.update_context("s1", {"plan_hash": "h1"})
+    assert not await worker_b.update_context("missing", {"plan_hash": "h1"})
+
+    assert await worker_a.get_context("s1") == {
+        "state": WorkflowState.PROPOSED,
+        "data": {"last_plan": {"actions": []}, "plan_hash": "h1"},
+        "timestamp": 5,
+    }
+    await worker_a.close()
+    await worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_compare_and_set_has_one_winner_across_stores(make_store):
+    worker_a, worker_b = make_store(), make_store()
+    await worker_a.save_context("s1", {})
+
+    first = await worker_a.update_if_state_matches("s1", WorkflowState.PROPOSED, WorkflowState.CONFIRMED, {"by": "a"})
+    second = await worker_b.update_if_state_matches("s1", WorkflowState.PROPOSED, WorkflowState.CONFIRMED, {"by": "b"})
+
+    assert (first, second) == (True, False)
+    assert (await worker_b.get_context("s1"))["data"] == {"by": "a"}
+    await worker_a.close()
+    await worker_b.close()
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_pages_by_state(store):
+    for i in range(5):
+        await store.save_context(f"s{i}", {}, state=WorkflowState.PROPOSED)
+    await store.update_context("s1", {}, state=WorkflowState.REJECTED)
+    await store.delete_session("s3")
+
+    first, cursor = await store.list_sessions(WorkflowState.PROPOSED, limit=2)
+    rest, end = await store.list_sessions(WorkflowState.PROPOSED, cursor=cursor, limit=10)
+
+    assert sorted(first + rest) == ["s0", "s2", "s4"]
+    assert end is None
+    assert await store.list_sessions(WorkflowState.REJECTED) == (["s1"], None)
+    assert sorted(await store.get_all_sessions()) == ["s0", "s1", "s2", "s4"]
+    with pytest.raises(ValueError):
+        await store.list_sessions(WorkflowState.PROPOSED, cursor="bogus")
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_walks_the_state_index_not_the_table(make_store, monkeypatch):
+    store = make_store(slots=1024)
+    for i in range(200):
+        await store.save_context(f"s{i}", {}, state=WorkflowState.PROPOSED)
+    for i in range(0, 200, 2):
+        await store.update_context(f"s{i}", {}, state=WorkflowState.COMPLETED)
+    monkeypatch.setattr(store.table, "scan", None)
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = await store.list_sessions(WorkflowState.PROPOSED, cursor=cursor, limit=30)
+        pages.append(page)
+        if cursor is None:
+            break
+
+    assert [sid for page in pages for sid in page] == [f"s{i}" for i in range(1, 200, 2)]
+    assert len(pages) == 4
+
+    await store.purge_expired()
+    assert store.metrics.counter("shared_store.stale_index_entries") == 96  # sealed pages only, not the head page
+    assert (await store.list_sessions(WorkflowState.PROPOSED, limit=1000))[0] == [f"s{i}" for i in range(1, 200, 2)]
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_idempotency_keys_and_plans(store):
+    assert await store.claim_idempotency_key("k1", ttl=60) is None
+    assert (await store.claim_idempotency_key("k1", ttl=60))["status"] == "PENDING"
+    await store.complete_idempotency_key("k1", {"message": "ok"})
+    assert await store.claim_idempotency_key("k1", ttl=60) == {"status": "DONE", "response": {"message": "ok"}}
+    await store.release_idempotency_key("k1")
+    assert await store.claim_idempotency_key("k1", ttl=60) is None
+
+    await store.save_plan("h1", {"actions": [1]})
+    await store.save_plan("h1", {"actions": [2]})
+    assert await store.get_plan("h1") == {"actions": [1]}
+    assert await store.get_plan("missing") is None
+    await store.close()
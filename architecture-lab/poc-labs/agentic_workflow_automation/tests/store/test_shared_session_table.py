@@ -0,0 +1,141 @@
+import multiprocessing
+
+import pytest
+
+from automation_app.store import shared_session_table
+from automation_app.store.shared_session_table import SEQ, USED, SharedSessionTable
+
+
+def _table(tmp_path, slots=8, slot_bytes=128):
+    return SharedSessionTable(tmp_path / "sessions", slots=slots, slot_bytes=slot_bytes)
+
+
+def _increment(path, rounds):
+    table = SharedSessionTable(path, slots=8, slot_bytes=128)
+    for _ in range(rounds):
+        table.update("counter", lambda current: (str(int(current or b"0") + 1).encode(), None))
+    table.close()
+
+
+def test_put_get_delete_and_tombstone_reuse(tmp_path):
+    table = _table(tmp_path, slots=4)
+    for i in range(4):
+        table.put(f"k{i}", f"v{i}".encode())
+
+    assert [table.get(f"k{i}") for i in range(4)] == [b"v0", b"v1", b"v2", b"v3"]
+    with pytest.raises(ValueError, match="full"):
+        table.put("k4", b"v4")
+
+    assert table.delete("k1")
+    assert table.get("k1") is None
+    table.put("k4", b"v4")
+    assert table.get("k4") == b"v4"
+    assert sorted(key for _, key, _ in table.scan()) == ["k0", "k2", "k3", "k4"]
+    table.close()
+
+
+def test_entries_larger_than_a_slot_are_rejected(tmp_path):
+    table = _table(tmp_path, slot_bytes=64)
+
+    with pytest.raises(ValueError, match="slot capacity"):
+        table.put("k", b"x" * 64)
+    table.close()
+
+
+def test_expired_entries_are_hidden_and_purged(tmp_path, monkeypatch):
+    table = _table(tmp_path)
+    table.put("short", b"1", ttl=10)
+    table.put("forever", b"2")
+
+    monkeypatch.setattr(shared_session_table, "time", lambda: 2e10)
+
+    assert table.get("short") is None
+    assert table.get("forever") == b"2"
+    assert table.purge_expired() == 1
+    table.close()
+
+
+def test_update_keeping_expiry(tmp_path):
+    table = _table(tmp_path)
+    table.put("k", b"1", ttl=10)
+    expires_at = table._read(next(idx for idx, _, _ in table.scan()))[3]
+
+    table.update("k", lambda current: (b"2", None), keep_expiry=True)
+
+    assert table._read(next(idx for idx, _, _ in table.scan()))[3] == expires_at
+    table.close()
+
+
+def test_reader_retries_a_slot_being_written(tmp_path, monkeypatch):
+    table = _table(tmp_path)
+    table.put("k", b"v")
+    idx = next(idx for idx, _, _ in table.scan())
+    offset = table._offset(idx)
+    seq = SEQ.unpack_from(table._buf, offset)[0]
+
+    # A writer that died mid-write leaves the sequence odd; readers give up
+    # spinning and repair the slot under the lock
+    SEQ.pack_into(table._buf, offset, seq + 1)
+    monkeypatch.setattr(shared_session_table, "SPIN_LIMIT", 3)
+
+    assert table.get("k") is None
+    assert SEQ.unpack_from(table._buf, offset)[0] % 2 == 0
+    table.close()
+
+
+def test_churn_compacts_tombstones_and_keeps_probes_short(tmp_path):
+    table = _table(tmp_path, slots=512)
+    live = []
+    for i in range(5000):
+        table.put(f"k{i}", b"v")
+        live.append(f"k{i}")
+        if len(live) > 150:
+            table.delete(live.pop(0))
+
+    generation, empty, tombstones = table._stats()
+    assert generation > 0 and generation % 2 == 0
+    assert empty >= 512 * 0.125
+    assert empty + tombstones + len(live) == 512
+    assert all(table.get(key) == b"v" for key in live)
+    assert table.get("k0") is None
+    assert sorted(key for _, key, _ in table.scan()) == sorted(live)
+    table.close()
+
+
+def test_compaction_left_unfinished_by_a_dead_process_is_completed(tmp_path):
+    table = _table(tmp_path, slots=8)
+    table.put("k", b"v")
+    idx = next(idx for idx, _, _ in table.scan())
+    # Died mid-move: the entry copied to another slot, the original not yet cleared
+    table._write((idx + 3) % 8, USED, b"k", b"v", 0.0)
+    table._set_stats(generation=1)
+
+    table.put("other", b"w")
+
+    assert table._stats()[0] == 2
+    assert sorted(key for _, key, _ in table.scan()) == ["k", "other"]
+    assert sum(1 for i in range(8) if table._read_locked(i)[1] == b"k") == 1
+    table.close()
+
+
+def test_layout_mismatch_is_rejected(tmp_path):
+    _table(tmp_path, slots=8).close()
+
+    with pytest.raises(ValueError, match="different layout"):
+        _table(tmp_path, slots=16)
+
+
+def test_updates_are_atomic_across_processes(tmp_path):
+    path = tmp_path / "sessions"
+    _table(tmp_path).close()
+
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_increment, args=(path, 200)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    table = _table(tmp_path)
+    assert table.get("counter") == b"800"
+    table.close()
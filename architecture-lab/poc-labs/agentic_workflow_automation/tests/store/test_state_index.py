@@ -0,0 +1,53 @@
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.state_index import StateIndex
+
+
+def _ids(page):
+    return [session_id for _, session_id in page[0]]
+
+
+def test_page_returns_sessions_in_entry_order():
+    index = StateIndex()
+    for session_id in ("a", "b", "c"):
+        index.set(session_id, WorkflowState.PROPOSED)
+
+    page, more = index.page(WorkflowState.PROPOSED, limit=2)
+    assert [sid for _, sid in page] == ["a", "b"]
+    assert more
+
+    rest = index.page(WorkflowState.PROPOSED, after=page[-1][0])
+    assert _ids(rest) == ["c"]
+    assert rest[1] is False
+
+
+def test_reentering_a_state_moves_session_to_the_end():
+    index = StateIndex()
+    index.set("a", WorkflowState.PROPOSED)
+    index.set("b", WorkflowState.PROPOSED)
+    index.set("a", WorkflowState.EXECUTING)
+    index.set("a", WorkflowState.PROPOSED)
+
+    assert _ids(index.page(WorkflowState.PROPOSED)) == ["b", "a"]
+    assert index.count(WorkflowState.PROPOSED) == 2
+    assert index.count(WorkflowState.EXECUTING) == 0
+
+
+def test_setting_the_same_state_keeps_position():
+    index = StateIndex()
+    index.set("a", WorkflowState.PROPOSED)
+    index.set("b", WorkflowState.PROPOSED)
+    index.set("a", "PROPOSED")
+
+    assert _ids(index.page(WorkflowState.PROPOSED)) == ["a", "b"]
+
+
+def test_stale_entries_are_compacted():
+    index = StateIndex()
+    for i in range(200):
+        index.set(f"s{i}", WorkflowState.PROPOSED)
+    for i in range(199):
+        index.discard(f"s{i}")
+
+    assert len(index._entries["PROPOSED"]) < 100
+    assert _ids(index.page(WorkflowState.PROPOSED)) == ["s199"]
+    index.discard("missing")
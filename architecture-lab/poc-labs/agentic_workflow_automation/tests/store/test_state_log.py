@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.session_codec import SessionCodec
+from automation_app.store.state_log import StateLog
+from automation_app.store.state_store import StateStore
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    def make(**kwargs):
+        return StateStore(log=StateLog(tmp_path, commit_interval=0, **kwargs))
+
+    return make
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store()
+
+
+@pytest.mark.asyncio
+async def test_appends_are_group_committed(tmp_path):
+    log = StateLog(tmp_path, commit_interval=0.01)
+
+    await asyncio.gather(*(log.append(["D", f"s{i}"]) for i in range(10)))
+    await log.close()
+
+    assert log.metrics.counter("state_log.commits") == 1
+    assert list(StateLog(tmp_path).records()) == [["D", f"s{i}"] for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_restore_replays_every_mutation(store, make_store):
+    await store.save_context("s1", {"last_plan": {"actions": []}}, state=WorkflowState.PROPOSED, timestamp=5)
+    await store.update_context("s1", {"plan_hash": "h1"}, state=WorkflowState.IN_PROGRESS)
+    await store.save_context("s2", {"a": 1})
+    await store.update_if_state_matches("s2", WorkflowState.PROPOSED, WorkflowState.REJECTED, {"a": 2})
+    await store.save_context("gone", {})
+    await store.delete_session("gone")
+    await store.save_plan("h1", {"actions": [1]})
+    await store.claim_idempotency_key("k1", ttl=60)
+    await store.complete_idempotency_key("k1", {"message": "ok"})
+    await store.close()
+
+    restored = make_store()
+    assert await restored.restore() > 0
+
+    s1 = await restored.get_context("s1")
+    assert s1["state"] == WorkflowState.IN_PROGRESS
+    assert s1["data"] == {"last_plan": {"actions": []}, "plan_hash": "h1"}
+    assert (await restored.get_context("s2"))["data"] == {"a": 2}
+    assert "gone" not in restored.storage
+    assert await restored.get_plan("h1") == {"actions": [1]}
+    assert restored.idempotency["k1"]["response"] == {"message": "ok"}
+    assert (await restored.list_sessions(WorkflowState.REJECTED))[0] == ["s2"]
+    await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_compacts_and_supersedes_old_files(store, make_store, tmp_path):
+    await store.save_context("s1", {})
+    for i in range(20):
+        await store.update_context("s1", {"step": i})
+    await store.snapshot()
+    await store.update_context("s1", {"after": True})
+    await store.close()
+
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["log.2", "snapshot.2"]
+
+    restored = make_store()
+    assert await restored.restore() == 2  # snapshot record + one tail record
+    assert (await restored.get_context("s1"))["data"] == {"step": 19, "after": True}
+    await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_taken_once_log_grows_past_threshold(make_store):
+    store = make_store(snapshot_bytes=200)
+    for i in range(10):
+        await store.save_context(f"s{i}", {"payload": "x" * 20})
+    await store.close()
+
+    assert store.log.metrics.counter("state_log.snapshots") >= 1
+    restored = make_store()
+    await restored.restore()
+    assert len(restored.storage) == 10
+    await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_torn_tail_record_is_ignored(store, make_store, tmp_path):
+    await store.save_context("s1", {"a": 1})
+    await store.save_context("s2", {"b": 2})
+    await store.close()
+
+    log_file = next(tmp_path.glob("log.*"))
+    log_file.write_bytes(log_file.read_bytes()[:-3])
+
+    restored = make_store()
+    await restored.restore()
+    assert list(restored.storage) == ["s1"]
+    await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_restore_with_packed_sessions(tmp_path):
+    store = StateStore(codec=SessionCodec(), log=StateLog(tmp_path, commit_interval=0))
+    plan = {"actions": [{"adapter": "Workday", "method": "create_time_off", "params": {"d": 1}}]}
+    await store.save_context("s1", {"last_plan": plan})
+    await store.snapshot()
+    await store.close()
+
+    restored = StateStore(codec=SessionCodec(), log=StateLog(tmp_path, commit_interval=0))
+    await restored.restore()
+    assert (await restored.get_context("s1"))["data"] == {"last_plan": plan}
+    await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_mutations_during_a_chunked_snapshot_survive_restore(make_store):
+    store = make_store(snapshot_chunk=1)
+    for i in range(20):
+        await store.save_context(f"s{i}", {"n": i})
+
+    async def mutate():
+        for i in range(20):
+            await store.update_context(f"s{i}", {"n": -i})
+            await store.save_context(f"new{i}", {})
+            await store.delete_session(f"s{(i + 10) % 20}")
+            await asyncio.sleep(0)
+
+    await asyncio.gather(store.snapshot(), mutate())
+    await store.close()
+
+    assert store.log.metrics.gauge("state_log.snapshot_bytes") > 0
+    restored = make_store()
+    await restored.restore()
+    assert restored.storage.keys() == store.storage.keys()
+    for session_id in list(store.storage):
+        assert (await restored.get_context(session_id))["data"] == (await store.get_context(session_id))["data"]
+    await restored.close()
@@ -71,3 +71,331 @@ async def test_delete_session_nonexistent():
     await store.delete_session("missing")
 
     assert store.storage == {}
+
+
+@pytest.mark.asyncio
+async def test_update_context_merges_fields_and_keeps_state():
+    store = StateStore()
+    await store.save_context("s1", {"last_plan": {"actions": []}}, WorkflowState.IN_PROGRESS, timestamp=10)
+
+    await store.update_context("s1", {"last_action_index": 3})
+
+    result = await store.get_context("s1")
+    assert result["state"] == WorkflowState.IN_PROGRESS
+    assert result["timestamp"] == 10
+    assert result["data"] == {"last_plan": {"actions": []}, "last_action_index": 3}
+
+
+@pytest.mark.asyncio
+async def test_update_context_changes_state_when_given():
+    store = StateStore()
+    await store.save_context("s1", {"foo": "bar"}, WorkflowState.IN_PROGRESS, timestamp=10)
+
+    await store.update_context("s1", {"done": True}, state=WorkflowState.COMPLETED)
+
+    result = await store.get_context("s1")
+    assert result["state"] == WorkflowState.COMPLETED
+    assert result["timestamp"] > 10
+
+
+@pytest.mark.asyncio
+async def test_update_context_ignores_missing_session():
+    store = StateStore()
+
+    assert not await store.update_context("new", {"plan_hash": "abc"})
+
+    assert await store.find_context("new") is None
+    assert store.metrics.counter("state_store.missing_updates") == 1
+
+
+@pytest.mark.asyncio
+async def test_plans_are_dropped_once_no_session_references_them():
+    store = StateStore(plan_orphan_ttl=0)
+    await store.save_context("s1", {})
+    await store.save_context("s2", {})
+    await store.save_plan("h1", {"actions": [1]})
+    await store.update_context("s1", {"plan_hash": "h1"})
+    await store.update_context("s2", {"plan_hash": "h1"})
+
+    await store.delete_session("s1")
+    await store.purge_expired()
+    assert await store.get_plan("h1") == {"actions": [1]}
+
+    await store.save_context("s2", {"replaced": True})
+    await store.purge_expired()
+    assert await store.get_plan("h1") is None
+    assert store.metrics.counter("state_store.plans_dropped") == 1
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_plans_survive_the_orphan_grace_period():
+    store = StateStore(plan_orphan_ttl=60)
+    await store.save_plan("h1", {"actions": [1]})
+
+    await store.purge_expired()
+
+    assert await store.get_plan("h1") == {"actions": [1]}
+
+
+@pytest.mark.asyncio
+async def test_save_plan_is_write_once():
+    store = StateStore()
+
+    await store.save_plan("h1", {"actions": [1]})
+    await store.save_plan("h1", {"actions": [2]})
+
+    assert await store.get_plan("h1") == {"actions": [1]}
+    assert await store.get_plan("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_update_if_state_matches_is_compare_and_set():
+    store = StateStore()
+    await store.save_context("s1", {"a": 1}, state=WorkflowState.PROPOSED)
+
+    assert await store.update_if_state_matches("s1", WorkflowState.PROPOSED, WorkflowState.IN_PROGRESS, {"a": 2})
+    assert not await store.update_if_state_matches("s1", WorkflowState.PROPOSED, WorkflowState.REJECTED, {"a": 3})
+    assert not await store.update_if_state_matches("missing", WorkflowState.PROPOSED, WorkflowState.REJECTED, {})
+
+    context = await store.get_context("s1")
+    assert context["state"] == WorkflowState.IN_PROGRESS
+    assert context["data"] == {"a": 2}
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_claim_complete_and_expiry(monkeypatch):
+    import automation_app.store.state_store as state_store_module
+
+    now = [1000.0]
+    monkeypatch.setattr(state_store_module, "time", lambda: now[0])
+    store = StateStore()
+
+    assert await store.claim_idempotency_key("k", ttl=10) is None
+    assert (await store.claim_idempotency_key("k", ttl=10))["status"] == "PENDING"
+
+    await store.complete_idempotency_key("k", {"message": "ok"})
+    record = await store.claim_idempotency_key("k", ttl=10)
+    assert record["status"] == "DONE"
+    assert record["response"] == {"message": "ok"}
+
+    now[0] += 11
+    assert await store.claim_idempotency_key("k", ttl=10) is None
+
+
+@pytest.mark.asyncio
+async def test_release_idempotency_key_allows_reclaim():
+    store = StateStore()
+    await store.claim_idempotency_key("k", ttl=10)
+    await store.release_idempotency_key("k")
+    assert await store.claim_idempotency_key("k", ttl=10) is None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import automation_app.store.state_store as state_store_module
+
+    now = [1000.0]
+    monkeypatch.setattr(state_store_module, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_sessions_expire_by_state_ttl_on_access(clock):
+    store = StateStore(ttls={"*": 100, "COMPLETED": 10})
+    await store.save_context("done", {"a": 1}, state=WorkflowState.COMPLETED)
+    await store.save_context("open", {"b": 2}, state=WorkflowState.PROPOSED)
+
+    clock[0] += 11
+
+    assert (await store.get_context("done"))["data"] == {}
+    assert "done" not in store.storage
+    assert (await store.get_context("open"))["data"] == {"b": 2}
+    assert store.metrics.counter("state_store.evictions", reason="expired") == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_refresh_ttl_for_the_new_state(clock):
+    store = StateStore(ttls={"*": 100, "COMPLETED": 10})
+    await store.save_context("s1", {"a": 1}, state=WorkflowState.IN_PROGRESS)
+
+    clock[0] += 50
+    await store.update_context("s1", {"done": True}, state=WorkflowState.COMPLETED)
+    clock[0] += 9
+    assert (await store.get_context("s1"))["data"] == {"a": 1, "done": True}
+
+    clock[0] += 2
+    assert not await store.update_if_state_matches("s1", WorkflowState.COMPLETED, WorkflowState.REJECTED, {})
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_sweeps_sessions_and_idempotency_keys(clock):
+    store = StateStore(ttls={"*": 10})
+    await store.save_context("s1", {})
+    await store.save_context("s2", {})
+    await store.claim_idempotency_key("k", ttl=5)
+
+    clock[0] += 11
+
+    assert await store.purge_expired() == 2
+    assert store.storage == {}
+    assert store.idempotency == {}
+    assert store.metrics.gauge("state_store.sessions") == 0
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_session_is_evicted_past_max_entries():
+    store = StateStore(max_entries=2)
+    await store.save_context("s1", {})
+    await store.save_context("s2", {})
+    await store.get_context("s1")
+
+    await store.save_context("s3", {})
+
+    assert list(store.storage) == ["s1", "s3"]
+    assert store.metrics.counter("state_store.evictions", reason="capacity") == 1
+
+
+@pytest.mark.asyncio
+async def test_resident_bytes_are_tracked_and_capped():
+    store = StateStore(max_bytes=100)
+    await store.save_context("s1", {"blob": "x" * 40})
+    await store.update_context("s1", {"blob": "y" * 40})
+    resident = store.metrics.gauge("state_store.resident_bytes")
+    assert resident == len("blob") + len('"' + "y" * 40 + '"')
+
+    await store.save_context("s2", {"blob": "z" * 80})
+
+    assert list(store.storage) == ["s2"]
+    assert store.metrics.gauge("state_store.resident_bytes") < 100
+
+    await store.delete_session("s2")
+    assert store.metrics.gauge("state_store.resident_bytes") == 0
+
+
+@pytest.mark.asyncio
+async def test_sessions_mid_execution_are_not_evicted_by_the_caps():
+    store = StateStore(max_entries=2)
+    await store.save_context("running", {}, state=WorkflowState.IN_PROGRESS)
+    await store.save_context("s1", {})
+
+    await store.save_context("s2", {})
+    await store.update_context("running", {"last_action_index": 1})
+
+    assert list(store.storage) == ["s2", "running"]
+    assert store.metrics.counter("state_store.evictions", reason="capacity") == 1
+
+
+@pytest.mark.asyncio
+async def test_finished_sessions_become_evictable_again():
+    store = StateStore(max_entries=2)
+    await store.save_context("done", {}, state=WorkflowState.IN_PROGRESS)
+    await store.save_context("proposed", {})
+    await store.update_context("done", {}, state=WorkflowState.COMPLETED)
+    assert list(store._evictable) == ["proposed", "done"]
+
+    await store.get_context("proposed")
+    await store.save_context("new", {})
+
+    assert list(store.storage) == ["proposed", "new"]
+
+
+@pytest.mark.asyncio
+async def test_stored_plans_count_against_the_byte_cap():
+    store = StateStore(max_bytes=200)
+    await store.save_context("s1", {})
+    await store.save_plan("h1", {"actions": ["x" * 60]})
+    await store.update_context("s1", {"plan_hash": "h1"})
+    resident = store.metrics.gauge("state_store.resident_bytes")
+    assert resident > 60
+
+    await store.save_plan("orphan", {"actions": ["y" * 60]})
+    await store.save_plan("h2", {"actions": ["z" * 60]})
+
+    # The unreferenced plan is dropped before any session is evicted
+    assert await store.get_plan("orphan") is None
+    assert await store.get_plan("h1") is not None
+    assert list(store.storage) == ["s1"]
+    assert store.metrics.gauge("state_store.resident_bytes") <= 200
+
+
+@pytest.mark.asyncio
+async def test_get_all_sessions_returns_a_snapshot():
+    store = StateStore()
+    await store.save_context("s1", {})
+
+    sessions = await store.get_all_sessions()
+    await store.delete_session("s1")
+
+    assert list(sessions) == ["s1"]
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_pages_through_one_state():
+    store = StateStore()
+    for i in range(5):
+        await store.save_context(f"p{i}", {}, state=WorkflowState.PROPOSED)
+    await store.save_context("e1", {}, state=WorkflowState.EXECUTING)
+
+    first, cursor = await store.list_sessions(WorkflowState.PROPOSED, limit=2)
+    # Moving a listed session out of the state does not disturb the cursor
+    await store.update_if_state_matches("p0", WorkflowState.PROPOSED, WorkflowState.REJECTED, {})
+    second, cursor = await store.list_sessions(WorkflowState.PROPOSED, cursor=cursor, limit=2)
+    third, cursor = await store.list_sessions(WorkflowState.PROPOSED, cursor=cursor, limit=2)
+
+    assert first + second + third == ["p0", "p1", "p2", "p3", "p4"]
+    assert cursor is None
+    assert (await store.list_sessions(WorkflowState.REJECTED))[0] == ["p0"]
+    assert (await store.list_sessions(WorkflowState.EXECUTING))[0] == ["e1"]
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_follows_state_changes_and_deletes():
+    store = StateStore()
+    await store.save_context("s1", {}, state=WorkflowState.PROPOSED)
+    await store.save_context("s2", {}, state=WorkflowState.PROPOSED)
+
+    await store.update_context("s1", {"x": 1}, state=WorkflowState.EXECUTING)
+    await store.delete_session("s2")
+
+    assert await store.list_sessions(WorkflowState.PROPOSED) == ([], None)
+    assert await store.list_sessions(WorkflowState.EXECUTING) == (["s1"], None)
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_skips_expired_sessions(clock):
+    store = StateStore(ttls={"*": 10})
+    await store.save_context("old", {})
+    clock[0] += 5
+    await store.save_context("new", {})
+    clock[0] += 6
+
+    assert await store.list_sessions(WorkflowState.PROPOSED) == (["new"], None)
+    assert "old" not in store.storage
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_rejects_malformed_cursor():
+    with pytest.raises(ValueError):
+        await StateStore().list_sessions(WorkflowState.PROPOSED, cursor="abc")
+
+
+@pytest.mark.asyncio
+async def test_iter_sessions_yields_bounded_batches_while_writers_run():
+    store = StateStore()
+    for i in range(5):
+        await store.save_context(f"p{i}", {"i": i}, state=WorkflowState.PROPOSED)
+    await store.save_context("done", {}, state=WorkflowState.COMPLETED)
+
+    seen = []
+    async for batch in store.iter_sessions(state=WorkflowState.PROPOSED, batch_size=2):
+        assert len(batch) <= 2
+        seen.extend(session_id for session_id, _ in batch)
+        # Writers keep going mid-walk: new sessions and state changes
+        await store.save_context(f"new{len(seen)}", {}, state=WorkflowState.PROPOSED)
+        await store.update_context(batch[0][0], {}, state=WorkflowState.REJECTED)
+
+    assert seen[:5] == [f"p{i}" for i in range(5)]
+    assert len(seen) == len(set(seen))
+
+    every = [session_id async for batch in store.iter_sessions() for session_id, _ in batch]
+    assert sorted(every) == sorted(await store.get_all_sessions())
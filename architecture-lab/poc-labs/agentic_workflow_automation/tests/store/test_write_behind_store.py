@@ -0,0 +1,225 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from automation_app.models.workflow_state import WorkflowState
+from automation_app.store.state_store import StateStore
+from automation_app.store.write_behind_store import WriteBehindStateStore
+
+
+@pytest.fixture
+def backend():
+    return StateStore()
+
+
+@pytest.fixture
+def spy(backend):
+    return AsyncMock(wraps=backend)
+
+
+@pytest.fixture
+def make_store(spy):
+    def make(**kwargs):
+        kwargs.setdefault("flush_interval", 60)
+        return WriteBehindStateStore(spy, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store()
+
+
+@pytest.mark.asyncio
+async def test_updates_within_a_window_coalesce_into_one_write(store, backend, spy):
+    await store.save_context("s1", {"step": 0})
+    for step in range(1, 6):
+        await store.update_context("s1", {"step": step}, state=WorkflowState.IN_PROGRESS)
+
+    assert spy.save_context.await_count == 0
+    assert (await store.get_context("s1"))["data"]["step"] == 5
+
+    await store.flush()
+
+    assert spy.save_context.await_count == 1
+    context = await backend.get_context("s1")
+    assert context["data"] == {"step": 5}
+    assert context["state"] == WorkflowState.IN_PROGRESS
+    assert store.metrics.counter("write_behind.coalesced") == 5
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_through_to_the_backend_on_a_miss(store, backend):
+    await backend.save_context("s1", {"a": 1})
+
+    context = await store.get_context("s1")
+    context["data"]["a"] = 2  # cache copy, not the backend's dict
+
+    assert (await backend.get_context("s1"))["data"] == {"a": 1}
+    assert await store.find_context("missing") is None
+    assert (await store.get_context("missing"))["data"] == {}
+    assert store.metrics.counter("write_behind.cache", result="miss") == 3
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_updating_an_unknown_session_is_a_no_op(store, backend):
+    assert not await store.update_context("missing", {"step": 1})
+
+    await store.flush()
+    assert await backend.find_context("missing") is None
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_pending_delete_hides_the_backend_copy(store, backend):
+    await backend.save_context("s1", {"a": 1})
+
+    await store.delete_session("s1")
+
+    assert await store.find_context("s1") is None
+    await store.flush()
+    assert await backend.find_context("s1") is None
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_dirty_session_survives_cache_eviction(make_store, backend):
+    store = make_store(cache=StateStore(max_entries=1))
+
+    await store.save_context("s1", {"a": 1})
+    await store.save_context("s2", {"b": 1})  # evicts s1 from the cache
+    await store.update_context("s1", {"a": 2})
+    await store.flush()
+
+    assert (await backend.get_context("s1"))["data"] == {"a": 2}
+    assert (await backend.get_context("s2"))["data"] == {"b": 1}
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_default_cache_is_bounded_and_pins_nothing(make_store, backend):
+    store = make_store(cache_entries=2)
+
+    for n in range(4):
+        await store.save_context(f"s{n}", {"n": n}, state=WorkflowState.IN_PROGRESS)
+    await store.flush()
+
+    assert len(store.cache.storage) == 2
+    assert len(await backend.get_all_sessions()) == 4
+    assert (await store.get_context("s0"))["data"] == {"n": 0}
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_reaching_max_dirty_flushes_inline(make_store, spy):
+    store = make_store(max_dirty=3)
+
+    for i in range(3):
+        await store.save_context(f"s{i}", {"i": i})
+
+    assert spy.save_context.await_count == 3
+    assert store.metrics.counter("write_behind.backpressure") == 1
+    assert store.metrics.gauge("write_behind.dirty") == 0
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_background_flush_writes_back(make_store, backend):
+    store = make_store(flush_interval=0.01)
+
+    await store.save_context("s1", {"a": 1})
+    await asyncio.sleep(0.05)
+
+    assert (await backend.get_context("s1"))["data"] == {"a": 1}
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_stay_dirty(store, spy):
+    spy.save_context.side_effect = [ConnectionError("down"), None]
+
+    await store.save_context("s1", {"a": 1})
+    await store.flush()
+
+    assert store.metrics.counter("write_behind.flush_failures") == 1
+    assert store.metrics.gauge("write_behind.dirty") == 1
+
+    await store.flush()
+    assert spy.save_context.await_count == 2
+    assert store.metrics.gauge("write_behind.dirty") == 0
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_compare_and_set_is_decided_by_the_backend(store, backend):
+    await store.save_context("s1", {"a": 1})
+
+    # The pending write is flushed first, so the backend sees PROPOSED
+    assert await store.update_if_state_matches(
+        "s1", WorkflowState.PROPOSED, WorkflowState.IN_PROGRESS, {"a": 2}
+    )
+    assert (await backend.get_context("s1"))["state"] == WorkflowState.IN_PROGRESS
+
+    # Another instance moved it on; the stale cached copy must not win
+    await backend.save_context("s1", {"a": 3}, state=WorkflowState.COMPLETED)
+    assert not await store.update_if_state_matches(
+        "s1", WorkflowState.IN_PROGRESS, WorkflowState.REJECTED, {"a": 4}
+    )
+    assert (await store.get_context("s1"))["state"] == WorkflowState.COMPLETED
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_compare_and_set_waits_for_an_in_flight_flush(store, backend, spy):
+    await store.save_context("s1", {"step": 1})
+    release = asyncio.Event()
+
+    async def slow_save(*args, **kwargs):
+        await release.wait()
+        await backend.save_context(*args, **kwargs)
+
+    spy.save_context.side_effect = slow_save
+    flushing = asyncio.ensure_future(store.flush())
+    await asyncio.sleep(0)
+    cas = asyncio.ensure_future(
+        store.update_if_state_matches("s1", WorkflowState.PROPOSED, WorkflowState.CONFIRMED, {"step": 2})
+    )
+    await asyncio.sleep(0)
+    assert not cas.done()
+
+    release.set()
+    await flushing
+    assert await cas
+
+    context = await backend.get_context("s1")
+    assert (context["state"], context["data"]) == (WorkflowState.CONFIRMED, {"step": 2})
+    await store.flush()
+    assert (await backend.get_context("s1"))["data"] == {"step": 2}
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_listing_sees_pending_writes(store):
+    await store.save_context("s1", {}, state=WorkflowState.PROPOSED)
+
+    ids, cursor = await store.list_sessions(WorkflowState.PROPOSED)
+
+    assert ids == ["s1"]
+    assert cursor is None
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_and_closes_the_backend(store, backend, spy):
+    await store.save_context("s1", {"a": 1})
+    await store.save_plan("h1", {"actions": []})
+
+    await store.close()
+
+    assert (await backend.get_context("s1"))["data"] == {"a": 1}
+    assert await backend.get_plan("h1") == {"actions": []}
+    spy.close.assert_awaited_once()
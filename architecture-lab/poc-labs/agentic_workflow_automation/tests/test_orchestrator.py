@@ -2,8 +2,9 @@ import asyncio
 import time
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
+from automation_app.config.constants import PLAN_TIME_BUDGETS
 from automation_app.models.action import Action
 from automation_app.models.workflow_state import WorkflowState
 from automation_app.models.plan import Plan
@@ -13,16 +14,29 @@ from automation_app.orchestrator import AgenticOrchestrator
 
 @pytest.fixture
 def mock_components():
+    state_store = AsyncMock()
+    state_store.claim_idempotency_key.return_value = None
+    state_store.update_if_state_matches.return_value = True
     return {
         "classifier": AsyncMock(),
         "planner": AsyncMock(),
         "policy_engine": AsyncMock(),
         "executor": AsyncMock(),
-        "state_store": AsyncMock(),
+        "state_store": state_store,
         "auditor": MagicMock(),
     }
 
 
+def _proposed_sessions(*sessions):
+    """
+    Stand-in for state_store.iter_sessions yielding one batch.
+    """
+    async def batches(**kwargs):
+        yield list(sessions)
+
+    return MagicMock(side_effect=batches)
+
+
 @pytest.fixture
 def orchestrator(mock_components):
     return AgenticOrchestrator(**mock_components)
@@ -98,6 +112,8 @@ async def test_propose_happy_path(orchestrator, mock_components, sample_intent,
     assert result["state"] == WorkflowState.PROPOSED
     assert "plan" in result
     mock_components["state_store"].save_context.assert_called_once()
+    saved = mock_components["state_store"].save_context.call_args.args[1]
+    assert saved["plan_type"] == "test_intent"
 
 
 @pytest.mark.asyncio
@@ -129,7 +145,12 @@ async def test_confirm_starts_execution(orchestrator, mock_components, sample_pl
 
     assert result["state"] == WorkflowState.IN_PROGRESS
     mock_components["executor"].run.assert_not_awaited()
-    mock_components["state_store"].save_context.assert_called_once()
+    mock_components["state_store"].update_if_state_matches.assert_awaited_once_with(
+        session_id="session1",
+        expected_state=WorkflowState.PROPOSED,
+        new_state=WorkflowState.IN_PROGRESS,
+        data={"last_plan": sample_plan.model_dump()},
+    )
 
 
 @pytest.mark.asyncio
@@ -179,12 +200,13 @@ async def test_reject_no_proposal(orchestrator, mock_components):
 
 @pytest.mark.asyncio
 async def test_cleanup_stale_proposals_rejects_atomic(orchestrator, mock_components, sample_plan):
-    mock_components["state_store"].get_all_sessions.return_value = ["session1"]
-    mock_components["state_store"].get_context.return_value = {
-        "state": WorkflowState.PROPOSED,
-        "timestamp": 0,
-        "data": {"last_plan": sample_plan.model_dump()},
-    }
+    mock_components["state_store"].iter_sessions = _proposed_sessions(
+        ("session1", {
+            "state": WorkflowState.PROPOSED,
+            "timestamp": 0,
+            "data": {"last_plan": sample_plan.model_dump()},
+        }),
+    )
 
     # Ensure update_if_state_matches exists and returns True
     mock_components["state_store"].update_if_state_matches = AsyncMock(return_value=True)
@@ -196,12 +218,28 @@ async def test_cleanup_stale_proposals_rejects_atomic(orchestrator, mock_compone
     mock_components["auditor"].log.assert_called()
 
 
+@pytest.mark.asyncio
+async def test_cleanup_stale_proposals_rejects_session_without_plan(orchestrator, mock_components):
+    mock_components["state_store"].iter_sessions = _proposed_sessions(
+        ("session1", {"state": WorkflowState.PROPOSED, "timestamp": 0, "data": {"plan_hash": "h1"}}),
+    )
+    mock_components["state_store"].update_if_state_matches = AsyncMock(return_value=True)
+
+    await orchestrator.cleanup_stale_proposals(timeout_seconds=1)
+
+    mock_components["state_store"].update_if_state_matches.assert_awaited_once_with(
+        session_id="session1",
+        expected_state=WorkflowState.PROPOSED,
+        new_state=WorkflowState.REJECTED,
+        data={"last_plan": None},
+    )
+
+
 @pytest.mark.asyncio
 async def test_cleanup_stale_proposals_skips_non_proposed(orchestrator, mock_components):
-    mock_components["state_store"].get_all_sessions.return_value = ["session1"]
-    mock_components["state_store"].get_context.return_value = {
-        "state": WorkflowState.IN_PROGRESS
-    }
+    mock_components["state_store"].iter_sessions = _proposed_sessions(
+        ("session1", {"state": WorkflowState.IN_PROGRESS}),
+    )
 
     await orchestrator.cleanup_stale_proposals(timeout_seconds=1)
 
@@ -285,12 +323,13 @@ async def test_propose_uses_context_data(orchestrator, mock_components, sample_i
 
 @pytest.mark.asyncio
 async def test_cleanup_stale_proposals_skips_fresh(orchestrator, mock_components, sample_plan):
-    mock_components["state_store"].get_all_sessions.return_value = ["session1"]
-    mock_components["state_store"].get_context.return_value = {
-        "state": WorkflowState.PROPOSED,
-        "timestamp": time.time(),
-        "data": {"last_plan": sample_plan.model_dump()},
-    }
+    mock_components["state_store"].iter_sessions = _proposed_sessions(
+        ("session1", {
+            "state": WorkflowState.PROPOSED,
+            "timestamp": time.time(),
+            "data": {"last_plan": sample_plan.model_dump()},
+        }),
+    )
 
     await orchestrator.cleanup_stale_proposals(timeout_seconds=9999)
 
@@ -298,18 +337,17 @@ async def test_cleanup_stale_proposals_skips_fresh(orchestrator, mock_components
 
 @pytest.mark.asyncio
 async def test_cleanup_stale_proposals_state_changes(orchestrator, mock_components, sample_plan):
-    mock_components["state_store"].get_all_sessions.return_value = ["session1"]
 
     # First call: stale
-    mock_components["state_store"].get_context.side_effect = [
-        {
+    mock_components["state_store"].iter_sessions = _proposed_sessions(
+        ("session1", {
             "state": WorkflowState.PROPOSED,
             "timestamp": 0,
             "data": {"last_plan": sample_plan.model_dump()},
-        },
-        # Second call: state changed before save
-        {"state": WorkflowState.IN_PROGRESS}
-    ]
+        }),
+    )
+    # State changed before save
+    mock_components["state_store"].get_context.return_value = {"state": WorkflowState.IN_PROGRESS}
 
     await orchestrator.cleanup_stale_proposals(timeout_seconds=1)
 
@@ -317,12 +355,13 @@ async def test_cleanup_stale_proposals_state_changes(orchestrator, mock_componen
 
 @pytest.mark.asyncio
 async def test_cleanup_stale_proposals_rejects_fallback(orchestrator, mock_components, sample_plan):
-    mock_components["state_store"].get_all_sessions.return_value = ["session1"]
-    mock_components["state_store"].get_context.return_value = {
+    context = {
         "state": WorkflowState.PROPOSED,
         "timestamp": 0,
         "data": {"last_plan": sample_plan.model_dump()},
     }
+    mock_components["state_store"].iter_sessions = _proposed_sessions(("session1", context))
+    mock_components["state_store"].get_context.return_value = context
 
     # Force fallback: no atomic method
     mock_components["state_store"].update_if_state_matches = None
@@ -355,18 +394,215 @@ def test_get_serialized_plan_falls_back_to_dict(orchestrator):
 
 @pytest.mark.asyncio
 async def test_cleanup_stale_proposals_state_changes_fallback(orchestrator, mock_components, sample_plan):
-    mock_components["state_store"].get_all_sessions.return_value = ["session1"]
     mock_components["state_store"].update_if_state_matches = None
 
-    mock_components["state_store"].get_context.side_effect = [
-        {
+    mock_components["state_store"].iter_sessions = _proposed_sessions(
+        ("session1", {
             "state": WorkflowState.PROPOSED,
             "timestamp": 0,
             "data": {"last_plan": sample_plan.model_dump()},
-        },
-        {"state": WorkflowState.IN_PROGRESS},
-    ]
+        }),
+    )
+    # State changed before save
+    mock_components["state_store"].get_context.return_value = {"state": WorkflowState.IN_PROGRESS}
 
     await orchestrator.cleanup_stale_proposals(timeout_seconds=1)
 
     mock_components["state_store"].save_context.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_with_audit_passes_plan_type_deadline(orchestrator, mock_components, sample_plan):
+    before = time.monotonic()
+
+    await orchestrator._run_with_audit(sample_plan, "session1", plan_type="SEND_EMAIL")
+
+    deadline = mock_components["executor"].run.call_args.kwargs["deadline"]
+    assert before + PLAN_TIME_BUDGETS["SEND_EMAIL"] <= deadline <= time.monotonic() + PLAN_TIME_BUDGETS["SEND_EMAIL"]
+
+
+def test_plan_deadline_falls_back_to_default_budget(orchestrator):
+    before = time.monotonic()
+    assert orchestrator._plan_deadline("UNKNOWN_TYPE") >= before + PLAN_TIME_BUDGETS["*"]
+
+
+# ---------------------------------------------------------
+# IDEMPOTENCY
+# ---------------------------------------------------------
+
+@pytest.fixture
+def store_backed_orchestrator(mock_components):
+    from automation_app.store.state_store import StateStore
+
+    mock_components["state_store"] = StateStore()
+    return AgenticOrchestrator(**mock_components)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_confirm_returns_original_without_rerun(store_backed_orchestrator, mock_components, sample_plan):
+    store = mock_components["state_store"]
+    await store.save_context(
+        "session1",
+        {"last_plan": sample_plan.model_dump(), "proposal_id": "p-1"},
+        state=WorkflowState.PROPOSED,
+    )
+
+    with patch("automation_app.orchestrator.asyncio.create_task", side_effect=lambda coro: coro.close()) as create_task:
+        first = await store_backed_orchestrator.confirm("session1")
+        second = await store_backed_orchestrator.confirm("session1")
+
+    assert first == second == {
+        "state": WorkflowState.IN_PROGRESS,
+        "message": "Execution started in background",
+    }
+    create_task.assert_called_once()
+    mock_components["auditor"].log.assert_any_call(
+        "session1", "DUPLICATE_REQUEST", {"entrypoint": "confirm", "status": "DONE"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_confirm_loses_cas_race_does_not_start(orchestrator, mock_components, sample_plan):
+    mock_components["state_store"].get_context.return_value = {
+        "state": WorkflowState.PROPOSED,
+        "data": {"last_plan": sample_plan.model_dump()},
+    }
+    mock_components["state_store"].update_if_state_matches.return_value = False
+
+    with patch("automation_app.orchestrator.asyncio.create_task", side_effect=lambda coro: coro.close()) as create_task:
+        result = await orchestrator.confirm("session1")
+
+    assert result["message"] == "Nothing to confirm"
+    create_task.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_process_request_skips_planning(store_backed_orchestrator, mock_components, sample_intent, sample_plan):
+    mock_components["classifier"].classify.return_value = sample_intent
+    mock_components["planner"].generate_plan.return_value = sample_plan
+    mock_components["policy_engine"].validate_plan.return_value = True
+
+    with patch("automation_app.orchestrator.asyncio.create_task", side_effect=lambda coro: coro.close()) as create_task:
+        first = await store_backed_orchestrator.process_request("hello", "session1", idempotency_key="k1")
+        second = await store_backed_orchestrator.process_request("hello", "session1", idempotency_key="k1")
+
+    assert first == second == "Execution started in background"
+    mock_components["classifier"].classify.assert_awaited_once()
+    create_task.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_process_request_releases_key(store_backed_orchestrator, mock_components):
+    mock_components["classifier"].classify.side_effect = RuntimeError("classifier down")
+
+    with pytest.raises(RuntimeError):
+        await store_backed_orchestrator.process_request("hello", "session1", idempotency_key="k1")
+
+    assert mock_components["state_store"].idempotency == {}
+
+
+# ---------------------------------------------------------
+# PREFETCH
+# ---------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_propose_starts_prefetch_when_enabled(mock_components, sample_intent, sample_plan):
+    mock_components["executor"] = MagicMock()
+    orchestrator = AgenticOrchestrator(**mock_components, prefetch_reads=True)
+    mock_components["classifier"].classify.return_value = sample_intent
+    mock_components["planner"].generate_plan.return_value = sample_plan
+    mock_components["policy_engine"].validate_plan.return_value = True
+    mock_components["state_store"].get_context.return_value = {}
+
+    await orchestrator.propose("hello", "session1")
+
+    saved = mock_components["state_store"].save_context.call_args.args[1]
+    mock_components["executor"].start_prefetch.assert_called_once_with(
+        sample_plan, session_id="session1", proposal_id=saved["proposal_id"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_propose_does_not_prefetch_by_default(orchestrator, mock_components, sample_intent, sample_plan):
+    mock_components["classifier"].classify.return_value = sample_intent
+    mock_components["planner"].generate_plan.return_value = sample_plan
+    mock_components["policy_engine"].validate_plan.return_value = True
+    mock_components["state_store"].get_context.return_value = {}
+
+    await orchestrator.propose("hello", "session1")
+
+    mock_components["executor"].start_prefetch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reject_discards_prefetched_reads(mock_components, sample_plan):
+    mock_components["executor"] = MagicMock()
+    orchestrator = AgenticOrchestrator(**mock_components, prefetch_reads=True)
+    mock_components["state_store"].get_context.return_value = {
+        "state": WorkflowState.PROPOSED,
+        "data": {"last_plan": sample_plan.model_dump(), "proposal_id": "p-1"},
+    }
+
+    await orchestrator.reject("session1")
+
+    mock_components["executor"].discard_prefetch.assert_called_once_with("p-1")
+
+
+@pytest.mark.asyncio
+async def test_run_with_audit_forwards_proposal_id(orchestrator, mock_components, sample_plan):
+    await orchestrator._run_with_audit(sample_plan, "session1", proposal_id="p-1")
+
+    assert mock_components["executor"].run.call_args.kwargs["proposal_id"] == "p-1"
+
+
+# ---------------------------------------------------------
+# SESSION LISTING
+# ---------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_cleanup_walks_every_proposed_page(store_backed_orchestrator, mock_components, sample_plan):
+    store = mock_components["state_store"]
+    for i in range(5):
+        await store.save_context(
+            f"s{i}", {"last_plan": sample_plan.model_dump()}, state=WorkflowState.PROPOSED, timestamp=1
+        )
+    await store.save_context("running", {}, state=WorkflowState.EXECUTING, timestamp=1)
+
+    with patch("automation_app.orchestrator.SESSION_PAGE_SIZE", 2):
+        await store_backed_orchestrator.cleanup_stale_proposals(timeout_seconds=1)
+
+    rejected, _ = await store.list_sessions(WorkflowState.REJECTED)
+    assert rejected == [f"s{i}" for i in range(5)]
+    assert (await store.get_context("running"))["state"] == WorkflowState.EXECUTING
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_returns_summaries(store_backed_orchestrator, mock_components):
+    store = mock_components["state_store"]
+    await store.save_context("s1", {"secret": "x"}, state=WorkflowState.PROPOSED, timestamp=5)
+
+    result = await store_backed_orchestrator.list_sessions(WorkflowState.PROPOSED)
+
+    assert result == {
+        "sessions": [{"session_id": "s1", "state": WorkflowState.PROPOSED, "timestamp": 5}],
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_executions_go_through_the_supervisor(mock_components, sample_intent, sample_plan):
+    supervisor = MagicMock()
+    orchestrator = AgenticOrchestrator(**mock_components, supervisor=supervisor)
+    mock_components["classifier"].classify.return_value = sample_intent
+    mock_components["planner"].generate_plan.return_value = sample_plan
+    mock_components["policy_engine"].validate_plan.return_value = True
+    mock_components["state_store"].get_context.return_value = {}
+
+    with patch("automation_app.orchestrator.asyncio.create_task") as create_task:
+        result = await orchestrator.process_request("hello", "session1")
+
+    assert result == "Execution started in background"
+    create_task.assert_not_called()
+    supervisor.submit.assert_called_once_with(
+        sample_plan, session_id="session1", deadline=ANY, proposal_id=None
+    )
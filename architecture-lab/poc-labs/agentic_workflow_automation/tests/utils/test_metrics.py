@@ -0,0 +1,46 @@
+from automation_app.utils.metrics import MetricsRegistry
+
+
+def test_counter_increments_per_label_set():
+    metrics = MetricsRegistry()
+
+    metrics.increment("calls", adapter="Workday")
+    metrics.increment("calls", 2, adapter="Workday")
+    metrics.increment("calls", adapter="MSGraph")
+
+    assert metrics.counter("calls", adapter="Workday") == 3
+    assert metrics.counter("calls", adapter="MSGraph") == 1
+    assert metrics.counter("calls", adapter="missing") == 0
+
+
+def test_gauge_overwrites_value():
+    metrics = MetricsRegistry()
+
+    metrics.set_gauge("depth", 5)
+    metrics.set_gauge("depth", 2)
+
+    assert metrics.gauge("depth") == 2
+    assert metrics.gauge("unknown") is None
+
+
+def test_observe_tracks_count_sum_and_max():
+    metrics = MetricsRegistry()
+
+    for value in (0.1, 0.5, 0.3):
+        metrics.observe("wait", value, key="Workday.*")
+
+    summary = metrics.summary("wait", key="Workday.*")
+    assert summary["count"] == 3
+    assert summary["max"] == 0.5
+    assert abs(summary["sum"] - 0.9) < 1e-9
+
+
+def test_snapshot_renders_labels():
+    metrics = MetricsRegistry()
+    metrics.increment("calls", adapter="Workday", method="create_time_off")
+    metrics.observe("wait", 1.0)
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot["counters"] == {"calls{adapter=Workday,method=create_time_off}": 1}
+    assert snapshot["summaries"]["wait"]["avg"] == 1.0
@@ -237,3 +237,8 @@ def test_scrub_data_no_pii():
     scrubber = PIIScrubber()
     data = {"msg": "hello world"}
     assert scrubber.scrub_data(data) == {"msg": "hello world"}
+
+
+def test_scrubber_cache_key_shared_by_equivalent_scrubbers():
+    assert PIIScrubber().cache_key == PIIScrubber().cache_key
+    assert PIIScrubber().cache_key != PIIScrubber(mask="[REDACTED]").cache_key